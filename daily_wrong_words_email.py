@@ -1,7 +1,7 @@
 """
 Send a daily email digest of top pinyin and meaning error words.
 
-Uses the exact same logic as the visualization dashboard:
+Uses the exact same logic as the visualization dashboard (main.ranking.rank_error_words):
 - Groups by Word
 - Filters by Quiz Attempts > 1 and error count >= 1
 - Ranks by error percentage, then by error count
@@ -37,6 +37,7 @@ from dotenv import load_dotenv
 
 from main.sql import load_dict
 from main.visualizations import prepare_df
+from main.ranking import rank_error_words
 
 # Load .env from repo root
 ENV_PATH = Path(__file__).parent / ".env"
@@ -52,66 +53,14 @@ def _format_word_cell(word: object) -> str:
 
 
 def fetch_top_pinyin_errors(df: pd.DataFrame, top_n: int = DEFAULT_TOP_N) -> pd.DataFrame:
-    """Return top pinyin error words (same logic as visualization dashboard)."""
-    work = df.copy()
-    
-    # Group by Word, aggregate pinyin errors
-    top_pinyin = work.groupby('Word').agg({
-        'Num Pinyin Wrong': 'sum',
-        'Quiz Attempts': 'sum',
-        'Pinyin': 'first',
-        'Meaning': 'first'
-    }).reset_index()
-    
-    # Filter: only words with > 1 attempt
-    top_pinyin = top_pinyin[top_pinyin['Quiz Attempts'] > 1]
-    
-    # Calculate error percentage
-    top_pinyin['Pinyin Wrong %'] = (
-        top_pinyin['Num Pinyin Wrong'] / top_pinyin['Quiz Attempts'] * 100
-    ).round(1)
-    
-    # Filter: at least 1 wrong
-    top_pinyin = top_pinyin[top_pinyin['Num Pinyin Wrong'] >= 1]
-    
-    # Sort by percentage desc, then by count desc
-    top_pinyin = top_pinyin.sort_values(
-        by=['Pinyin Wrong %', 'Num Pinyin Wrong'],
-        ascending=[False, False]
-    ).head(top_n)
-    
+    """Return top pinyin error words (same ranking as the visualization dashboard)."""
+    top_pinyin = rank_error_words(df, 'pinyin', top_n, extra_cols=('Pinyin', 'Meaning'))
     return top_pinyin[['Word', 'Pinyin', 'Meaning', 'Num Pinyin Wrong', 'Quiz Attempts', 'Pinyin Wrong %']]
 
 
 def fetch_top_meaning_errors(df: pd.DataFrame, top_n: int = DEFAULT_TOP_N) -> pd.DataFrame:
-    """Return top meaning error words (same logic as visualization dashboard)."""
-    work = df.copy()
-    
-    # Group by Word, aggregate meaning errors
-    top_meaning = work.groupby('Word').agg({
-        'Num Meaning Wrong': 'sum',
-        'Quiz Attempts': 'sum',
-        'Pinyin': 'first',
-        'Meaning': 'first'
-    }).reset_index()
-    
-    # Filter: only words with > 1 attempt
-    top_meaning = top_meaning[top_meaning['Quiz Attempts'] > 1]
-    
-    # Calculate error percentage
-    top_meaning['Meaning Wrong %'] = (
-        top_meaning['Num Meaning Wrong'] / top_meaning['Quiz Attempts'] * 100
-    ).round(1)
-    
-    # Filter: at least 1 wrong
-    top_meaning = top_meaning[top_meaning['Num Meaning Wrong'] >= 1]
-    
-    # Sort by percentage desc, then by count desc
-    top_meaning = top_meaning.sort_values(
-        by=['Meaning Wrong %', 'Num Meaning Wrong'],
-        ascending=[False, False]
-    ).head(top_n)
-    
+    """Return top meaning error words (same ranking as the visualization dashboard)."""
+    top_meaning = rank_error_words(df, 'meaning', top_n, extra_cols=('Pinyin', 'Meaning'))
     return top_meaning[['Word', 'Pinyin', 'Meaning', 'Num Meaning Wrong', 'Quiz Attempts', 'Meaning Wrong %']]
 
 
@@ -1,5 +1,8 @@
+import os
+
 import dash
-from dash import Dash, html, dcc
+import diskcache
+from dash import Dash, DiskcacheManager, html, dcc
 import dash_bootstrap_components as dbc
 from database import init_db, ensure_views_from_files
 
@@ -11,7 +14,10 @@ external_stylesheets = [
     dbc.themes.MATERIA,
     "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css"
     ]
-app = Dash(__name__, use_pages=True, external_stylesheets=external_stylesheets, suppress_callback_exceptions=True)
+# Background callbacks (quiz meaning grading) run in worker processes that report back through this cache
+background_callback_manager = DiskcacheManager(diskcache.Cache(os.getenv('DASH_CACHE_DIR', './.dash_cache')))
+app = Dash(__name__, use_pages=True, external_stylesheets=external_stylesheets, suppress_callback_exceptions=True,
+           background_callback_manager=background_callback_manager)
 
 def sidebar():
     return html.Div(
@@ -1,40 +1,297 @@
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import create_engine, event, inspect, text
-from models import WordDict, QuizAgg, PhraseDict, QuizLog, Base, WordComparison, APILatencyLog
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy import bindparam, create_engine, event, inspect, select, text
+from models import WordDict, QuizAgg, WordSchedule, PhraseDict, QuizLog, Base, WordComparison, APILatencyLog
 import hashlib
 import pandas as pd
 import uuid
 from datetime import datetime
 from pathlib import Path
 import os
+import re
 from dotenv import load_dotenv
 load_dotenv()
 
 
-engine = create_engine(f"sqlite:///{os.getenv('DB_PATH')}", future=True)
+# SQLite connection tuning, applied to every new connection (override in .env).  WAL lets readers
+# run while a write is in progress; busy_timeout makes writers wait for the lock instead of failing
+# with "database is locked".  Set SQLITE_JOURNAL_MODE=DELETE if the DB lives on a network drive.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'cache_size': -int(os.getenv('SQLITE_CACHE_SIZE_KB', '65536')),  # negative = KiB, not pages
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'temp_store': os.getenv('SQLITE_TEMP_STORE', 'MEMORY'),
+}
 
-# Turn on FK enforcement for SQLite connections on this engine
-if engine.url.get_backend_name() == "sqlite":
-    @event.listens_for(engine, "connect")
+# Connection pool: size it for the number of Dash worker threads/processes touching the DB at once
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '8'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '8'))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+
+
+def create_sqlite_engine(db_path: str, pragmas: dict = None, **engine_kwargs):
+    """
+    Create an engine for the SQLite file at db_path with foreign keys on and pragmas (default
+    SQLITE_PRAGMAS) set on every new connection.  engine_kwargs override the pool settings.
+    """
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+    options = {'pool_size': DB_POOL_SIZE, 'max_overflow': DB_MAX_OVERFLOW, 'pool_timeout': DB_POOL_TIMEOUT,
+               **engine_kwargs}
+    new_engine = create_engine(f"sqlite:///{db_path}", future=True, **options)
+
+    @event.listens_for(new_engine, "connect")
     def set_sqlite_pragma(dbapi_connection, _):
         # Works for pysqlite
         cursor = dbapi_connection.cursor()
         cursor.execute("PRAGMA foreign_keys=ON")
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
         cursor.close()
 
+    return new_engine
+
+
+engine = create_sqlite_engine(os.getenv('DB_PATH'))
+
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+
+def begin_immediate(session) -> None:
+    """
+    Start session's transaction with BEGIN IMMEDIATE, taking SQLite's write lock up front so that what
+    the transaction reads cannot change before it commits.  Call it before any other statement.
+    """
+    session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+
 def init_db() -> None:
     """Create any missing tables. Safe to call multiple times."""
     Base.metadata.create_all(bind=engine)
     backfill_pair_ids()
     migrate_quiz_log_columns()
+    migrate_api_latency_log_columns()
+    migrate_quiz_agg_columns()
+    migrate_word_schedule()
+    migrate_pinyin_normalized()
+    ensure_indexes()
+    ensure_fts()
+    ensure_data_versions()
+    seed_id_sequences()
+
+
+# Secondary indexes for the lookups the app runs (see diagnostics/query_plan_report.py).
+# CREATE INDEX IF NOT EXISTS, so existing databases pick up new entries on the next start.
+INDEXES = {
+    # QuizAgg rebuild and the QuizScore view join QuizLog on (word_id, word)
+    'ix_QuizLog_word_id_word': 'QuizLog (word_id, word)',
+    # count_overlap_word, load_known_words and sql_update_worddict look words up by text
+    'ix_WordDict_word': 'WordDict (word)',
+    # Tone-exact pinyin search in load_dict_page (see migrate_pinyin_normalized)
+    'ix_WordDict_pinyin_normalized': 'WordDict (pinyin_normalized)',
+    # Dictionary page filters (load_dict_page) and their dropdown options (load_dict_filter_options)
+    'ix_WordDict_added_date': 'WordDict (added_date)',
+    'ix_WordDict_word_category': 'WordDict (word_category)',
+    'ix_WordDict_word_rarity': 'WordDict (word_rarity)',
+    'ix_PhraseDict_category': 'PhraseDict (category)',
+    # Latency reporting filters by category and time window
+    'ix_APILatencyLog_timestamp': 'APILatencyLog (timestamp)',
+    'ix_APILatencyLog_category_timestamp': 'APILatencyLog (category, timestamp)',
+    # TTL eviction in main/llm_cache.py deletes by created_at
+    'ix_LLMResponseCache_created_at': 'LLMResponseCache (created_at)',
+}
+
+
+# Unique indexes; skipped with a warning while existing rows violate them.
+UNIQUE_INDEXES = {
+    # Conflict target for sql_update_worddict(upsert=True), which falls back to replacing words without it
+    'ux_WordDict_word_meaning': 'WordDict (word, meaning)',
+}
+
+
+def ensure_indexes() -> None:
+    """
+    Create any index in INDEXES or UNIQUE_INDEXES that does not exist yet, then refresh the
+    planner statistics.  Safe to call on every startup.
+    """
+    with engine.begin() as conn:
+        existing = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+        missing = [name for name in INDEXES if name not in existing]
+        for name in missing:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {INDEXES[name]}"))
+        for name, target in UNIQUE_INDEXES.items():
+            if name in existing:
+                continue
+            try:
+                conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {target}"))
+                missing.append(name)
+            except IntegrityError:
+                print(f"[ensure_indexes] {name} not created: {target} has duplicate rows")
+        if missing:
+            conn.execute(text("ANALYZE"))
+
+
+def has_index(name: str) -> bool:
+    """True if the index exists; a unique index in UNIQUE_INDEXES may be missing (see ensure_indexes)."""
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"), {'name': name}
+        ).first() is not None
+
+
+# Full-text indexes: FTS5 table -> (source table, indexed columns).  Each FTS row holds fts_text() of its
+# source row's columns under the same rowid.  There are no triggers, so any connection can write to the
+# source tables: the write functions in main/sql.py refresh the rows they touch (refresh_fts) in their
+# own transaction.  After writing to these tables outside the app (a notebook, the sqlite3 shell) or a
+# VACUUM (which can renumber rowids), rebuild with `python database.py rebuild-fts`; also after a change
+# to fts_text.
+FTS_TABLES = {
+    'WordDictFts': ('WordDict', ['word', 'pinyin', 'pinyin_simplified', 'meaning', 'sentence']),
+    'PhraseDictFts': ('PhraseDict', ['line', 'pinyin', 'meaning', 'response', 'response_pinyin', 'response_meaning']),
+    'WordComparisonFts': ('WordComparison', ['word1', 'word1_pinyin', 'word2', 'word2_pinyin', 'meaning']),
+}
+_FTS_BY_SOURCE = {source: name for name, (source, _) in FTS_TABLES.items()}
+
+_CJK_CHAR = re.compile(r"([\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\U00020000-\U0002fa1f])")
+_TONE_NUMBER = re.compile(r"(?<=[a-zü])[1-5](?!\d)", re.IGNORECASE)
+
+
+def fts_text(value):
+    """
+    Text as stored in the full-text index: each Chinese character becomes its own token (so a phrase
+    query matches any run of characters inside a word) and pinyin tone numbers are dropped
+    (ni3 -> ni).  Tone marks are removed by the tokenizer (remove_diacritics), so pinyin matches
+    regardless of tone.
+    """
+    if value is None:
+        return None
+    return _CJK_CHAR.sub(r" \1 ", _TONE_NUMBER.sub("", str(value)))
+
+
+def fts_match_query(search: str):
+    """
+    FTS5 MATCH expression for free-text search: every whitespace-separated term must match, Chinese
+    as consecutive characters and anything else as a word prefix.  Pinyin is indexed one syllable per
+    token, so a term that reads as several syllables (nihao, ni3hao3, nǐhǎo) also matches them as a
+    phrase: ("nihao"* OR "ni hao"*).  None when there is nothing to search.
+    """
+    from main.pinyin import pinyin_syllables
+
+    terms = []
+    for term in (search or "").split():
+        if not re.search(r"\w", term):
+            continue
+        phrase = '"' + fts_text(term).strip().replace('"', '""') + '"'
+        if _CJK_CHAR.match(term[-1]):
+            terms.append(phrase)
+            continue
+        syllables = pinyin_syllables(term, strict=True)
+        if syllables and len(syllables) > 1:
+            terms.append(f'({phrase}* OR "{" ".join(syllable for syllable, _ in syllables)}"*)')
+        else:
+            terms.append(phrase + "*")
+    # Explicit AND: FTS5 does not accept an implicit AND after a parenthesized group
+    return " AND ".join(terms) or None
+
+
+def _fts_insert(conn, name: str, rows) -> None:
+    # rows: (rowid, *columns) of the source table, in FTS_TABLES column order
+    columns = FTS_TABLES[name][1]
+    values = [{"rowid": row[0], **{col: fts_text(value) for col, value in zip(columns, row[1:])}} for row in rows]
+    if values:
+        conn.execute(text(f"INSERT INTO {name} (rowid, {', '.join(columns)}) "
+                          f"VALUES (:rowid, {', '.join(':' + col for col in columns)})"), values)
+
+
+# fts_rowids, formatted with the source table and key column (see diagnostics/query_plan_report.py)
+FTS_ROWIDS_SQL = "SELECT rowid FROM {source} WHERE {column} IN :values"
+
+
+def fts_rowids(conn, source: str, column: str, values) -> list:
+    """rowid of the rows of source whose column is one of values, e.g. to pass to refresh_fts."""
+    values, rowids = list(values), []
+    stmt = text(FTS_ROWIDS_SQL.format(source=source, column=column)).bindparams(
+        bindparam("values", expanding=True))
+    for i in range(0, len(values), 500):
+        rowids.extend(row[0] for row in conn.execute(stmt, {"values": values[i:i + 500]}))
+    return rowids
+
+
+def refresh_fts(conn, source: str, rowids) -> None:
+    """
+    Bring the full-text index of source (see FTS_TABLES) up to date for the rows with these rowids:
+    rows that still exist are indexed again, deleted ones are removed.  Runs in the transaction of conn
+    (a Connection or Session), after its writes.
+    """
+    name = _FTS_BY_SOURCE[source]
+    columns = FTS_TABLES[name][1]
+    rowids = sorted(set(rowids))
+    for i in range(0, len(rowids), 500):
+        chunk = {"rowids": rowids[i:i + 500]}
+        conn.execute(text(f"DELETE FROM {name} WHERE rowid IN :rowids").bindparams(
+            bindparam("rowids", expanding=True)), chunk)
+        rows = conn.execute(text(f"SELECT rowid, {', '.join(columns)} FROM {source} WHERE rowid IN :rowids")
+                            .bindparams(bindparam("rowids", expanding=True)), chunk)
+        _fts_insert(conn, name, rows.fetchall())
+
+
+def rebuild_fts(names=None) -> None:
+    """(Re)create the named full-text indexes (all of FTS_TABLES by default) and their contents."""
+    with engine.begin() as conn:
+        for name in (names or FTS_TABLES):
+            source, columns = FTS_TABLES[name]
+            # Triggers of the earlier contentless indexes
+            for suffix in ("ai", "ad", "au"):
+                conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}_{suffix}")
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS {name}")
+            conn.exec_driver_sql(
+                f"CREATE VIRTUAL TABLE {name} USING fts5({', '.join(columns)}, "
+                f"tokenize='unicode61 remove_diacritics 2')"
+            )
+            rows = conn.execute(text(f"SELECT rowid, {', '.join(columns)} FROM {source}")).fetchall()
+            _fts_insert(conn, name, rows)
+
+
+def ensure_fts() -> None:
+    """
+    Build any full-text index in FTS_TABLES that does not exist yet, or still has the triggers of the
+    earlier contentless indexes.  Safe to call on every startup.
+    """
+    with engine.connect() as conn:
+        existing = {row[0] for row in conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')"))}
+    stale = [name for name in FTS_TABLES if name not in existing or f"{name}_ai" in existing]
+    if stale:
+        rebuild_fts(stale)
+
+
+# Tables whose writes are counted in DataVersion, for the caches in main/data_cache.py and the like.
+# The triggers are plain SQL, so writes from any connection count: the app's own, the rebuild commands
+# below, a notebook or another process.
+DATA_VERSION_TABLES = ('WordDict', 'QuizAgg', 'WordSchedule', 'QuizLog', 'PhraseDict', 'WordComparison',
+                       'ResponseLog', 'TranslationLog')
+
+
+def ensure_data_versions() -> None:
+    """
+    Create the DataVersion row and the write-counting triggers of each table in DATA_VERSION_TABLES.
+    Safe to call on every startup.
+    """
+    with engine.begin() as conn:
+        for table in DATA_VERSION_TABLES:
+            conn.execute(text("INSERT OR IGNORE INTO DataVersion (table_name, version) VALUES (:table, 0)"),
+                         {"table": table})
+            for suffix, event_sql in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE")):
+                conn.exec_driver_sql(
+                    f"CREATE TRIGGER IF NOT EXISTS {table}_data_version_{suffix} AFTER {event_sql} ON {table} "
+                    f"BEGIN UPDATE DataVersion SET version = version + 1 WHERE table_name = '{table}'; END"
+                )
 
 
 def migrate_quiz_log_columns() -> None:
     """
-    Add is_top_pinyin_error and is_top_meaning_error columns to QuizLog if missing.
+    Add the is_top_pinyin_error, is_top_meaning_error, pinyin_error_type and meaning_grading_source
+    columns to QuizLog if missing.
     Safe to call on every startup — no-op once columns exist.
     """
     with engine.begin() as conn:
@@ -43,6 +300,185 @@ def migrate_quiz_log_columns() -> None:
             conn.execute(text("ALTER TABLE QuizLog ADD COLUMN is_top_pinyin_error INTEGER"))
         if 'is_top_meaning_error' not in existing:
             conn.execute(text("ALTER TABLE QuizLog ADD COLUMN is_top_meaning_error INTEGER"))
+        if 'pinyin_error_type' not in existing:
+            conn.execute(text("ALTER TABLE QuizLog ADD COLUMN pinyin_error_type TEXT"))
+        if 'meaning_grading_source' not in existing:
+            conn.execute(text("ALTER TABLE QuizLog ADD COLUMN meaning_grading_source TEXT"))
+
+
+def migrate_api_latency_log_columns() -> None:
+    """
+    Add the cache_hit column to APILatencyLog if missing.
+    Safe to call on every startup — no-op once the column exists.
+    """
+    with engine.begin() as conn:
+        existing = [row[1] for row in conn.execute(text("PRAGMA table_info(APILatencyLog)"))]
+        if 'cache_hit' not in existing:
+            conn.execute(text("ALTER TABLE APILatencyLog ADD COLUMN cache_hit INTEGER"))
+
+
+def migrate_quiz_agg_columns() -> None:
+    """
+    Add the pinyin/meaning counter columns to QuizAgg if missing, and rebuild QuizAgg from QuizLog
+    when they were just added or some WordDict rows have no QuizAgg row yet.
+    Safe to call on every startup — no-op once QuizAgg is populated.
+    """
+    with engine.begin() as conn:
+        existing = [row[1] for row in conn.execute(text("PRAGMA table_info(QuizAgg)"))]
+        added = False
+        for col in ('pinyin_correct_cnt', 'pinyin_wrong_cnt', 'meaning_correct_cnt', 'meaning_wrong_cnt'):
+            if col not in existing:
+                conn.execute(text(f"ALTER TABLE QuizAgg ADD COLUMN {col} INTEGER DEFAULT 0"))
+                added = True
+        missing = conn.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM WordDict LEFT JOIN QuizAgg USING (word_id) WHERE QuizAgg.word_id IS NULL)"
+        )).scalar()
+        if added or missing:
+            rebuild_quiz_agg(conn)
+
+
+# WordDict.pinyin_normalized is main.pinyin.normalize_pinyin of pinyin_simplified (pinyin when that is
+# empty), see word_pinyin_normalized.  The WordDict write functions in main/sql.py set it, so the table
+# needs no triggers or SQL functions.  Rows written outside the app without it are filled in on the next
+# start (init_db); recompute every row with `python database.py rebuild-pinyin` after a change to
+# main/pinyin.py or after editing pinyin outside the app.
+# Triggers that kept the column in step with a SQL function only the app registered; dropped on startup
+_PINYIN_NORMALIZED_TRIGGERS = ('WordDict_pinyin_normalized_ai', 'WordDict_pinyin_normalized_au')
+
+
+def word_pinyin_normalized(pinyin, pinyin_simplified):
+    """WordDict.pinyin_normalized of a row with these pinyin and pinyin_simplified values."""
+    from main.pinyin import normalize_pinyin
+
+    return normalize_pinyin(pinyin_simplified or pinyin)
+
+
+def _fill_pinyin_normalized(conn, only_missing: bool) -> int:
+    where = " WHERE pinyin_normalized IS NULL" if only_missing else ""
+    rows = conn.execute(text(f"SELECT rowid, pinyin, pinyin_simplified FROM WordDict{where}")).fetchall()
+    values = [{"rowid": rowid, "value": word_pinyin_normalized(pinyin, pinyin_simplified)}
+              for rowid, pinyin, pinyin_simplified in rows]
+    if values:
+        conn.execute(text("UPDATE WordDict SET pinyin_normalized = :value WHERE rowid = :rowid"), values)
+    return len(values)
+
+
+def migrate_pinyin_normalized() -> None:
+    """
+    Add WordDict.pinyin_normalized if missing, drop its old triggers, and fill it for rows that have none.
+    Safe to call on every startup.
+    """
+    with engine.begin() as conn:
+        existing = [row[1] for row in conn.execute(text("PRAGMA table_info(WordDict)"))]
+        if 'pinyin_normalized' not in existing:
+            conn.execute(text("ALTER TABLE WordDict ADD COLUMN pinyin_normalized TEXT"))
+        for name in _PINYIN_NORMALIZED_TRIGGERS:
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        _fill_pinyin_normalized(conn, only_missing=True)
+
+
+def rebuild_pinyin_normalized() -> int:
+    """Recompute WordDict.pinyin_normalized for every row.  Returns the number of rows updated."""
+    with engine.begin() as conn:
+        return _fill_pinyin_normalized(conn, only_missing=False)
+
+
+# Same statistics as sql/views/QuizScore.sql, one row per WordDict word (zeros when never quizzed).
+QUIZ_AGG_REBUILD_SQL = """
+    INSERT INTO QuizAgg (word_id, num_quiz_attempt, num_correct, num_wrong, last_quiz,
+                         pinyin_correct_cnt, pinyin_wrong_cnt, meaning_correct_cnt, meaning_wrong_cnt)
+    SELECT
+        WordDict.word_id,
+        COUNT(QuizLog.quiz_id),
+        0,
+        0,
+        MAX(QuizLog.last_quiz),
+        SUM(CASE WHEN lower(QuizLog.pinyin_correct)='yes' THEN 1 ELSE 0 END),
+        SUM(CASE WHEN lower(QuizLog.pinyin_correct)='no'  THEN 1 ELSE 0 END),
+        SUM(CASE WHEN lower(QuizLog.meaning_correct)='yes' THEN 1 ELSE 0 END),
+        SUM(CASE WHEN lower(QuizLog.meaning_correct)='no'  THEN 1 ELSE 0 END)
+    FROM WordDict
+    LEFT JOIN QuizLog ON (WordDict.word_id = QuizLog.word_id) AND (WordDict.word = QuizLog.word)
+    GROUP BY WordDict.word_id
+"""
+
+
+def rebuild_quiz_agg(conn=None) -> int:
+    """
+    Recompute every QuizAgg row from the full QuizLog history.  Runs in conn's transaction when
+    given, otherwise in its own.  Returns the number of rows written.
+    """
+    if conn is None:
+        with engine.begin() as conn:
+            return rebuild_quiz_agg(conn)
+    conn.execute(text("DELETE FROM QuizAgg"))
+    return conn.execute(text(QUIZ_AGG_REBUILD_SQL)).rowcount
+
+
+def migrate_word_schedule() -> None:
+    """
+    Fill WordSchedule from the QuizLog history when it is empty but quizzes have been logged (a
+    database from before spaced-repetition scheduling).  Safe to call on every startup.
+    """
+    with engine.begin() as conn:
+        needs_rebuild = conn.execute(text(
+            "SELECT NOT EXISTS (SELECT 1 FROM WordSchedule) AND EXISTS (SELECT 1 FROM QuizLog)"
+        )).scalar()
+        if needs_rebuild:
+            rebuild_word_schedule(conn)
+
+
+def rebuild_word_schedule(conn=None) -> int:
+    """
+    Recompute every WordSchedule row by replaying QuizLog in order (main.scheduler), counting only
+    rows whose word still exists in WordDict under the same word, as QuizAgg does.  Runs in conn's
+    transaction when given, otherwise in its own.  Returns the number of rows written.
+    """
+    from main.scheduler import apply_reviews
+
+    if conn is None:
+        with engine.begin() as conn:
+            return rebuild_word_schedule(conn)
+    reviews = conn.execute(
+        select(QuizLog.word_id, QuizLog.pinyin_correct, QuizLog.meaning_correct, QuizLog.last_quiz)
+        .join(WordDict, (WordDict.word_id == QuizLog.word_id) & (WordDict.word == QuizLog.word))
+        .where(QuizLog.last_quiz.is_not(None))
+        .order_by(QuizLog.last_quiz, QuizLog.quiz_id)
+    )
+    schedules = apply_reviews(reviews)
+    conn.execute(text("DELETE FROM WordSchedule"))
+    if schedules:
+        conn.execute(WordSchedule.__table__.insert(),
+                     [{'word_id': word_id, **state} for word_id, state in schedules.items()])
+    return len(schedules)
+
+
+# ID prefix -> (table, column) it numbers.  IDs are the prefix plus a zero-padded counter, e.g. D000042.
+ID_SEQUENCES = {
+    'D': ('WordDict', 'word_id'),
+    'P': ('PhraseDict', 'phrase_id'),
+    'QW': ('QuizLog', 'quiz_id'),
+    'QR': ('ResponseLog', 'quiz_id'),
+    'QT': ('TranslationLog', 'quiz_id'),
+}
+
+
+def seed_id_sequences(conn=None, prefixes=None) -> None:
+    """
+    Create the IdSequence row for each prefix that has none, starting from the highest ID already
+    in its table.  Runs in conn's transaction when given.  Safe to call on every startup.
+    """
+    if conn is None:
+        with engine.begin() as conn:
+            return seed_id_sequences(conn, prefixes)
+    for prefix in (prefixes or ID_SEQUENCES):
+        table, column = ID_SEQUENCES[prefix]
+        conn.execute(text(f"""
+            INSERT OR IGNORE INTO IdSequence (prefix, last_value)
+            SELECT :prefix, COALESCE(MAX(CAST(SUBSTR({column}, :start) AS INTEGER)), 0)
+            FROM {table}
+            WHERE {column} LIKE :pattern
+        """), {"prefix": prefix, "start": len(prefix) + 1, "pattern": f"{prefix}%"})
 
 
 def backfill_pair_ids() -> None:
@@ -85,4 +521,34 @@ def ensure_views_from_files(dir_rel: str = "sql/views") -> None:
 
             # SQLite doesn't support CREATE OR REPLACE VIEW → use DROP first
             conn.execute(text(f"DROP VIEW IF EXISTS {name}"))
-            conn.execute(text(f"CREATE VIEW {name} AS {sql_body}"))
\ No newline at end of file
+            conn.execute(text(f"CREATE VIEW {name} AS {sql_body}"))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Database maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("init", help="Create missing tables and run migrations")
+    subparsers.add_parser("rebuild-quiz-agg", help="Recompute QuizAgg from the full QuizLog history")
+    subparsers.add_parser("rebuild-word-schedule", help="Recompute WordSchedule by replaying the QuizLog history")
+    subparsers.add_parser("rebuild-pinyin", help="Recompute WordDict.pinyin_normalized from the pinyin columns")
+    subparsers.add_parser("rebuild-fts", help="Recreate the full-text search indexes from their tables")
+    args = parser.parse_args()
+
+    if args.command == "init":
+        init_db()
+        print("Database initialized.")
+    elif args.command == "rebuild-quiz-agg":
+        init_db()
+        print(f"Rebuilt QuizAgg: {rebuild_quiz_agg()} word(s).")
+    elif args.command == "rebuild-word-schedule":
+        init_db()
+        print(f"Rebuilt WordSchedule: {rebuild_word_schedule()} word(s).")
+    elif args.command == "rebuild-pinyin":
+        init_db()
+        print(f"Rebuilt normalized pinyin: {rebuild_pinyin_normalized()} word(s).")
+    elif args.command == "rebuild-fts":
+        init_db()
+        rebuild_fts()
+        print(f"Rebuilt full-text indexes: {', '.join(FTS_TABLES)}.")
@@ -0,0 +1,50 @@
+"""
+Diagnostic: Measure the shared dictionary cache (main/data_cache.py) against calling load_dict() directly.
+
+Steps:
+  1. Time load_dict() against the configured database.
+  2. Read the dictionary through get_dict_df() repeatedly, simulating page callbacks, with a
+     simulated write (a WordDict bump in DataVersion, no rows changed) every `write_every` reads.
+  3. Report per-read timings and the cache's hit/miss counters and load times.
+
+Only the WordDict counter in DataVersion is written to.
+Run from the repo root:  python diagnostics/bench_data_cache.py [reads] [write_every]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+
+from sqlalchemy import text
+
+from database import engine
+from main.sql import load_dict
+from main.data_cache import data_cache, get_dict_df
+
+
+reads = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+write_every = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+start = time.perf_counter()
+df = load_dict()
+direct_s = time.perf_counter() - start
+
+print("=" * 65)
+print(f"Dictionary: {len(df)} rows; {reads} reads, a write every {write_every} reads")
+print("=" * 65)
+
+start = time.perf_counter()
+for i in range(1, reads + 1):
+    get_dict_df()
+    if write_every and i % write_every == 0:
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE DataVersion SET version = version + 1 WHERE table_name = 'WordDict'"))
+cached_s = time.perf_counter() - start
+
+stats = data_cache.stats()['dict']
+print(f"load_dict() per call:         {direct_s * 1000:8.2f} ms")
+print(f"get_dict_df() per read (avg): {cached_s / reads * 1000:8.2f} ms")
+print(f"hits={stats['hits']} misses={stats['misses']} hit_rate={stats['hit_rate']:.1%}")
+print(f"total load time: {stats['load_seconds'] * 1000:.1f} ms, last load: {stats['last_load_seconds'] * 1000:.1f} ms")
@@ -0,0 +1,71 @@
+"""
+Diagnostic: Benchmark parse_response_table against the previous read_csv-based implementation.
+
+Steps:
+  1. Build a synthetic 500-row translation table (the shape get_prompt_for_chinese_translation
+     returns, plus the rarity columns).
+  2. Parse it with the legacy pd.read_csv(delimiter='|', engine='python') + element-wise strip path.
+  3. Parse it with the current single-pass parser.
+  4. Check both produce the same table and report timings.
+
+Run from the repo root:  python diagnostics/bench_parse_response_table.py [num_rows] [repeats]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import timeit
+from io import StringIO
+
+import pandas as pd
+
+from main.utils import parse_response_table
+
+
+def legacy_parse_response_table(content: str) -> pd.DataFrame:
+    """The parser as it was before the single-pass rewrite (without ffill/date handling)."""
+    df = pd.read_csv(StringIO(content), delimiter='|', engine='python')
+    df.columns = df.columns.str.strip()
+    df = df.map(lambda x: x.strip() if isinstance(x, str) else x)
+    df = df[[col for col in df if 'Unnamed' not in col]]
+    col_name = df.select_dtypes(include=['object', 'string']).columns[0]
+    df = df.loc[~df[col_name].fillna('').str.contains('--')]
+    return df
+
+
+def build_table(num_rows: int) -> str:
+    columns = ['Word', 'Pinyin', 'Pinyin Simplified', 'Type', 'Word Category', 'Meaning',
+               'Sentence', 'Sentence Pinyin', 'Sentence Meaning', 'Word Rarity', 'Rarity Score']
+    lines = ['| ' + ' | '.join(columns) + ' |', '|' + '|'.join(['---'] * len(columns)) + '|']
+    for i in range(num_rows):
+        lines.append(
+            f"| 农场{i} | nóng chǎng | nong2 chang3 | Noun | Agriculture | Farm; a place for growing crops {i} "
+            f"| 我暑假打算去爷爷的农场帮忙 | Wǒ shǔjià dǎsuàn qù yéye de nóngchǎng bāngmáng. "
+            f"| I plan to go to my grandfather's farm to help during the summer vacation. | Common | {1 + i % 3} |"
+        )
+    return '\n'.join(lines)
+
+
+num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+content = build_table(num_rows)
+
+print("=" * 65)
+print(f"Parsing a {num_rows}-row translation table, best of {repeats} runs")
+print("=" * 65)
+
+legacy_df = legacy_parse_response_table(content).reset_index(drop=True)
+new_df = parse_response_table(content)
+# The legacy path left every column as strings (the separator row blocked type inference),
+# so compare values as text and report the dtypes separately.
+pd.testing.assert_frame_equal(legacy_df.astype(str), new_df.astype(str), check_dtype=False)
+print(f"Outputs match: {new_df.shape[0]} rows x {new_df.shape[1]} columns")
+print(f"Rarity Score dtype: legacy={legacy_df['Rarity Score'].dtype}, new={new_df['Rarity Score'].dtype}")
+
+legacy_s = min(timeit.repeat(lambda: legacy_parse_response_table(content), number=1, repeat=repeats))
+new_s = min(timeit.repeat(lambda: parse_response_table(content), number=1, repeat=repeats))
+
+print(f"legacy read_csv(engine='python'): {legacy_s * 1000:8.2f} ms")
+print(f"single-pass parser:                {new_s * 1000:8.2f} ms")
+print(f"speed-up:                          {legacy_s / new_s:8.1f}x")
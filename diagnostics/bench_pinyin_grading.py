@@ -0,0 +1,87 @@
+"""
+Diagnostic: Time and compare pinyin grading (main/pinyin.py, used by QuizGenerator.check_pinyin) against
+the per-row string clean-up it replaced.
+
+Steps:
+  1. Build synthetic (expected, answer) pairs from a small set of words, with answers written in the
+     forms users type: tone numbers, tone marks, unspaced, v / ü / u:, neutral tone as 5 or nothing,
+     erhua with the tone before or after the r, plus wrong tones, initials and finals.
+  2. Grade them with the previous rule (strip spaces, lowercase, drop '5', compare) and with
+     normalize_pinyin_series + pinyin_error_types.
+  3. Print timings, how often the two disagree, and the error types found.
+
+Run from the repo root:  python diagnostics/bench_pinyin_grading.py [pairs] [repeats]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from main.pinyin import normalize_pinyin_series, pinyin_error_types
+
+
+num_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+# expected (numbered, as in Pinyin Simplified) -> answers a user might type
+WORDS = {
+    'ni3 hao3': ['ni3 hao3', 'ni3hao3', 'nǐ hǎo', 'Nǐhǎo', 'ni2 hao3', 'li3 hao3', 'ni3 hao'],
+    'lv4 se4': ['lv4 se4', 'lü4 se4', 'lu:4se4', 'lǜsè', 'lu4 se4', 'lv4 si4'],
+    'peng2 you5': ['peng2 you5', 'peng2 you', 'péngyou', 'peng2you0', 'pen2 you', 'peng2 you3'],
+    'xi1 an1': ["xi1'an1", 'xī ān', "xī'ān", 'xian1', 'xi1 an2'],
+    'zhong1 guo2': ['zhong1guo2', 'zhōngguó', 'zong1 guo2', 'zhong1 guo3', 'zhong guo'],
+    'yi1 dian3r': ['yī diǎnr', 'yi1 dian3r', 'yi1 dianr3', 'yīdiǎnr', 'yi1dian3r', 'yi1 dian3', 'yi1 dian2r'],
+    'wan2r': ['wánr', 'wan2r', 'wanr2', 'wan2', 'wan3r'],
+    'nv3 er2': ["nǚ'ér", 'nv3er2', 'nǚér', 'nv3 er3'],
+}
+
+
+def legacy_grade(expected: pd.Series, answer: pd.Series) -> pd.Series:
+    """check_pinyin's comparison before main/pinyin.py."""
+    expected = expected.fillna('').apply(lambda x: x.replace(' ', '').lower().replace('5', ''))
+    answer = answer.fillna('').apply(lambda x: x.replace(' ', '').lower().replace('5', ''))
+    return expected == answer
+
+
+def current_grade(expected: pd.Series, answer: pd.Series) -> tuple:
+    expected, answer = normalize_pinyin_series(expected), normalize_pinyin_series(answer)
+    error_types = pinyin_error_types(expected, answer)
+    return expected == answer, error_types
+
+
+def best_of(fn, *args) -> tuple:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(*args)
+        times.append(time.perf_counter() - start)
+    return result, min(times) * 1000
+
+
+rng = np.random.default_rng(0)
+pairs = [(expected, answer) for expected, answers in WORDS.items() for answer in answers]
+picks = rng.integers(0, len(pairs), num_pairs)
+expected = pd.Series([pairs[i][0] for i in picks])
+answer = pd.Series([pairs[i][1] for i in picks])
+
+legacy_correct, legacy_ms = best_of(legacy_grade, expected, answer)
+(correct, error_types), current_ms = best_of(current_grade, expected, answer)
+
+print("=" * 65)
+print(f"{num_pairs} graded answers, {len(pairs)} distinct (expected, answer) pairs; best of {repeats}")
+print("=" * 65)
+print(f"{'legacy (apply chain)':<28} {legacy_ms:>10.1f} ms   {legacy_correct.mean():6.1%} marked correct")
+print(f"{'normalized':<28} {current_ms:>10.1f} ms   {correct.mean():6.1%} marked correct")
+print()
+print("Distinct pairs where the two disagree:")
+for (exp, ans), old, new, kind in sorted(set(zip(zip(expected, answer), legacy_correct, correct, error_types))):
+    if old != new:
+        print(f"  {exp:<12} {ans:<12} legacy={'yes' if old else 'no':<4} now={'yes' if new else 'no':<4} {kind}")
+print()
+print("Error types:")
+print(error_types[~correct].value_counts().to_string())
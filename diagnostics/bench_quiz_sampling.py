@@ -0,0 +1,98 @@
+"""
+Diagnostic: Time quiz generation through the sampling index (main/sampling.py) against filtering and
+re-weighting the dictionary frame on every quiz.
+
+Steps:
+  1. Build a synthetic load_dict()-shaped dictionary (no database needed).
+  2. Time QuizGenerator(df=...).generate_pinyin_and_meaning_quiz (the frame path: copy, mask, weights,
+     Series.sample) for a few filter combinations.
+  3. Time building a QuizSampler, drawing the same quizzes from it, and applying a scored quiz with
+     record_results (the incremental update done after each save).
+
+Run from the repo root:  python diagnostics/bench_quiz_sampling.py [words] [quiz_size] [repeats]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from main.quiz import QuizGenerator
+from main.sampling import QuizSampler
+
+
+num_words = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+quiz_size = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+CASES = {
+    'no filter': {},
+    'category': {'category_filter': 'Food'},
+    'category + rarity + date': {'category_filter': 'Food', 'rarity_filter': ['Rare', 'Uncommon'],
+                                 'date_filter': '2024-06-01'},
+    'new words only': {'new_words_only': True},
+}
+
+
+def synthetic_dict(num_words: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    attempts = rng.poisson(2, num_words)
+    pinyin_correct = rng.binomial(attempts, 0.8)
+    meaning_correct = rng.binomial(attempts, 0.7)
+    categories = np.array([f'Category {i}' for i in range(30)] + ['Food'])
+    return pd.DataFrame({
+        'Word Id': [f'D{i:06d}' for i in range(1, num_words + 1)],
+        'Word': [f'词{i}' for i in range(num_words)],
+        'Pinyin': 'pin', 'Pinyin Simplified': 'pin1', 'Meaning': 'meaning',
+        'Added Date': [f'2024-{m:02d}-01 00:00:00.000000' for m in rng.integers(1, 13, num_words)],
+        'Word Category': rng.choice(categories, num_words),
+        'Word Rarity': rng.choice(['Common', 'Uncommon', 'Rare'], num_words),
+        'Sentence': 's', 'Sentence Pinyin': 'sp',
+        'Quiz Attempts': attempts,
+        'Num Pinyin Correct': pinyin_correct, 'Num Pinyin Wrong': attempts - pinyin_correct,
+        'Num Meaning Correct': meaning_correct, 'Num Meaning Wrong': attempts - meaning_correct,
+    })
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+df = synthetic_dict(num_words)
+generator = QuizGenerator(df=df)
+
+start = time.perf_counter()
+sampler = QuizSampler(df)
+sampler.sample(1)  # builds the default adaptive tree
+build_ms = (time.perf_counter() - start) * 1000
+
+print("=" * 70)
+print(f"Synthetic dictionary: {num_words} words; {quiz_size}-word quizzes, mean of {repeats}")
+print("=" * 70)
+print(f"{'':<28} {'frame ms':>10} {'index ms':>10} {'speedup':>9}")
+for name, filters in CASES.items():
+    frame_ms = timed(lambda: generator.generate_pinyin_and_meaning_quiz(num_words=quiz_size, **filters))
+    index_filters = {
+        'categories': [filters['category_filter']] if 'category_filter' in filters else None,
+        'rarities': filters.get('rarity_filter'),
+        'date_filter': filters.get('date_filter'),
+        'new_words_only': filters.get('new_words_only', False),
+    }
+    index_ms = timed(lambda: df.iloc[sampler.sample(quiz_size, **index_filters)])
+    print(f"{name:<28} {frame_ms:>10.2f} {index_ms:>10.2f} {frame_ms / index_ms:>8.0f}x")
+
+result = pd.DataFrame({
+    'Word Id': df['Word Id'].sample(quiz_size, random_state=0),
+    'Pinyin Correct': 'no', 'Meaning Correct': 'yes',
+})
+record_ms = timed(lambda: sampler.record_results(result))
+print()
+print(f"Index build (once per dictionary change): {build_ms:8.1f} ms")
+print(f"record_results per saved quiz:            {record_ms:8.2f} ms")
@@ -0,0 +1,114 @@
+"""
+Diagnostic: Reader latency while a writer is busy, with the old SQLite defaults vs the tuned pragmas.
+
+Steps:
+  1. Create a scratch database (a temp file, never DB_PATH) with a QuizLog-shaped table.
+  2. For each configuration, run one writer thread committing batches of inserts (like quiz saves and
+     the API latency logger) alongside several reader threads running an aggregate query (like
+     load_dict / the statistics page) for a fixed duration.  Readers keep their read open for
+     hold_ms after the query (as read_sql does while building the DataFrame), and the writer spends
+     hold_ms inside its transaction before committing (as the ORM does between statements).
+  3. Report reads completed, reader latency percentiles, writer commits, and "database is locked" errors.
+
+Configurations: "legacy" = rollback journal, synchronous=FULL, no busy_timeout (what database.py used
+to do, i.e. only pysqlite's 5s lock timeout); "tuned" = database.SQLITE_PRAGMAS (WAL, synchronous=NORMAL, busy_timeout, ...).
+Run from the repo root:  python diagnostics/bench_sqlite_concurrency.py [seconds] [readers] [batch_rows] [hold_ms]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from database import create_sqlite_engine, SQLITE_PRAGMAS
+
+
+CONFIGS = {
+    'legacy': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+    'tuned': SQLITE_PRAGMAS,
+}
+
+seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+num_readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+batch_rows = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+hold_s = (float(sys.argv[4]) if len(sys.argv) > 4 else 20) / 1000
+
+
+def run(name: str, pragmas: dict, db_path: str) -> dict:
+    engine = create_sqlite_engine(db_path, pragmas=pragmas, pool_size=num_readers + 1)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS quiz"))
+        conn.execute(text("CREATE TABLE quiz (id INTEGER PRIMARY KEY, word_id TEXT, correct TEXT, payload TEXT)"))
+        conn.execute(text("INSERT INTO quiz (word_id, correct, payload) VALUES (:w, :c, :p)"),
+                     [{'w': f'D{i % 5000:06d}', 'c': 'yes' if i % 3 else 'no', 'p': 'x' * 200} for i in range(50000)])
+
+    stop = threading.Event()
+    latencies, errors, commits = [], {'read': 0, 'write': 0}, [0]
+    lock = threading.Lock()
+
+    def writer():
+        rows = [{'w': f'D{i % 5000:06d}', 'c': 'yes', 'p': 'y' * 200} for i in range(batch_rows)]
+        while not stop.is_set():
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text("INSERT INTO quiz (word_id, correct, payload) VALUES (:w, :c, :p)"), rows)
+                    time.sleep(hold_s)
+                commits[0] += 1
+            except OperationalError:
+                errors['write'] += 1
+                time.sleep(0.01)
+
+    def reader():
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    # Fixed-size read (the seeded rows) so latency does not grow with the writer's progress.
+                    # The statement stays open (holding its read lock) until the last row is fetched.
+                    result = conn.execute(text("SELECT word_id, correct FROM quiz WHERE id <= 5000"))
+                    result.fetchmany(100)
+                    time.sleep(hold_s)
+                    result.fetchall()
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+            except OperationalError:
+                with lock:
+                    errors['read'] += 1
+                time.sleep(0.01)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(num_readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    latencies.sort()
+    pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else float('nan')
+    return {
+        'name': name, 'reads': len(latencies), 'read_errors': errors['read'],
+        'p50_ms': pct(0.50), 'p99_ms': pct(0.99), 'max_ms': latencies[-1] * 1000 if latencies else float('nan'),
+        'mean_ms': statistics.mean(latencies) * 1000 if latencies else float('nan'),
+        'commits': commits[0], 'write_errors': errors['write'],
+    }
+
+
+print("=" * 78)
+print(f"{num_readers} readers + 1 writer ({batch_rows} rows/commit), {hold_s * 1000:.0f}ms hold, "
+      f"{seconds:.0f}s per configuration")
+print("=" * 78)
+print(f"{'config':<8} {'reads':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'read err':>9} {'commits':>8} {'write err':>10}")
+with tempfile.TemporaryDirectory() as tmp:
+    for name, pragmas in CONFIGS.items():
+        r = run(name, pragmas, os.path.join(tmp, f'{name}.db'))
+        print(f"{r['name']:<8} {r['reads']:>7} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['max_ms']:>8.1f} "
+              f"{r['read_errors']:>9} {r['commits']:>8} {r['write_errors']:>10}")
@@ -0,0 +1,99 @@
+"""
+Diagnostic: Time get_top_error_word_ids (main/ranking.py) against the per-word loop it replaced.
+
+Steps:
+  1. Build a synthetic load_dict()-shaped dictionary (no database needed). Some words get several
+     word_ids (meanings), as in the real table.
+  2. Run the previous implementation (kept below as legacy_top_error_word_ids) and the current one
+     for both error types, and check they return the same IDs.
+  3. Time both, and rank_error_words with the Pinyin/Meaning columns the email and chart use.
+
+Run from the repo root:  python diagnostics/bench_top_errors.py [words] [n] [repeats]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from main.ranking import get_top_error_word_ids, rank_error_words
+
+
+num_words = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+top_n = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+
+def legacy_top_error_word_ids(df: pd.DataFrame, n: int = 20, error_type: str = 'pinyin') -> list:
+    """get_top_error_word_ids as it was in main/quiz.py: one boolean mask over df per top word."""
+    work = df.copy()
+    work['Num Pinyin Wrong'] = work['Quiz Attempts'] - work['Num Pinyin Correct']
+    work['Num Meaning Wrong'] = work['Quiz Attempts'] - work['Num Meaning Correct']
+    wrong_col = 'Num Meaning Wrong' if error_type == 'meaning' else 'Num Pinyin Wrong'
+    agg = (
+        work.groupby('Word')
+        .agg(num_wrong=(wrong_col, 'sum'), quiz_attempts=('Quiz Attempts', 'sum'))
+        .reset_index()
+    )
+    agg = agg[agg['quiz_attempts'] > 1]
+    agg['pct'] = agg['num_wrong'] / agg['quiz_attempts']
+    top_words_series = (
+        agg[agg['num_wrong'] >= 1]
+        .sort_values(by=['pct', 'num_wrong'], ascending=[False, False])
+        .head(n)['Word']
+    )
+    word_ids = []
+    for word in top_words_series:
+        word_rows = work[work['Word'] == word]
+        rows_with_history = word_rows[word_rows['Quiz Attempts'] > 0]
+        if not rows_with_history.empty:
+            best_row = rows_with_history.loc[rows_with_history[wrong_col].idxmax()]
+            word_ids.append(str(best_row['Word Id']))
+        elif not word_rows.empty:
+            word_ids.append(str(np.random.choice(word_rows['Word Id'].tolist())))
+    return word_ids
+
+
+def synthetic_dict(num_words: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    # ~10% of words have a second meaning (a second row with the same Word)
+    words = [f'词{i}' for i in range(num_words)]
+    words += list(rng.choice(words, size=num_words // 10, replace=False))
+    rows = len(words)
+    attempts = rng.poisson(3, rows)
+    return pd.DataFrame({
+        'Word Id': [f'D{i:06d}' for i in range(1, rows + 1)],
+        'Word': words,
+        'Pinyin': [f'pin{i}' for i in range(rows)],
+        'Meaning': [f'meaning {i}' for i in range(rows)],
+        'Quiz Attempts': attempts,
+        'Num Pinyin Correct': rng.binomial(attempts, 0.8),
+        'Num Meaning Correct': rng.binomial(attempts, 0.7),
+    })
+
+
+def best_of(fn, *args, **kwargs) -> tuple:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        times.append(time.perf_counter() - start)
+    return result, min(times) * 1000
+
+
+df = synthetic_dict(num_words)
+print("=" * 65)
+print(f"Synthetic dictionary: {num_words} words, {len(df)} rows; top {top_n}, best of {repeats}")
+print("=" * 65)
+print(f"{'':<34} {'legacy ms':>10} {'current ms':>11} {'same IDs':>9}")
+for error_type in ('pinyin', 'meaning'):
+    legacy_ids, legacy_ms = best_of(legacy_top_error_word_ids, df, n=top_n, error_type=error_type)
+    ids, current_ms = best_of(get_top_error_word_ids, df, n=top_n, error_type=error_type)
+    print(f"{'get_top_error_word_ids ' + error_type:<34} {legacy_ms:>10.1f} {current_ms:>11.1f} {str(ids == legacy_ids):>9}")
+
+_, rank_ms = best_of(rank_error_words, df, 'pinyin', top_n, extra_cols=('Pinyin', 'Meaning'))
+print(f"{'rank_error_words (email/chart)':<34} {'':>10} {rank_ms:>11.1f}")
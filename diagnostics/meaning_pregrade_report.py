@@ -0,0 +1,77 @@
+"""
+Diagnostic: Replay logged meaning answers through the local pre-grader (main/meaning_grader.py) to see
+how many LLM calls it saves and how often it agrees with the LLM's verdicts.
+
+Steps:
+  1. Check the regression cases in MUST_NOT_PASS: wrong answers that must never be graded correct locally.
+  2. Load every QuizLog meaning answer with the word's stored meaning from WordDict (configured DB_PATH).
+  3. Pre-grade each answer with pregrade_meaning, as QuizGenerator.check_meaning does.
+  4. Print the share of answers decided locally by rule, and, for answers the LLM graded (no
+     meaning_grading_source, or 'llm'), how often a local verdict would have matched the logged one.
+     Disagreements are listed for tuning SYNONYM_GROUPS and LEMMAS.
+
+Exits with status 1 when a MUST_NOT_PASS case is graded correct.
+Read-only.  Run from the repo root:  python diagnostics/meaning_pregrade_report.py [max_examples]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+
+import pandas as pd
+
+from database import engine
+from main.meaning_grader import pregrade_meaning
+
+
+max_examples = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+# (stored meaning, answer) pairs that are wrong but close: another real word one letter away, a negated
+# word, or a synonym of another sense of the meaning
+MUST_NOT_PASS = [
+    ('house', 'horse'), ('month', 'mouth'), ('three', 'there'), ('quiet', 'quite'),
+    ('desert', 'dessert'), ('angle', 'angel'), ('affect', 'effect'), ('sixty', 'sixth'),
+    ('important', 'unimportant'), ('patient', 'impatient'), ('useful', 'useless'),
+    ('hard (not soft)', 'difficult'), ('right (direction)', 'correct'),
+]
+
+regressions = [(meaning, answer, grade) for meaning, answer in MUST_NOT_PASS
+               if (grade := pregrade_meaning(answer, meaning)) is not None and grade[0] == 'yes']
+print(f"Regression cases: {len(MUST_NOT_PASS) - len(regressions)} of {len(MUST_NOT_PASS)} left to the LLM")
+for meaning, answer, grade in regressions:
+    print(f"  [FAIL] '{answer}' for '{meaning}' graded correct locally ({grade[2]})")
+
+log = pd.read_sql("""
+    SELECT QuizLog.word, QuizLog.meaning AS answer, QuizLog.meaning_correct,
+           QuizLog.meaning_grading_source, WordDict.meaning AS stored_meaning
+    FROM QuizLog
+    JOIN WordDict ON (WordDict.word_id = QuizLog.word_id) AND (WordDict.word = QuizLog.word)
+""", engine)
+
+start = time.perf_counter()
+grades = [pregrade_meaning(answer, meaning) for answer, meaning in zip(log['answer'], log['stored_meaning'])]
+elapsed_ms = (time.perf_counter() - start) * 1000
+log['local_correct'] = [grade[0] if grade else None for grade in grades]
+log['local_source'] = [grade[2] if grade else 'llm' for grade in grades]
+
+print("=" * 65)
+print(f"{len(log)} logged meaning answers, pre-graded in {elapsed_ms:.1f} ms")
+print("=" * 65)
+print(log['local_source'].value_counts().to_string())
+if len(log):
+    print(f"\nDecided locally (no LLM call needed): {(log['local_source'] != 'llm').mean():.1%}")
+
+graded_by_llm = log[log['meaning_grading_source'].isna() | (log['meaning_grading_source'] == 'llm')]
+compared = graded_by_llm[graded_by_llm['local_correct'].notna()]
+if len(compared):
+    agree = compared['local_correct'] == compared['meaning_correct'].str.lower()
+    print(f"Agreement with the LLM's verdict on {len(compared)} of those answers: {agree.mean():.1%}")
+    disagreements = compared[~agree]
+    if len(disagreements):
+        print(f"\nDisagreements (first {max_examples}):")
+        print(disagreements[['word', 'answer', 'stored_meaning', 'meaning_correct', 'local_correct', 'local_source']]
+              .head(max_examples).to_string(index=False))
+
+sys.exit(1 if regressions else 0)
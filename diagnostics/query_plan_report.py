@@ -0,0 +1,201 @@
+"""
+Diagnostic: EXPLAIN QUERY PLAN for the statements the app runs, flagging full table scans.
+
+Steps:
+  1. Collect the queries from the code that runs them: the SQL constants in main/sql.py, database.py
+     and main/llm_cache.py, the builders behind load_dict_page and load_due_word_ids, the ORM
+     statements of main/sql.py over the same models, and every view in sql/views.
+  2. Run EXPLAIN QUERY PLAN for each against the configured database (DB_PATH).
+  3. Print the plans and flag every "SCAN <table>" that does not use an index.  Queries that read a
+     whole table by design (e.g. load_dict) list that table as an expected scan.
+
+Exits with status 1 when an unexpected full scan is found, so it can be run after schema changes.
+Read-only unless --init is given, which runs database.init_db() (migrations + indexes) first.
+Run from the repo root:  python diagnostics/query_plan_report.py [--init] [--verbose]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import re
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import bindparam, delete, event, func, select, text, update
+
+import database
+from database import engine, QUIZ_AGG_REBUILD_SQL
+from main import llm_cache
+from main.sql import (LOAD_DICT_SQL, LOAD_QUIZ_LOG_SQL, LOAD_PHRASE_DICT_SQL, LOAD_WORD_COMPARISONS_SQL,
+                      CATEGORY_EXAMPLES_SQL, DICT_PAGE_COLUMNS, _FILTER_OPTIONS_SQL, _ALLOCATE_IDS_SQL,
+                      _SEARCH_PHRASE_SQL, _SEARCH_WORD_COMPARISON_SQL, _COUNT_OVERLAP_SQL, _KNOWN_WORDS_SQL,
+                      _WORDDICT_UPSERT_SQL, _WORDDICT_UPSERT_COLUMNS, _WORDDICT_UPDATE_BY_ID_SQL,
+                      _QUIZ_AGG_UPSERT_SQL, _WORD_SCHEDULE_UPSERT_SQL, _WORD_SCHEDULE_COLUMNS,
+                      _dict_page_queries, _due_word_queries, _DATA_VERSIONS_SQL,
+                      _QUIZ_AGG_VERSION_SQL, _WORDDICT_PINYIN_NORMALIZED_SQL)
+from models import WordDict, WordSchedule, WordComparison, APILatencyLog
+
+
+WORDS = {"words": ["a", "b", "c"]}
+NOW = datetime(2024, 1, 1)
+PAGE = {"limit": 15, "offset": 0}
+
+
+def dict_page(name, filters=None, sort_by=None, search=None, expected=frozenset()):
+    # Both statements load_dict_page runs, as _dict_page_queries builds them
+    count_sql, page_sql, params = _dict_page_queries(filters, sort_by, search)
+    return [(f"load_dict_page: {name} (count)", count_sql, params, set(expected)),
+            (f"load_dict_page: {name}", page_sql, {**params, **PAGE}, set(expected))]
+
+
+def due_words(name, expected_scans, **kwargs):
+    # Every statement load_due_word_ids may run, in order
+    queries = _due_word_queries(now=NOW, **kwargs)
+    return [(f"load_due_word_ids: {name} [{i}]", stmt, {**params, "limit": 10}, expected)
+            for i, ((stmt, params), expected) in enumerate(zip(queries, expected_scans))]
+
+
+# (name, statement, params, tables a full scan of is expected).  Statements are the app's own: SQL
+# constants and builders from main/sql.py, database.py and main/llm_cache.py, and for the ORM calls
+# (session.query(...).delete() and the like) the same statement over the models.
+QUERIES = [
+    ("load_dict", LOAD_DICT_SQL, {}, {"WordDict"}),
+    ("load_quiz_log", LOAD_QUIZ_LOG_SQL, {}, {"QuizLog"}),
+    ("load_category_examples", CATEGORY_EXAMPLES_SQL, {"top_n": 3}, {"WordDict"}),
+    ("load_phrase_dict", LOAD_PHRASE_DICT_SQL, {}, {"PhraseDict"}),
+    ("load_word_comparisons", LOAD_WORD_COMPARISONS_SQL, {}, {"WordComparison"}),
+    *dict_page("first page", expected={"WordDict"}),
+    *dict_page("category + rarity", filters=[("Word Category", "=", "Food"), ("Word Rarity", "=", "Rare")]),
+    # Newest first is rowid order: SQLite may walk WordDict backwards and stop after a page, not sort
+    *dict_page("added since", filters=[("Added Date", ">=", "2024-01-01")], expected={"WordDict"}),
+    *dict_page("added since, by date", filters=[("Added Date", ">=", "2024-01-01")],
+               sort_by=[("Added Date", "desc")]),
+    *dict_page("search", search="nihao"),
+    *dict_page("pinyin with tones", search="ni3 hao"),
+    ("search_phrase_ids", _SEARCH_PHRASE_SQL, {"search": database.fts_match_query("nihao")}, set()),
+    ("search_word_comparison_ids", _SEARCH_WORD_COMPARISON_SQL, {"search": database.fts_match_query("nihao")}, set()),
+    *[(f"load_dict_filter_options: {name}", _FILTER_OPTIONS_SQL.format(expr=DICT_PAGE_COLUMNS[name]), {}, set())
+      for name in ("Added Date", "Word Category", "Word Rarity")],
+    *[(f"fts_rowids: {source} by {column}",
+       text(database.FTS_ROWIDS_SQL.format(source=source, column=column))
+       .bindparams(bindparam("values", expanding=True)), {"values": ["a", "b"]}, set())
+      for source, column in (("WordDict", "word"), ("WordDict", "word_id"), ("PhraseDict", "phrase_id"),
+                             ("WordComparison", "pair_id"))],
+    ("count_overlap_word", _COUNT_OVERLAP_SQL, WORDS, set()),
+    ("load_known_words", _KNOWN_WORDS_SQL, WORDS, set()),
+    ("allocate_ids", _ALLOCATE_IDS_SQL, {"count": 1, "prefix": "D"}, set()),
+    ("sql_update_worddict: replace words", delete(WordDict).where(WordDict.word.in_(WORDS["words"])), {}, set()),
+    ("sql_update_worddict: upsert lookup",
+     select(WordDict.word, WordDict.meaning, WordDict.word_id).where(WordDict.word.in_(WORDS["words"])), {}, set()),
+    ("sql_update_worddict: upsert", _WORDDICT_UPSERT_SQL,
+     {"word_id": "D1", "word": "a", "meaning": "m", "added_date": NOW,
+      **{col: "x" for col in _WORDDICT_UPSERT_COLUMNS}}, set()),
+    ("sql_update_worddict: update by id", _WORDDICT_UPDATE_BY_ID_SQL,
+     {"word_id": "D1", **{col: "x" for col in _WORDDICT_UPSERT_COLUMNS}}, set()),
+    ("sql_update_worddict: prune", delete(WordDict).where(WordDict.word_id.in_(["D1", "D2"])), {}, set()),
+    ("sql_patch_worddict_rows", update(WordDict).where(WordDict.word_id == "D1").values(meaning="x"), {}, set()),
+    ("sql_patch_worddict_rows: pinyin_normalized", _WORDDICT_PINYIN_NORMALIZED_SQL,
+     {"word_id": "D1", "pinyin_normalized": "ni3"}, set()),
+    ("sql_delete_word_dict", delete(WordDict).where(WordDict.word_id.in_(["D1", "D2"])), {}, set()),
+    ("sql_update_quizlog: QuizAgg upsert", _QUIZ_AGG_UPSERT_SQL,
+     {"word_id": "D1", "word": "a", "attempts": 1, "last_quiz": NOW, "pinyin_correct": 1,
+      "pinyin_wrong": 0, "meaning_correct": 1, "meaning_wrong": 0}, set()),
+    ("sql_update_quizlog: WordSchedule lookup",
+     select(WordDict.word_id, WordDict.word, *[WordSchedule.__table__.c[col] for col in _WORD_SCHEDULE_COLUMNS])
+     .outerjoin(WordSchedule, WordSchedule.word_id == WordDict.word_id)
+     .where(WordDict.word_id.in_(["D1", "D2"])), {}, set()),
+    ("sql_update_quizlog: WordSchedule upsert", _WORD_SCHEDULE_UPSERT_SQL,
+     {"word_id": "D1", "repetitions": 1, "ease": 2.5, "stability": 1.0, "due": NOW, "last_review": NOW}, set()),
+    ("get_data_version", _DATA_VERSIONS_SQL, {}, {"DataVersion"}),
+    ("sql_update_quizlog: QuizAgg version", _QUIZ_AGG_VERSION_SQL, {}, set()),
+    *due_words("due reviews", [set(), {"WordDict"}, set()], categories=["Food"]),
+    *due_words("new words only", [{"WordDict"}], new_words_only=True),
+    ("sql_delete_word_comparisons", delete(WordComparison).where(WordComparison.pair_id.in_(["WP1", "WP2"])),
+     {}, set()),
+    ("rebuild_quiz_agg", QUIZ_AGG_REBUILD_SQL, {}, {"WordDict"}),
+    ("llm_cache: lookup", llm_cache.LOOKUP_SQL, {"key": "k", "ttl": "-3600 seconds"}, set()),
+    ("llm_cache: touch", llm_cache.TOUCH_SQL, {"key": "k"}, set()),
+    ("llm_cache: TTL eviction", llm_cache.EXPIRE_SQL, {"ttl": "-3600 seconds"}, set()),
+    ("llm_cache: LRU eviction", llm_cache.EVICT_LRU_SQL, {"max_entries": 1000}, set()),
+    # Not run by the app; the shape of query ix_APILatencyLog_category_timestamp is there for
+    ("latency report: last 7 days by category",
+     select(APILatencyLog.category, func.count(), func.avg(APILatencyLog.latency_ms))
+     .where(APILatencyLog.category == "translation", APILatencyLog.timestamp >= func.datetime("now", "-7 days")),
+     {}, set()),
+]
+
+# Views aggregate over whole tables by design
+for path in sorted((Path(database.__file__).parent / "sql" / "views").glob("*.sql")):
+    QUERIES.append((f"view {path.stem}", f"SELECT * FROM {path.stem}", {}, {"QuizLog"}))
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?!.*\bINDEX\b)")
+SUBQUERY = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\w+)")
+
+
+def explain(conn, statement, params: dict) -> list:
+    # Execute the statement as the app would (SQLAlchemy expands IN lists and converts parameters),
+    # with EXPLAIN QUERY PLAN put in front of the SQL it sends, so nothing is read or written
+    def explain_sql(conn, cursor, sql, parameters, context, executemany):
+        return "EXPLAIN QUERY PLAN " + sql, parameters
+
+    if isinstance(statement, str):
+        statement = text(statement.strip().rstrip(";"))
+    event.listen(conn, "before_cursor_execute", explain_sql, retval=True)
+    try:
+        rows = conn.execute(statement, params).fetchall()
+    finally:
+        event.remove(conn, "before_cursor_execute", explain_sql)
+    # (id, parent, notused, detail) -> indent by depth
+    depth = {0: -1}
+    lines = []
+    for row_id, parent, _, detail in rows:
+        depth[row_id] = depth.get(parent, -1) + 1
+        lines.append(("  " * depth[row_id], detail))
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--init", action="store_true", help="Run database.init_db() first (creates indexes)")
+    parser.add_argument("--verbose", action="store_true", help="Print the plan of every query, not only flagged ones")
+    args = parser.parse_args()
+
+    if args.init:
+        database.init_db()
+
+    print("=" * 65)
+    print(f"Query plans against {engine.url.database}")
+    print("=" * 65)
+
+    flagged = 0
+    with engine.connect() as conn:
+        for name, sql, params, expected in QUERIES:
+            try:
+                plan = explain(conn, sql, params)
+            except Exception as e:
+                print(f"\n[ERROR] {name}: {e}")
+                flagged += 1
+                continue
+            # Scanning a view/subquery result is not a table scan; SQLite names are case-insensitive
+            subqueries = {m.group(1).lower() for _, detail in plan if (m := SUBQUERY.match(detail))}
+            scans = [m.group(1).lower() for _, detail in plan if (m := FULL_SCAN.match(detail))]
+            allowed = {t.lower() for t in expected} | subqueries
+            unexpected = [t for t in scans if t not in allowed]
+            status = "FULL SCAN" if unexpected else "ok"
+            if unexpected or args.verbose:
+                print(f"\n[{status}] {name}")
+                for indent, detail in plan:
+                    print(f"    {indent}{detail}")
+            else:
+                print(f"[ok] {name}")
+            flagged += bool(unexpected)
+
+    print()
+    print(f"{len(QUERIES)} queries, {flagged} flagged")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
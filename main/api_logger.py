@@ -0,0 +1,117 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# APILatencyLog rows are buffered in memory and written by a background thread, so telemetry never
+# puts an SQLite write (and its fsync / lock wait) on the request path of get_completion.
+API_LOG_BATCH_SIZE = int(os.getenv('API_LOG_BATCH_SIZE', '50').strip('"'))
+API_LOG_FLUSH_SECONDS = float(os.getenv('API_LOG_FLUSH_SECONDS', '2').strip('"'))
+API_LOG_MAX_QUEUE = int(os.getenv('API_LOG_MAX_QUEUE', '10000').strip('"'))
+
+
+class APILogWriter:
+    """
+    Bounded queue of APILatencyLog records flushed in batches by a daemon thread.
+
+    A batch is written when batch_size records are waiting or flush_seconds have passed since the
+    last write, whichever comes first.  When the queue is full new records are dropped (never
+    blocking the caller) and counted in self.dropped.  Remaining records are flushed at exit.
+    """
+
+    def __init__(self, batch_size=API_LOG_BATCH_SIZE, flush_seconds=API_LOG_FLUSH_SECONDS, max_queue=API_LOG_MAX_QUEUE):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='api-log-writer', daemon=True)
+                self._thread.start()
+
+    def enqueue(self, record: dict) -> bool:
+        """Queue one APILatencyLog mapping.  Returns False (and counts a drop) if the queue is full."""
+        record.setdefault('timestamp', datetime.now(timezone.utc).replace(tzinfo=None))
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        self._ensure_started()
+        return True
+
+    def _drain(self, limit=None) -> list:
+        batch = []
+        while limit is None or len(batch) < limit:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: list) -> None:
+        from database import engine
+        from models import APILatencyLog
+        from sqlalchemy.orm import Session
+
+        try:
+            with Session(engine) as session:
+                session.bulk_insert_mappings(APILatencyLog, batch)
+                session.commit()
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"[latency logging failed] {len(batch)} record(s) lost: {e}")
+
+    def flush(self) -> int:
+        """Write everything currently queued, in batches.  Returns the number of records handled."""
+        handled = 0
+        with self._flush_lock:
+            while True:
+                batch = self._drain(self.batch_size)
+                if not batch:
+                    break
+                self._write(batch)
+                handled += len(batch)
+        return handled
+
+    def _run(self):
+        last_flush = time.time()
+        while not self._stop.is_set():
+            timeout = max(0.0, self.flush_seconds - (time.time() - last_flush))
+            self._stop.wait(min(timeout, 0.25))
+            if self.queue.qsize() >= self.batch_size or time.time() - last_flush >= self.flush_seconds:
+                self.flush()
+                last_flush = time.time()
+        self.flush()
+
+    def shutdown(self, timeout=5.0) -> None:
+        """Stop the writer thread and flush whatever is still queued."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> dict:
+        return {'queued': self.queue.qsize(), 'written': self.written, 'failed': self.failed, 'dropped': self.dropped}
+
+
+api_log_writer = APILogWriter()
+atexit.register(api_log_writer.shutdown)
@@ -13,7 +13,8 @@ from io import StringIO
 from datetime import datetime
 
 from main.gsheets import load_gsheet_dict, save_df_to_gsheet, format_gsheet
-from main.utils import get_completion, parse_response_table
+from main.utils import get_completion, parse_table_output
+from main.schemas import CHAT_QUIZ_SCHEMA, CONVO_EVAL_SCHEMA, TRANSLATION_EVAL_SCHEMA, use_structured_output
 from main.sql import sql_update_responselog
 
 
@@ -144,11 +145,13 @@ class ResponseQuizGenerator:
             self, 
             gsheet_mode: bool = False,
             gsheet_name: str = None,
-            wks_name: str = ModuleNotFoundError
+            wks_name: str = ModuleNotFoundError,
+            structured: bool = None
             ):
         self.gsheet_mode = gsheet_mode
         self.gsheet_name = gsheet_name
         self.wks_name = wks_name
+        self.structured = use_structured_output(structured)
 
     def generate_response_quiz(
             self, 
@@ -167,6 +170,7 @@ class ResponseQuizGenerator:
                     tone=tone,
                 )
 
+            schema = CHAT_QUIZ_SCHEMA if self.structured else None
             sample_response_translation = (
                 get_completion(
                     prompt=prompt, 
@@ -174,10 +178,11 @@ class ResponseQuizGenerator:
                     temperature=temp,
                     category='chat_gen',
                     num_items=num_phrases,
+                    schema=schema,
                     )
                 )
             content = sample_response_translation.output_text
-            phrase_df = parse_response_table(content)
+            phrase_df = parse_table_output(content, schema=schema)
             self.phrase_df = phrase_df
 
             return phrase_df
@@ -198,27 +203,31 @@ class ResponseQuizGenerator:
         if eval_df is None:
             eval_df = self.phrase_df
         if mode == "conversation":
+            schema = CONVO_EVAL_SCHEMA if self.structured else None
             sample_response_translation = (
                 get_completion(
                     prompt=get_prompt_convo_eval(eval_df), 
                     model=model , 
                     temperature=temp,
                     category='chat_eval',
+                    schema=schema,
                     )
                 )
         elif mode == "translation":
+            schema = TRANSLATION_EVAL_SCHEMA if self.structured else None
             sample_response_translation = (
                 get_completion(
                     prompt=get_prompt_translation_eval(eval_df), 
                     model=model , 
                     temperature=temp,
                     category='chat_eval',
+                    schema=schema,
                     )
                 )
         else:
             raise Exception("Mode not recognized.  Please use either 'conversation' or 'translation'")
         content = sample_response_translation.output_text
-        eval_df = parse_response_table(content)
+        eval_df = parse_table_output(content, schema=schema)
         self.eval_df = eval_df
         return eval_df
     
@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pandas as pd
+
+from main.sql import load_dict, load_quiz_log, load_phrase_dict, get_data_version
+
+
+class DataCache:
+    """
+    Process-wide cache of the datasets the Dash pages and pipelines read.
+
+    Each dataset is loaded on first use and shared by every page and callback in the process.  It is
+    stamped with the data versions (main.sql.get_data_version) of the tables it is built from, and
+    reloaded on the next get() once a write to one of those tables has committed, from this process or
+    any other, or after an explicit invalidate().  Hits, misses and load times are counted per dataset; see stats().
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._tables = {}
+        self._values = {}
+        self._stamps = {}
+        self._generations = {}
+        self._load_locks = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def register(self, name: str, loader, tables=()) -> None:
+        """Register loader() under name, to be reloaded after writes to any of tables."""
+        self._loaders[name] = loader
+        self._tables[name] = tuple(tables)
+        self._generations.setdefault(name, 0)
+        self._load_locks[name] = threading.Lock()
+        self._stats[name] = {'hits': 0, 'misses': 0, 'load_seconds': 0.0, 'last_load_seconds': None}
+
+    def _stamp(self, name: str) -> tuple:
+        return tuple(get_data_version(table) for table in self._tables[name])
+
+    def _cached(self, name: str):
+        value = self._values.get(name)
+        if value is not None and self._stamps.get(name) == self._stamp(name):
+            return value
+        return None
+
+    def get(self, name: str, copy: bool = True) -> pd.DataFrame:
+        """
+        Return the named dataset, loading it if it is missing or stale.  A copy is returned by default
+        so callers can modify it freely; pass copy=False for read-only use.
+        """
+        stats = self._stats[name]
+        value = self._cached(name)
+        if value is None:
+            with self._load_locks[name]:
+                value = self._cached(name)
+                if value is None:
+                    # Stamp before loading, so a write that lands mid-load makes the result stale
+                    stamp = self._stamp(name)
+                    generation = self._generations[name]
+                    start = time.perf_counter()
+                    value = self._loaders[name]()
+                    elapsed = time.perf_counter() - start
+                    with self._lock:
+                        stats['misses'] += 1
+                        stats['load_seconds'] += elapsed
+                        stats['last_load_seconds'] = elapsed
+                        # Only keep the result if it was not invalidated while it loaded
+                        if self._generations[name] == generation:
+                            self._values[name] = value
+                            self._stamps[name] = stamp
+                    return value.copy() if copy else value
+        with self._lock:
+            stats['hits'] += 1
+        return value.copy() if copy else value
+
+    def invalidate(self, *names: str) -> None:
+        """Drop the named datasets (all of them when no name is given)."""
+        with self._lock:
+            for name in (names or list(self._loaders)):
+                self._values.pop(name, None)
+                self._stamps.pop(name, None)
+                self._generations[name] += 1
+
+    def stats(self) -> dict:
+        """Per-dataset hits, misses, hit rate and load times (seconds)."""
+        with self._lock:
+            result = {}
+            for name, stats in self._stats.items():
+                total = stats['hits'] + stats['misses']
+                result[name] = {
+                    **stats,
+                    'hit_rate': stats['hits'] / total if total else None,
+                    'cached': name in self._values,
+                }
+            return result
+
+
+data_cache = DataCache()
+data_cache.register('dict', load_dict, tables=('WordDict', 'QuizAgg'))
+data_cache.register('quiz_log', load_quiz_log, tables=('QuizLog',))
+data_cache.register('phrase_dict', load_phrase_dict, tables=('PhraseDict',))
+
+
+def get_dict_df() -> pd.DataFrame:
+    """Dictionary joined with quiz statistics (load_dict), cached until the next relevant write."""
+    return data_cache.get('dict')
+
+
+def get_quiz_log_df() -> pd.DataFrame:
+    """QuizLog columns for the statistics page (load_quiz_log), cached until the next quiz is saved."""
+    return data_cache.get('quiz_log')
+
+
+def get_phrase_dict_df() -> pd.DataFrame:
+    """Phrase dictionary (load_phrase_dict), cached until new phrases are saved."""
+    return data_cache.get('phrase_dict')
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import text
+
+# The cache is opt-in: set LLM_CACHE_ENABLED=1 in .env (or pass use_cache=True to get_completion).
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', '0').strip('"') == '1'
+LLM_CACHE_TTL_HOURS = float(os.getenv('LLM_CACHE_TTL_HOURS', '168').strip('"'))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '5000').strip('"'))
+
+# Per-category policy.  Only deterministic "lookup" style work is cached; generation categories
+# where the user expects fresh output on every call are never cached.  Unknown categories are not cached.
+CACHE_POLICY = {
+    'translation': True,
+    'rarity_classification': True,
+    'word_comparison': True,
+    'quiz_eval': True,
+    'phrase_gen': False,
+    'phrase_response': False,
+    'phrase_translate': False,
+    'chat_gen': False,
+    'chat_eval': False,
+}
+
+
+# Module-level so diagnostics/query_plan_report.py can EXPLAIN the exact statements the cache runs.
+LOOKUP_SQL = text("""
+    SELECT response_json
+    FROM LLMResponseCache
+    WHERE cache_key = :key
+      AND created_at >= datetime('now', :ttl)
+""")
+
+TOUCH_SQL = text("""
+    UPDATE LLMResponseCache
+    SET last_accessed = CURRENT_TIMESTAMP, hit_count = hit_count + 1
+    WHERE cache_key = :key
+""")
+
+STORE_SQL = text("""
+    INSERT INTO LLMResponseCache (cache_key, category, model, response_json, created_at, last_accessed, hit_count)
+    VALUES (:key, :category, :model, :response_json, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 0)
+    ON CONFLICT(cache_key) DO UPDATE SET
+        response_json = excluded.response_json,
+        created_at = CURRENT_TIMESTAMP,
+        last_accessed = CURRENT_TIMESTAMP
+""")
+
+EXPIRE_SQL = text("DELETE FROM LLMResponseCache WHERE created_at < datetime('now', :ttl)")
+
+EVICT_LRU_SQL = text("""
+    DELETE FROM LLMResponseCache
+    WHERE cache_key IN (
+        SELECT cache_key FROM LLMResponseCache
+        ORDER BY last_accessed DESC
+        LIMIT -1 OFFSET :max_entries
+    )
+""")
+
+
+def should_cache(category: str, use_cache: bool = None) -> bool:
+    """
+    Decide whether a completion should go through the cache.
+    An explicit use_cache argument wins; otherwise the global switch and CACHE_POLICY decide.
+    """
+    if use_cache is not None:
+        return bool(use_cache)
+    return LLM_CACHE_ENABLED and CACHE_POLICY.get(category, False)
+
+
+def make_cache_key(model: str, prompt: str, reasoning: dict = None, temperature: float = None, schema: dict = None) -> str:
+    """Return a stable sha256 key for the request parameters that determine the response."""
+    params = [model, prompt, reasoning, temperature]
+    if schema is not None:
+        params.append(schema)
+    raw = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def get_cached_response(cache_key: str):
+    """
+    Return the cached Response for cache_key, or None on a miss or an expired entry.
+    """
+    from database import engine
+    from openai.types.responses import Response
+
+    with engine.begin() as conn:
+        row = conn.execute(
+            LOOKUP_SQL,
+            {"key": cache_key, "ttl": f"-{int(LLM_CACHE_TTL_HOURS * 3600)} seconds"},
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(TOUCH_SQL, {"key": cache_key})
+    return Response.model_validate_json(row[0])
+
+
+def store_response(cache_key: str, category: str, model: str, response) -> None:
+    """Insert or refresh a cache entry, then apply TTL and size-based eviction."""
+    from database import engine
+
+    with engine.begin() as conn:
+        conn.execute(
+            STORE_SQL,
+            {"key": cache_key, "category": category, "model": model,
+             "response_json": response.model_dump_json()},
+        )
+    evict_cache()
+
+
+def evict_cache() -> int:
+    """
+    Delete entries older than LLM_CACHE_TTL_HOURS, then the least recently used entries
+    beyond LLM_CACHE_MAX_ENTRIES.  Returns the number of rows removed.
+    """
+    from database import engine
+
+    with engine.begin() as conn:
+        expired = conn.execute(
+            EXPIRE_SQL,
+            {"ttl": f"-{int(LLM_CACHE_TTL_HOURS * 3600)} seconds"},
+        ).rowcount
+        overflow = conn.execute(
+            EVICT_LRU_SQL,
+            {"max_entries": LLM_CACHE_MAX_ENTRIES},
+        ).rowcount
+    return (expired or 0) + (overflow or 0)
+
+
+def clear_cache(category: str = None) -> int:
+    """Remove all cache entries, or only those of one category."""
+    from database import engine
+
+    with engine.begin() as conn:
+        if category is None:
+            return conn.execute(text("DELETE FROM LLMResponseCache")).rowcount
+        return conn.execute(
+            text("DELETE FROM LLMResponseCache WHERE category = :category"), {"category": category}
+        ).rowcount
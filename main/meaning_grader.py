@@ -0,0 +1,134 @@
+import re
+
+import pandas as pd
+
+
+# Local first pass for QuizGenerator.check_meaning: answers that can be graded from the stored
+# WordDict meaning alone never reach the LLM.  Only "yes" is decided locally (plus blanks as "no");
+# an answer that matches nothing may still be a valid meaning, so it is left for the LLM.  So is a
+# misspelled answer: one letter turns many meanings into another word (house / horse, quiet / quite,
+# month / mouth), and the stored meaning alone cannot tell a typo from a wrong answer.
+
+# Meaning Grading Source values; 'llm' marks rows graded by get_prompt_evaluate_quiz_meaning_only.
+# 'similar' (a typo, graded locally by earlier versions) only appears on older QuizLog rows.
+GRADING_SOURCES = ('blank', 'exact', 'synonym', 'similar', 'llm')
+
+# Words treated as the same meaning, one group per line; the first word is the canonical form.
+# Only words that are interchangeable in every sense belong here: 'right' is also a direction and
+# 'hard' also the opposite of soft, so those answers are left to the LLM.
+SYNONYM_GROUPS = [
+    'hello hi hey',
+    'goodbye bye farewell',
+    'big large',
+    'happy glad joyful',
+    'sad unhappy sorrowful',
+    'beautiful lovely',
+    'smart clever intelligent',
+    'begin commence',
+    'buy purchase',
+    'help assist',
+    'choose select',
+    'often frequently',
+    'maybe perhaps',
+    'wrong incorrect',
+    'car automobile',
+    'mom mother mum',
+    'dad father',
+    'friend pal buddy',
+    'film movie',
+    'photo photograph',
+]
+
+# Irregular plurals and verb forms -> lemma; regular plurals are handled by _lemma's suffix rules
+LEMMAS = {
+    'children': 'child', 'people': 'person', 'men': 'man', 'women': 'woman', 'feet': 'foot',
+    'teeth': 'tooth', 'mice': 'mouse', 'geese': 'goose', 'is': 'be', 'are': 'be', 'was': 'be',
+    'were': 'be', 'has': 'have', 'had': 'have', 'went': 'go', 'ate': 'eat',
+}
+
+_SYNONYMS = {word: group.split()[0] for group in SYNONYM_GROUPS for word in group.split()}
+_ARTICLES = {'a', 'an', 'the'}
+_PARENTHESES = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+# ; , / and 'or' separate alternatives, except inside a note: 'drink (e.g. tea, coffee)' is one
+_ALTERNATIVE_SEPARATOR = re.compile(r"(\([^)]*\)|\[[^\]]*\])|[;,/]|\bor\b")
+_NON_WORD = re.compile(r"[^a-z0-9' ]+")
+
+
+def _lemma(token: str) -> str:
+    if token in LEMMAS:
+        return LEMMAS[token]
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 4 and token.endswith(('ses', 'xes', 'ches', 'shes')):
+        return token[:-2]
+    if len(token) > 3 and token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+def normalize_meaning(text: str, keep_notes: bool = False) -> str:
+    """
+    Lowercase, punctuation, parenthesized notes, articles and a leading infinitive 'to' removed, and
+    words reduced to their lemma: 'To eat (a meal)' -> 'eat', 'The Apples' -> 'apple'.  With
+    keep_notes, the words of the notes are kept: 'hard (not soft)' -> 'hard not soft'.
+    """
+    text = str(text or '').lower()
+    if not keep_notes:
+        text = _PARENTHESES.sub(' ', text)
+    tokens = [token.strip("'") for token in _NON_WORD.sub(' ', text).split()]
+    tokens = [token for token in tokens if token and token not in _ARTICLES]
+    if len(tokens) > 1 and tokens[0] == 'to':
+        tokens = tokens[1:]
+    return ' '.join(_lemma(token) for token in tokens)
+
+
+def meaning_alternatives(meaning: str, keep_notes: bool = False) -> list:
+    """
+    Normalized alternatives of a stored meaning: 'to eat; food, meal' -> ['eat', 'food', 'meal'].
+    keep_notes as for normalize_meaning.
+    """
+    marked = _ALTERNATIVE_SEPARATOR.sub(lambda match: match.group(1) or '\n', str(meaning or ''))
+    parts = (normalize_meaning(part, keep_notes) for part in marked.split('\n'))
+    return list(dict.fromkeys(part for part in parts if part))
+
+
+def _canonical(normalized: str) -> str:
+    return ' '.join(_SYNONYMS.get(token, token) for token in normalized.split())
+
+
+def pregrade_meaning(answer: str, meaning: str):
+    """
+    Grade one answer against the stored meaning without the LLM.
+
+    Returns:
+        (Meaning Correct, Meaning Correction, Meaning Grading Source), or None when the answer has to
+        go to the LLM.
+    """
+    if answer is None or (isinstance(answer, float) and pd.isna(answer)) or not str(answer).strip():
+        return 'no', str(meaning or ''), 'blank'
+    normalized = normalize_meaning(answer)
+    alternatives = meaning_alternatives(meaning)
+    if not normalized or not alternatives:
+        return None
+    if str(answer).strip().lower() == str(meaning or '').strip().lower() or normalized in alternatives:
+        return 'yes', '', 'exact'
+    # Synonyms are matched against the meaning with its notes, which tell which sense is meant
+    canonical = _canonical(normalized)
+    if any(canonical == _canonical(alternative) for alternative in meaning_alternatives(meaning, keep_notes=True)):
+        return 'yes', '', 'synonym'
+    return None
+
+
+def pregrade_meanings(answers, meanings) -> pd.DataFrame:
+    """
+    pregrade_meaning for aligned lists of answers and stored meanings.
+
+    Returns:
+        DataFrame with Meaning (the answer), Meaning Correct, Meaning Correction and Meaning Grading
+        Source, one row per answer; the last three are None for rows left to the LLM.
+    """
+    rows = []
+    for answer, meaning in zip(answers, meanings):
+        grade = pregrade_meaning(answer, meaning) or (None, None, None)
+        rows.append(('' if answer is None else answer, *grade))
+    return pd.DataFrame(rows, columns=['Meaning', 'Meaning Correct', 'Meaning Correction', 'Meaning Grading Source'])
@@ -14,7 +14,8 @@ from datetime import datetime
 
 from main.gsheets import load_gsheet_dict, save_df_to_gsheet, format_gsheet
 from main.sql import load_phrase_dict
-from main.utils import get_completion, parse_response_table
+from main.utils import get_completion, parse_table_output, stream_response_table
+from main.schemas import PHRASE_SCHEMA, use_structured_output
 from main.sql import sql_update_phrasedict
 
 gsheet_name = os.getenv('SHEET_NAME')
@@ -227,12 +228,36 @@ class PhraseGenerationPipeline:
     def __init__(self, 
                  gsheet_mode=False,
                  gsheet_name=None, 
-                 worksheet_name=None):
+                 worksheet_name=None,
+                 structured=None):
         self.gsheet_mode = gsheet_mode
         self.gsheet_name = gsheet_name
         self.worksheet_name = worksheet_name
+        # Structured output applies to the non-streaming path; streamed rows are always parsed from the table
+        self.structured = use_structured_output(structured)
         self.new_phrase_df = pd.DataFrame()
+        self.streaming = False
+        self.stream_error = None
     
+    def _stream_phrases(self, prompt, model, temp, category, num_items):
+        '''
+        Stream the phrase table and append each row to self.new_phrase_df as it arrives, so a page
+        polling new_phrase_df can show rows progressively.  self.streaming is True until the stream ends.
+        '''
+        self.streaming = True
+        self.stream_error = None
+        self.new_phrase_df = pd.DataFrame()
+        try:
+            for row_df in stream_response_table(
+                    prompt, model=model, temperature=temp, category=category,
+                    num_items=num_items, date_col=['Added Date']):
+                self.new_phrase_df = pd.concat([self.new_phrase_df, row_df], ignore_index=True)
+        except Exception as e:
+            self.stream_error = str(e)
+            print(f"Phrase streaming failed: {e}")
+        finally:
+            self.streaming = False
+
     def phrase_generation_module(
             self, 
             situation, 
@@ -241,23 +266,30 @@ class PhraseGenerationPipeline:
             tone = "Polite",
             existing_phrases=[], 
             translation_model="gpt-4o-mini",
-            temp=0.7
+            temp=0.7,
+            stream=False
             ):
+        prompt = get_prompt_to_gen_phrases(
+            situation = situation,
+            num_phrases = num_phrases,
+            complexity = complexity,
+            tone = tone,
+            existing_phrases=existing_phrases
+            )
+        if stream:
+            return self._stream_phrases(prompt, translation_model, temp, 'phrase_gen', num_phrases)
+
+        schema = PHRASE_SCHEMA if self.structured else None
         phrase_gen_response =  get_completion(
-            prompt = get_prompt_to_gen_phrases(
-                situation = situation,
-                num_phrases = num_phrases,
-                complexity = complexity,
-                tone = tone,
-                existing_phrases=existing_phrases
-                ),
+            prompt = prompt,
             model=translation_model, 
             temperature=temp,
             category='phrase_gen',
-            num_items=num_phrases)
+            num_items=num_phrases,
+            schema=schema)
         self.phrase_gen_response = phrase_gen_response
 
-        new_phrase_df = parse_response_table(phrase_gen_response.output_text, date_col=['Added Date'])
+        new_phrase_df = parse_table_output(phrase_gen_response.output_text, schema=schema, date_col=['Added Date'])
         self.new_phrase_df = new_phrase_df
 
     def phrase_response_module(
@@ -266,17 +298,24 @@ class PhraseGenerationPipeline:
             complexity, 
             tone = "Polite",
             translation_model="gpt-4o-mini", 
-            temp=0.7
+            temp=0.7,
+            stream=False
             ):
+        prompt = get_prompt_to_respond(input_phrases, complexity=complexity, tone=tone)
+        if stream:
+            return self._stream_phrases(prompt, translation_model, temp, 'phrase_response', len(input_phrases))
+
+        schema = PHRASE_SCHEMA if self.structured else None
         phrase_gen_response =  get_completion(
-            prompt = get_prompt_to_respond(input_phrases, complexity=complexity, tone=tone),
+            prompt = prompt,
             model=translation_model, 
             temperature=temp,
             category='phrase_response',
-            num_items=len(input_phrases))
+            num_items=len(input_phrases),
+            schema=schema)
         self.phrase_gen_response = phrase_gen_response
 
-        new_phrase_df = parse_response_table(phrase_gen_response.output_text, date_col=['Added Date'])
+        new_phrase_df = parse_table_output(phrase_gen_response.output_text, schema=schema, date_col=['Added Date'])
         self.new_phrase_df = new_phrase_df
 
     def phrase_translate_module(
@@ -285,17 +324,24 @@ class PhraseGenerationPipeline:
             complexity, 
             tone = "Polite",
             translation_model="gpt-4o-mini", 
-            temp=0.7
+            temp=0.7,
+            stream=False
             ):
+        prompt = get_prompt_to_translate(input_phrases, complexity=complexity, tone=tone)
+        if stream:
+            return self._stream_phrases(prompt, translation_model, temp, 'phrase_translate', len(input_phrases))
+
+        schema = PHRASE_SCHEMA if self.structured else None
         phrase_gen_response =  get_completion(
-            prompt = get_prompt_to_translate(input_phrases, complexity=complexity, tone=tone),
+            prompt = prompt,
             model=translation_model, 
             temperature=temp,
             category='phrase_translate',
-            num_items=len(input_phrases))
+            num_items=len(input_phrases),
+            schema=schema)
         self.phrase_gen_response = phrase_gen_response
 
-        new_phrase_df = parse_response_table(phrase_gen_response.output_text, date_col=['Added Date'])
+        new_phrase_df = parse_table_output(phrase_gen_response.output_text, schema=schema, date_col=['Added Date'])
         self.new_phrase_df = new_phrase_df
 
     def clear_new_phrases(self):
@@ -0,0 +1,224 @@
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+# Every standard Mandarin syllable, toneless, with ü written as v.  Used to split unspaced pinyin
+# (nǐhǎo, ni3hao3) into syllables.
+SYLLABLES = frozenset("""
+a ai an ang ao
+ba bai ban bang bao bei ben beng bi bian biao bie bin bing bo bu
+ca cai can cang cao ce cen ceng cha chai chan chang chao che chen cheng chi chong chou chu chua chuai
+chuan chuang chui chun chuo ci cong cou cu cuan cui cun cuo
+da dai dan dang dao de dei den deng di dia dian diao die ding diu dong dou du duan dui dun duo
+e ei en eng er
+fa fan fang fei fen feng fo fou fu
+ga gai gan gang gao ge gei gen geng gong gou gu gua guai guan guang gui gun guo
+ha hai han hang hao he hei hen heng hong hou hu hua huai huan huang hui hun huo
+ji jia jian jiang jiao jie jin jing jiong jiu ju juan jue jun
+ka kai kan kang kao ke kei ken keng kong kou ku kua kuai kuan kuang kui kun kuo
+la lai lan lang lao le lei leng li lia lian liang liao lie lin ling liu lo long lou lu luan lun luo lv lve
+ma mai man mang mao me mei men meng mi mian miao mie min ming miu mo mou mu
+na nai nan nang nao ne nei nen neng ni nian niang niao nie nin ning niu nong nou nu nuan nuo nv nve
+o ou
+pa pai pan pang pao pei pen peng pi pian piao pie pin ping po pou pu
+qi qia qian qiang qiao qie qin qing qiong qiu qu quan que qun
+ran rang rao re ren reng ri rong rou ru rua ruan rui run ruo
+sa sai san sang sao se sen seng sha shai shan shang shao she shei shen sheng shi shou shu shua shuai
+shuan shuang shui shun shuo si song sou su suan sui sun suo
+ta tai tan tang tao te teng ti tian tiao tie ting tong tou tu tuan tui tun tuo
+wa wai wan wang wei wen weng wo wu
+xi xia xian xiang xiao xie xin xing xiong xiu xu xuan xue xun
+ya yan yang yao ye yi yin ying yo yong you yu yuan yue yun
+za zai zan zang zao ze zei zen zeng zha zhai zhan zhang zhao zhe zhei zhen zheng zhi zhong zhou zhu
+zhua zhuai zhuan zhuang zhui zhun zhuo zi zong zou zu zuan zui zun zuo
+""".split())
+
+_MAX_SYLLABLE = max(len(syllable) for syllable in SYLLABLES)
+
+# Tone-mark table: combining mark (after NFD decomposition, so ǎ = a + U+030C) -> tone number
+TONE_MARKS = {'\u0304': 1, '\u0301': 2, '\u030c': 3, '\u0300': 4}
+_DIAERESIS = '\u0308'
+
+INITIALS = ('zh', 'ch', 'sh', 'b', 'p', 'm', 'f', 'd', 't', 'n', 'l', 'g', 'k', 'h',
+            'j', 'q', 'x', 'r', 'z', 'c', 's', 'y', 'w')
+
+# Pinyin Error Type values, in the order they are listed
+ERROR_KINDS = ('no answer', 'syllable count', 'initial', 'final', 'tone')
+
+
+def _segment(letters: str, tones: list):
+    """
+    Split a run of letters into syllables, longest first, at most one tone mark each.  None if it cannot be.
+    A run that only splits without a final 'r' ends in an erhua syllable: yidianr -> yi, dianr.
+    """
+    n = len(letters)
+    ends = {n: ()}
+
+    def split_from(i):
+        if i not in ends:
+            ends[i] = None
+            for length in range(min(_MAX_SYLLABLE, n - i), 0, -1):
+                if letters[i:i + length] in SYLLABLES and sum(1 for t in tones[i:i + length] if t) <= 1:
+                    rest = split_from(i + length)
+                    if rest is not None:
+                        ends[i] = (i + length,) + rest
+                        break
+        return ends[i]
+
+    cuts = split_from(0)
+    if cuts is None:
+        if n > 1 and letters.endswith('r') and not letters.endswith('rr'):
+            syllables = _segment(letters[:-1], tones[:-1])
+            if syllables is not None:
+                syllables[-1][0] += 'r'
+            return syllables
+        return None
+    syllables, start = [], 0
+    for end in cuts:
+        syllables.append([letters[start:end], max(tones[start:end])])
+        start = end
+    return syllables
+
+
+@lru_cache(maxsize=65536)
+def pinyin_syllables(text: str, strict: bool = False):
+    """
+    Parse pinyin written with tone marks (nǐ hǎo), tone numbers (ni3 hao3, ni3hao3) or both into a
+    tuple of (syllable, tone) pairs.  ü may be written ü, v or u:; tone 0 is the neutral tone (no mark,
+    5 or 0).  Erhua syllables keep their 'r' and take the tone written before or after it: diǎnr,
+    dian3r and dianr3 are all ('dianr', 3).  Runs that are not valid pinyin are kept whole.
+
+    With strict=True, returns None unless text is nothing but pinyin, spaces and apostrophes.
+    """
+    chars, tones = [], []
+    for ch in unicodedata.normalize('NFD', str(text or '').lower()):
+        if ch in TONE_MARKS:
+            if tones:
+                tones[-1] = TONE_MARKS[ch]
+        elif ch in (_DIAERESIS, ':'):
+            if chars and chars[-1] == 'u':
+                chars[-1] = 'v'
+        elif 'a' <= ch <= 'z' or '0' <= ch <= '9':
+            chars.append(ch)
+            tones.append(0)
+        elif unicodedata.combining(ch):
+            continue
+        elif strict and not (ch.isspace() or ch in "'-"):
+            return None
+        else:
+            chars.append(' ')
+            tones.append(0)
+
+    syllables = []
+    i, n = 0, len(chars)
+    while i < n:
+        if not chars[i].isalpha():
+            i += 1
+            continue
+        j = i
+        while j < n and chars[j].isalpha():
+            j += 1
+        letters = ''.join(chars[i:j])
+        if letters == 'r' and syllables and chars[i - 1].isdigit():
+            # Erhua after the tone number: dian3r
+            run = [syllables.pop()]
+            run[0][0] += 'r'
+        else:
+            run = _segment(letters, tones[i:j])
+        if run is None:
+            if strict:
+                return None
+            run = [[letters, max(tones[i:j])]]
+        if j < n and chars[j].isdigit():
+            run[-1][1] = int(chars[j]) if chars[j] in '1234' else 0
+            j += 1
+        syllables.extend(run)
+        i = j
+    return tuple((syllable, tone) for syllable, tone in syllables)
+
+
+def normalize_pinyin(text: str) -> str:
+    """
+    Canonical form of pinyin for comparison and search: lowercase numbered syllables separated by
+    spaces, ü as v and no digit for the neutral tone, e.g. 'Nǐ hǎo' -> 'ni3 hao3', 'lu:5' -> 'lv'.
+    """
+    return ' '.join(f"{syllable}{tone or ''}" for syllable, tone in pinyin_syllables(text))
+
+
+def normalize_pinyin_series(series: pd.Series) -> pd.Series:
+    """normalize_pinyin over a Series, computed once per distinct value.  Missing values become ''."""
+    codes, uniques = pd.factorize(series.fillna('').astype(str))
+    normalized = np.array([normalize_pinyin(value) for value in uniques], dtype=object)
+    return pd.Series(normalized[codes], index=series.index)
+
+
+def pinyin_search_key(text: str):
+    """
+    Normalized pinyin for a search box entry that is pinyin with at least one tone (mark or number),
+    e.g. 'hǎo' or 'ni3 hao'; None for anything else (Chinese, English, toneless pinyin).
+    """
+    syllables = pinyin_syllables(text, strict=True)
+    if not syllables or not any(tone for _, tone in syllables):
+        return None
+    return normalize_pinyin(text)
+
+
+def split_syllable(syllable: str) -> tuple:
+    """(initial, final) of a toneless syllable, e.g. 'zhang' -> ('zh', 'ang'), 'an' -> ('', 'an')."""
+    for initial in INITIALS:
+        if syllable.startswith(initial) and len(syllable) > len(initial):
+            return initial, syllable[len(initial):]
+    return '', syllable
+
+
+def _parse_normalized(normalized: str) -> list:
+    syllables = []
+    for token in normalized.split():
+        if token[-1] in '1234':
+            syllables.append((token[:-1], int(token[-1])))
+        else:
+            syllables.append((token, 0))
+    return syllables
+
+
+@lru_cache(maxsize=65536)
+def pinyin_error_type(expected: str, answer: str) -> str:
+    """
+    Syllable-level difference between two normalize_pinyin strings: '' when they match, otherwise the
+    kinds of error found, in ERROR_KINDS order ('tone', 'initial, tone', 'syllable count', ...).
+    """
+    if expected == answer:
+        return ''
+    if not answer:
+        return 'no answer'
+    expected_syllables, answer_syllables = _parse_normalized(expected), _parse_normalized(answer)
+    if len(expected_syllables) != len(answer_syllables):
+        return 'syllable count'
+
+    kinds = set()
+    for (expected_syllable, expected_tone), (answer_syllable, answer_tone) in zip(expected_syllables, answer_syllables):
+        expected_initial, expected_final = split_syllable(expected_syllable)
+        answer_initial, answer_final = split_syllable(answer_syllable)
+        if expected_initial != answer_initial:
+            kinds.add('initial')
+        if expected_final != answer_final:
+            kinds.add('final')
+        if expected_tone != answer_tone:
+            kinds.add('tone')
+    return ', '.join(kind for kind in ERROR_KINDS if kind in kinds)
+
+
+def pinyin_error_types(expected: pd.Series, answer: pd.Series) -> pd.Series:
+    """pinyin_error_type over two aligned Series of normalized pinyin, computed once per distinct pair."""
+    expected_codes, expected_values = pd.factorize(expected)
+    answer_codes, answer_values = pd.factorize(answer)
+    pair_codes, pairs = pd.factorize(expected_codes * max(len(answer_values), 1) + answer_codes)
+    error_types = np.array([
+        pinyin_error_type(expected_values[pair // max(len(answer_values), 1)],
+                          answer_values[pair % max(len(answer_values), 1)])
+        for pair in pairs
+    ], dtype=object)
+    return pd.Series(error_types[pair_codes], index=expected.index)
@@ -7,12 +7,17 @@ import pandas as pd
 import time
 
 import os
-from io import StringIO
 from datetime import datetime
 
-from main.sql import sql_update_quizlog, load_dict
+from main.sql import sql_update_quizlog, load_dict, load_due_word_ids
+from main.data_cache import get_dict_df
+from main.ranking import get_top_error_word_ids
+from main.sampling import get_quiz_sampler, record_quiz_results
+from main.pinyin import normalize_pinyin_series, pinyin_error_types
+from main.meaning_grader import pregrade_meanings
 from main.gsheets import load_gsheet_dict, save_df_to_gsheet
-from main.utils import get_completion
+from main.utils import get_completion, parse_table_output
+from main.schemas import QUIZ_MEANING_SCHEMA, use_structured_output
 from database import engine
 
 def calculate_adaptive_weights(
@@ -59,60 +64,6 @@ def calculate_adaptive_weights(
     return (powered / powered.sum()).values
 
 
-def get_top_error_word_ids(df: pd.DataFrame, n: int = 20, error_type: str = 'pinyin') -> list:
-    """
-    Returns up to n word_ids for the worst-performing words.
-
-    Uses the same aggregation as the statistics chart (prepare_df-equivalent).
-    For words with multiple word_ids (multiple meanings), selects the word_id
-    that has the most errors so the most-problem variant is quizzed.
-
-    Args:
-        df:         DataFrame returned by load_dict().
-        n:          Maximum number of words to return (default 20).
-        error_type: 'pinyin' to rank by pinyin error rate,
-                    'meaning' to rank by meaning error rate.
-
-    Returns:
-        List of word_id strings (length <= n).
-    """
-    work = df.copy()
-    # Mirror prepare_df: recalculate wrong counts the same way the chart does
-    work['Num Pinyin Wrong'] = work['Quiz Attempts'] - work['Num Pinyin Correct']
-    work['Num Meaning Wrong'] = work['Quiz Attempts'] - work['Num Meaning Correct']
-
-    wrong_col = 'Num Meaning Wrong' if error_type == 'meaning' else 'Num Pinyin Wrong'
-
-    agg = (
-        work.groupby('Word')
-        .agg(num_wrong=(wrong_col, 'sum'),
-             quiz_attempts=('Quiz Attempts', 'sum'))
-        .reset_index()
-    )
-    agg = agg[agg['quiz_attempts'] > 1]
-    agg['pct'] = agg['num_wrong'] / agg['quiz_attempts']
-    top_words_series = (
-        agg[agg['num_wrong'] >= 1]
-        .sort_values(by=['pct', 'num_wrong'], ascending=[False, False])
-        .head(n)['Word']
-    )
-
-    # For each word, prefer the word_id with the most errors (most problem variant).
-    # Fall back to random choice if all word_ids have 0 attempts.
-    word_ids = []
-    for word in top_words_series:
-        word_rows = work[work['Word'] == word]
-        rows_with_history = word_rows[word_rows['Quiz Attempts'] > 0]
-        if not rows_with_history.empty:
-            # Pick the word_id with the highest wrong count for this error type
-            best_row = rows_with_history.loc[rows_with_history[wrong_col].idxmax()]
-            word_ids.append(str(best_row['Word Id']))
-        elif not word_rows.empty:
-            word_ids.append(str(np.random.choice(word_rows['Word Id'].tolist())))
-
-    return word_ids
-
-
 def get_prompt_generate_word_quiz(
     word_dict: pd.DataFrame,
     startfrom_date_filter: str = None,
@@ -210,22 +161,51 @@ def get_prompt_evaluate_quiz(
     return prompt
 
 
-def parse_meaning_table(content: str) -> pd.DataFrame:
+def grade_meanings_with_llm(word_list, sentence_list, meaning_answer, structured: bool = False) -> pd.DataFrame:
     '''
-    Parse the table response from OpenAI into a pandas DataFrame
+    Grade meaning answers with the LLM (get_prompt_evaluate_quiz_meaning_only), one row per word.  Module
+    level so it can run in a background callback worker without a QuizGenerator.
     '''
-    data = StringIO(content)
+    quiz_prompt = get_prompt_evaluate_quiz_meaning_only(
+        word_list = word_list,
+        sentence_list = sentence_list,
+        meaning = meaning_answer
+        )
+
+    if isinstance(meaning_answer, (list, tuple)):
+        num_items = len(meaning_answer)
+    else:
+        num_items = len(word_list)
+
+    schema = QUIZ_MEANING_SCHEMA if structured else None
+    sample_response_translation = get_completion(prompt=quiz_prompt, temperature=1, category='quiz_eval', num_items=num_items, schema=schema)
+    meaning_eval_df = parse_table_output(sample_response_translation.output_text, schema=schema)
+    return meaning_eval_df.reset_index(drop=True)
+
 
-    # Read the table into a pandas DataFrame
-    df = pd.read_csv(data, delimiter='|',  engine='python')
-    df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
-    col_to_keep = [col for col in df if 'Unnamed' not in col]
-    df = df[col_to_keep]
-    df.columns = df.columns.str.strip()
+def apply_llm_meaning_grades(meaning_eval_df: pd.DataFrame, rows, llm_df: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Fill Meaning Correct / Correction of the given rows (index labels of meaning_eval_df) from llm_df,
+    the grade_meanings_with_llm result for those rows in the same order, and mark them graded by 'llm'.
+    '''
+    rows = list(rows)
+    llm_df = llm_df.reset_index(drop=True).reindex(range(len(rows)))
+    for col in ['Meaning Correct', 'Meaning Correction']:
+        meaning_eval_df.loc[rows, col] = llm_df[col].to_numpy() if col in llm_df.columns else None
+    meaning_eval_df.loc[rows, 'Meaning Grading Source'] = 'llm'
+    return meaning_eval_df
 
-    col = df.columns[0]
-    df = df.loc[~df[col].str.contains('--')]
-    return df
+
+def save_quiz_result(quiz_result: pd.DataFrame) -> str:
+    '''
+    Append an evaluated quiz (evaluate_pinyin_and_meaning_quiz output) to QuizLog and the per-word
+    tables, and record it in the quiz sampler.  Raises RuntimeError if the save fails.
+    '''
+    result = sql_update_quizlog(quiz_result)
+    if result != "Saved quiz result.":
+        raise RuntimeError(f"Failed to save quiz log: {result}")
+    record_quiz_results(quiz_result)
+    return "Quiz Log Updated"
 
 
 class QuizGenerator:
@@ -235,10 +215,12 @@ class QuizGenerator:
             gsheet_name: str = None,
             wks_name: str = None,
             table_name: str = None, 
-            df: pd.DataFrame = None
+            df: pd.DataFrame = None,
+            structured: bool = None
             ):
         self.gsheet_name = gsheet_name
         self.wks_name = wks_name
+        self.structured = use_structured_output(structured)
         if df is not None:
             self.dict_df = df
         else:
@@ -246,7 +228,18 @@ class QuizGenerator:
                 self.dict_df = load_gsheet_dict(gsheet_mode=True, gsheet_name=gsheet_name, worksheet_name=wks_name)
                 self.dict_df.columns = [col.lower().replace(' ', '_') for col in self.dict_df.columns]
             else:
-                self.dict_df = load_dict()
+                # Shared dictionary: read from the data cache when used, and sampled through main.sampling
+                self.dict_df = None
+
+    @property
+    def dict_df(self) -> pd.DataFrame:
+        if self._dict_df is None:
+            return get_dict_df()
+        return self._dict_df
+
+    @dict_df.setter
+    def dict_df(self, df: pd.DataFrame) -> None:
+        self._dict_df = df
 
     def generate_pinyin_and_meaning_quiz(
             self, 
@@ -264,25 +257,59 @@ class QuizGenerator:
             seed: float = 0.01,
             word_ids: List[str] = None,
             top_error_type: str = None,
+            spaced_repetition: bool = False,
         ) -> pd.DataFrame:
         self.new_words_only = new_words_only
-        self.spread_power = spread_power if adaptive_sampling else 1.0
+        self.spread_power = spread_power if adaptive_sampling and not spaced_repetition else 1.0
         self.top_error_type = top_error_type
-        dict_df = self.dict_df.copy()
 
         # When explicit word_ids are provided, skip all filters and sampling
         if word_ids is not None:
+            dict_df = self.dict_df
             dict_df = dict_df[dict_df[id_column].isin(word_ids)]
             quiz_answer_key = dict_df[
-                ['Word Id', 'Word', 'Word Category', 'Sentence', 'Sentence Pinyin', 'Pinyin', 'Pinyin Simplified']
+                ['Word Id', 'Word', 'Word Category', 'Sentence', 'Sentence Pinyin', 'Pinyin', 'Pinyin Simplified', 'Meaning']
             ].sample(frac=1).reset_index(drop=True)
-            quiz_df = quiz_answer_key.drop(columns=['Pinyin', 'Pinyin Simplified', 'Sentence Pinyin'])
+            quiz_df = quiz_answer_key.drop(columns=['Pinyin', 'Pinyin Simplified', 'Sentence Pinyin', 'Meaning'])
             quiz_df['Pinyin'] = ''
             quiz_df['Meaning'] = ''
             self.answer_key = quiz_answer_key
             self.quiz = quiz_df
             return quiz_df
 
+        if spaced_repetition:
+            # Words due for review first (main/scheduler.py), picked by an indexed query on WordSchedule
+            due_ids = load_due_word_ids(
+                num_words,
+                date_filter=date_filter,
+                categories=[category_filter] if type(category_filter) == str else None,
+                rarities=[rarity_filter] if type(rarity_filter) == str else rarity_filter,
+                new_words_only=new_words_only,
+            )
+            dict_df = self.dict_df
+            return self._set_quiz(dict_df[dict_df[id_column].isin(due_ids)])
+
+        if self._dict_df is None:
+            # Shared dictionary: draw from the precomputed sampling index instead of filtering the frame
+            sampler = get_quiz_sampler()
+            # Same filters as the frame path below, where only a single (str) category is applied
+            category_filter = [category_filter] if type(category_filter) == str else None
+            if type(rarity_filter) == str:
+                rarity_filter = [rarity_filter]
+            rows = sampler.sample(
+                num_words,
+                date_filter=date_filter,
+                categories=category_filter,
+                rarities=rarity_filter,
+                new_words_only=new_words_only,
+                adaptive=adaptive_sampling,
+                seed=seed,
+                spread_power=spread_power,
+            )
+            quiz_df = sampler.df.iloc[rows]
+            return self._set_quiz(quiz_df)
+
+        dict_df = self.dict_df.copy()
 
         if date_filter is not None:
             dict_df = dict_df[dict_df[date_column] >= date_filter]
@@ -310,8 +337,11 @@ class QuizGenerator:
             quiz_id = pd.Series(unique_ids).sample(n=num_to_select, replace=False)
 
         quiz_df = dict_df.loc[dict_df[id_column].isin(quiz_id)]
-        quiz_answer_key = quiz_df[['Word Id', 'Word', 'Word Category', 'Sentence', 'Sentence Pinyin', 'Pinyin', 'Pinyin Simplified']].sample(frac=1, random_state=1).reset_index(drop=True)
-        quiz_df = quiz_answer_key.drop(columns=['Pinyin', 'Pinyin Simplified', 'Sentence Pinyin'])
+        return self._set_quiz(quiz_df)
+
+    def _set_quiz(self, quiz_df: pd.DataFrame) -> pd.DataFrame:
+        quiz_answer_key = quiz_df[['Word Id', 'Word', 'Word Category', 'Sentence', 'Sentence Pinyin', 'Pinyin', 'Pinyin Simplified', 'Meaning']].sample(frac=1, random_state=1).reset_index(drop=True)
+        quiz_df = quiz_answer_key.drop(columns=['Pinyin', 'Pinyin Simplified', 'Sentence Pinyin', 'Meaning'])
         quiz_df['Pinyin'] = ''
         quiz_df['Meaning'] = '' 
 
@@ -331,10 +361,14 @@ class QuizGenerator:
 
         pinyin_eval_df = answer_key_df.loc[answer_key_df['Word Id'].isin(quiz_df['Word Id'])][['Word Id', 'Word', 'Pinyin', 'Pinyin Simplified', 'Sentence Pinyin']].reset_index (drop=True)
         pinyin_eval_df['Pinyin Answer'] = pinyin_answer
-        pinyin_eval_df['Pinyin Simplified'] = pinyin_eval_df['Pinyin Simplified'].fillna('').apply(lambda x: x.replace(' ', '').lower().replace('5', ''))
-        pinyin_eval_df['Pinyin Answer'] = pinyin_eval_df['Pinyin Answer'].fillna('').apply(lambda x: x.replace(' ', '').lower().replace('5', ''))
+        # Compare normalized pinyin (tone marks or numbers, ü/v/u:, spacing and neutral tone all accepted)
+        expected = pinyin_eval_df['Pinyin Simplified'].where(
+            pinyin_eval_df['Pinyin Simplified'].fillna('').str.strip() != '', pinyin_eval_df['Pinyin'])
+        pinyin_eval_df['Pinyin Simplified'] = normalize_pinyin_series(expected)
+        pinyin_eval_df['Pinyin Answer'] = normalize_pinyin_series(pinyin_eval_df['Pinyin Answer'])
         pinyin_eval_df['Pinyin Correct'] = (pinyin_eval_df['Pinyin Simplified'] == pinyin_eval_df['Pinyin Answer'])
         pinyin_eval_df['Pinyin Correction'] = np.where(pinyin_eval_df['Pinyin Correct'], '', pinyin_eval_df['Pinyin Simplified'])
+        pinyin_eval_df['Pinyin Error Type'] = pinyin_error_types(pinyin_eval_df['Pinyin Simplified'], pinyin_eval_df['Pinyin Answer'])
         pinyin_eval_df['Pinyin Correct'] = pinyin_eval_df['Pinyin Correct'].map({True: 'yes', False: 'no'})
 
         self.pinyin_eval_df = pinyin_eval_df
@@ -342,51 +376,58 @@ class QuizGenerator:
 
     def check_meaning(
             self,
-            meaning_answer
+            meaning_answer,
+            local_grading: bool = True,
+            llm_grading: bool = True,
         ):
         '''
-        This function checks the meaning for the quiz provided.
+        This function checks the meaning for the quiz provided.  Answers that are blank or match the stored
+        meaning (exactly, or up to plurals/synonyms) are graded locally by
+        main.meaning_grader; only the rest are sent to the LLM, in one request.  With llm_grading=False
+        those rows are left ungraded (Meaning Grading Source None), for the caller to grade later with
+        grade_meanings_with_llm and apply_llm_meaning_grades.
         '''
         quiz_df = self.quiz
-        quiz_prompt = get_prompt_evaluate_quiz_meaning_only(
-            word_list = quiz_df['Word'].values,
-            sentence_list = quiz_df['Sentence'].values,
-            meaning = meaning_answer
-            )
-
-        if isinstance(meaning_answer, (list, tuple)):
-            num_items = len(meaning_answer)
-        elif isinstance(meaning_answer, str):
-            num_items = len(quiz_df)
-        else:
-            num_items = len(quiz_df)
+        if isinstance(meaning_answer, str) or len(meaning_answer) != len(quiz_df) or not local_grading:
+            # Not one answer per word: leave it all to the LLM
+            meaning_eval_df = self._llm_check_meaning(quiz_df, meaning_answer)
+            meaning_eval_df['Meaning Grading Source'] = 'llm'
+            self.meaning_eval_df = meaning_eval_df
+            return meaning_eval_df
+
+        answers = list(meaning_answer)
+        meaning_eval_df = pregrade_meanings(answers, self.answer_key['Meaning'])
+        pending = meaning_eval_df.index[meaning_eval_df['Meaning Grading Source'].isna()]
+        if len(pending) and llm_grading:
+            llm_df = self._llm_check_meaning(quiz_df.iloc[pending], [answers[i] for i in pending])
+            apply_llm_meaning_grades(meaning_eval_df, pending, llm_df)
 
-        sample_response_translation = get_completion(prompt=quiz_prompt, temperature=1, category='quiz_eval', num_items=num_items)
-        meaning_eval_df = parse_meaning_table(sample_response_translation.output_text)
-        meaning_eval_df = meaning_eval_df.reset_index(drop=True)
-        #meaning_eval_df.columns = [col.lower().replace(' ', '_') for col in meaning_eval_df.columns]
-        
         self.meaning_eval_df = meaning_eval_df
         return meaning_eval_df
 
+    def _llm_check_meaning(self, quiz_df: pd.DataFrame, meaning_answer) -> pd.DataFrame:
+        return grade_meanings_with_llm(quiz_df['Word'].values, quiz_df['Sentence'].values, meaning_answer, structured=self.structured)
+
 
     def evaluate_pinyin_and_meaning_quiz(
             self,
             pinyin_answer,
-            meaning_answer
+            meaning_answer,
+            llm_grading: bool = True,
         ):
         pinyin_eval_df = self.check_pinyin(
             pinyin_answer = pinyin_answer
             )
         meaning_eval_df = self.check_meaning(
-            meaning_answer = meaning_answer
+            meaning_answer = meaning_answer,
+            llm_grading = llm_grading,
             )
         
         outdf = pd.concat([
             self.answer_key[['Word Id']],
             self.quiz[['Word', 'Sentence']], 
-            pinyin_eval_df[['Sentence Pinyin', 'Pinyin Answer', 'Pinyin Correct', 'Pinyin Correction']], 
-            meaning_eval_df[['Meaning', 'Meaning Correct', 'Meaning Correction']]
+            pinyin_eval_df[['Sentence Pinyin', 'Pinyin Answer', 'Pinyin Correct', 'Pinyin Correction', 'Pinyin Error Type']], 
+            meaning_eval_df[['Meaning', 'Meaning Correct', 'Meaning Correction', 'Meaning Grading Source']]
             ], axis=1)
 
         outdf['last_quiz'] = datetime.now().strftime('%Y-%m-%d')
@@ -423,8 +464,5 @@ class QuizGenerator:
         else:
 
 
-            result = sql_update_quizlog(self.quiz_result)
-
-            if result != "Saved quiz result.":
-                raise RuntimeError(f"Failed to save quiz log: {result}")
+            save_quiz_result(self.quiz_result)
         return "Quiz Log Updated"
\ No newline at end of file
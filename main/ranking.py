@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+
+# error_type -> (correct-count column, wrong-count column, error-rate column)
+ERROR_TYPES = {
+    'pinyin': ('Num Pinyin Correct', 'Num Pinyin Wrong', 'Pinyin Wrong %'),
+    'meaning': ('Num Meaning Correct', 'Num Meaning Wrong', 'Meaning Wrong %'),
+}
+
+
+def rank_error_words(df: pd.DataFrame, error_type: str = 'pinyin', n: int = 20,
+                     extra_cols: tuple = ()) -> pd.DataFrame:
+    """
+    Rank words by error rate, as shown on the statistics page, in the daily email and used by the
+    top-errors quiz.
+
+    Rows are summed per Word (a word with several meanings has several rows). Only words with more
+    than one attempt and at least one error are kept. They are ranked by error rate, then by error
+    count. Wrong counts are Quiz Attempts minus the correct count (as in prepare_df).
+
+    Args:
+        df:         DataFrame returned by load_dict() (prepare_df output works too).
+        error_type: 'pinyin' or 'meaning'.
+        n:          Maximum number of words to return.
+        extra_cols: Columns to carry along, taken from each word's first row (e.g. 'Pinyin').
+
+    Returns:
+        DataFrame with Word, the wrong-count column, Quiz Attempts, the error-rate column (percent,
+        rounded to 1 decimal) and extra_cols, best first.
+    """
+    correct_col, wrong_col, pct_col = ERROR_TYPES[error_type]
+    codes, words, num_wrong, num_attempts, order = _rank(df, correct_col, n)
+    top = pd.DataFrame({
+        'Word': words[order],
+        wrong_col: num_wrong[order].astype(np.int64),
+        'Quiz Attempts': num_attempts[order].astype(np.int64),
+    })
+    top[pct_col] = (top[wrong_col] / top['Quiz Attempts'] * 100).round(1)
+
+    if extra_cols:
+        first = df[np.isin(codes, order)].groupby('Word')[list(extra_cols)].first()
+        top = top.join(first, on='Word')
+    return top
+
+
+def _rank(df: pd.DataFrame, correct_col: str, n: int) -> tuple:
+    """
+    Per-word sums without a groupby on the Word strings: factorize once and add up with bincount.
+    Returns (row codes, words, wrong and attempt sums per word, codes of the top n words best first).
+    Ties are broken by Word, as the sorted groupby('Word') this replaces did.
+    """
+    codes, words = pd.factorize(df['Word'])
+    words = np.asarray(words, dtype=object)
+    attempts = df['Quiz Attempts'].to_numpy(dtype=np.float64)
+    wrong = attempts - df[correct_col].to_numpy(dtype=np.float64)
+    valid = codes >= 0  # rows without a Word are dropped, as groupby does
+    num_attempts = np.bincount(codes[valid], weights=attempts[valid], minlength=len(words))
+    num_wrong = np.bincount(codes[valid], weights=wrong[valid], minlength=len(words))
+
+    candidates = np.flatnonzero((num_attempts > 1) & (num_wrong >= 1))
+    rate = num_wrong[candidates] / num_attempts[candidates]
+    # lexsort sorts by its last key first: rate, then wrong count, both descending
+    ranked = np.lexsort((-num_wrong[candidates], -rate))
+    if len(ranked) > n > 0:
+        # Keep everything tied with the n-th word, then order that short list by Word as well
+        last = ranked[n - 1]
+        tied = (rate[ranked[n:]] == rate[last]) & (num_wrong[candidates[ranked[n:]]] == num_wrong[candidates[last]])
+        ranked = ranked[:n + np.count_nonzero(tied)]
+    top = sorted(candidates[ranked], key=lambda code: (-num_wrong[code] / num_attempts[code], -num_wrong[code], words[code]))
+    order = np.array(top[:max(n, 0)], dtype=np.intp)
+    return codes, words, num_wrong, num_attempts, order
+
+
+def get_top_error_word_ids(df: pd.DataFrame, n: int = 20, error_type: str = 'pinyin') -> list:
+    """
+    word_id for each of the top n words of rank_error_words, best first. For words with several
+    word_ids (several meanings), the one with the most errors of error_type is picked. Ties go to the
+    first row. If none of a word's rows has quiz attempts, a random one is picked.
+    """
+    correct_col, _, _ = ERROR_TYPES[error_type]
+    codes, words, _, _, order = _rank(df, correct_col, n)
+    if len(order) == 0:
+        return []
+
+    rows = np.isin(codes, order)
+    attempts = df['Quiz Attempts'].to_numpy()[rows]
+    cand = pd.DataFrame({
+        'code': codes[rows],
+        'Word Id': df['Word Id'].to_numpy()[rows].astype(str),
+        'wrong': attempts - df[correct_col].to_numpy()[rows],
+    })
+    with_history = cand[attempts > 0]
+    best = with_history.loc[with_history.groupby('code')['wrong'].idxmax()]
+    best_ids = dict(zip(best['code'], best['Word Id']))
+
+    word_ids = []
+    for code in order:
+        if code in best_ids:
+            word_ids.append(best_ids[code])
+        else:
+            word_ids.append(str(np.random.choice(cand.loc[cand['code'] == code, 'Word Id'].tolist())))
+    return word_ids
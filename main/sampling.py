@@ -0,0 +1,276 @@
+import bisect
+import threading
+
+import numpy as np
+import pandas as pd
+
+from main.sql import get_data_version, last_quiz_save_versions
+
+
+class FenwickTree:
+    """
+    Binary indexed tree over a float array: point updates, prefix sums and "which element holds
+    cumulative weight u" lookups in O(log n).
+    """
+
+    def __init__(self, weights: np.ndarray):
+        weights = np.asarray(weights, dtype=np.float64)
+        self.n = len(weights)
+        # tree[i] = sum of weights[i - lowbit(i + 1) + 1 .. i], built in O(n) from the cumulative sums
+        cumsum = np.concatenate(([0.0], np.cumsum(weights)))
+        idx = np.arange(1, self.n + 1)
+        self.tree = cumsum[idx] - cumsum[idx - (idx & -idx)]
+        self._top_bit = 1 << (self.n.bit_length() - 1) if self.n else 0
+
+    def add(self, i: int, delta: float) -> None:
+        """Add delta to element i."""
+        tree = self.tree
+        i += 1
+        while i <= self.n:
+            tree[i - 1] += delta
+            i += i & -i
+
+    def prefix(self, i: int) -> float:
+        """Sum of the first i elements."""
+        tree = self.tree
+        total = 0.0
+        while i > 0:
+            total += tree[i - 1]
+            i -= i & -i
+        return total
+
+    def find(self, u: float) -> int:
+        """Smallest index i with prefix(i + 1) > u."""
+        tree = self.tree
+        pos = 0
+        step = self._top_bit
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and tree[nxt - 1] <= u:
+                pos = nxt
+                u -= tree[nxt - 1]
+            step >>= 1
+        return min(pos, self.n - 1)
+
+
+class QuizSampler:
+    """
+    Sampling index for QuizGenerator.generate_pinyin_and_meaning_quiz.
+
+    Rows are laid out grouped by (category, rarity) bucket and sorted by date inside each bucket, so
+    any category x rarity x "added on or after" filter is a handful of contiguous ranges.  Each weight
+    scheme (adaptive weights for a (seed, spread_power), uniform, new words only) is a Fenwick tree
+    over that layout, built on first use.  Drawing k words without replacement is then O(k log n)
+    plus O(number of buckets) per draw, instead of filtering and re-weighting the whole frame.
+
+    Adaptive weights follow calculate_adaptive_weights, with the maxima taken over the whole
+    dictionary rather than over the filtered rows, so one tree serves every filter.
+    record_results() applies saved quiz results in place.
+    """
+
+    def __init__(
+            self,
+            df: pd.DataFrame,
+            id_column: str = 'Word Id',
+            date_column: str = 'Added Date',
+            category_column: str = 'Word Category',
+            rarity_column: str = 'Word Rarity',
+    ):
+        self.df = df
+        self._lock = threading.Lock()
+        n = len(df)
+
+        dates = df[date_column]
+        dates = dates.where(dates.notna(), '').astype(str).to_numpy(dtype=object)
+        date_codes, _ = pd.factorize(dates, sort=True)
+        # Missing category/rarity values get a bucket of their own, like any other value
+        category_codes, categories = pd.factorize(df[category_column], use_na_sentinel=False)
+        rarity_codes, rarities = pd.factorize(df[rarity_column], use_na_sentinel=False)
+        num_rarities = max(len(rarities), 1)
+        bucket_codes = category_codes * num_rarities + rarity_codes
+        # Layout order: by bucket, then date; _rows[pos] is the df row at layout position pos
+        self._rows = np.lexsort((date_codes, bucket_codes))
+        sorted_codes = bucket_codes[self._rows]
+        self._dates = dates[self._rows]
+        self._pos_by_id = dict(zip(df[id_column].astype(str).tolist(), np.argsort(self._rows).tolist()))
+
+        # (category, rarity) -> (start, end) layout range
+        self._ranges = {}
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if n else []
+        for start, end in zip(starts, list(starts[1:]) + [n]):
+            category, rarity = divmod(int(sorted_codes[start]), num_rarities)
+            self._ranges[(categories[category], rarities[rarity])] = (int(start), int(end))
+
+        def counts(column):
+            if column not in df.columns:
+                return np.zeros(n)
+            return df[column].fillna(0).to_numpy(dtype=np.float64)[self._rows]
+
+        self._attempts = counts('Quiz Attempts')
+        self._wrong = counts('Num Pinyin Wrong') + counts('Num Meaning Wrong')
+        self._correct = counts('Num Pinyin Correct') + counts('Num Meaning Correct')
+        self._trees = {}
+
+    def _weights(self, layer, positions=slice(None)) -> np.ndarray:
+        """Weights of layer at the given layout positions (all of them by default)."""
+        attempts = self._attempts[positions]
+        if layer == 'uniform':
+            return np.ones(len(attempts))
+        if layer == 'new':
+            return (attempts == 0).astype(np.float64)
+        seed, spread_power = layer
+        max_wrong, max_correct = self._wrong.max(initial=0), self._correct.max(initial=0)
+        denominator = max_wrong + max_correct
+        if denominator == 0:  # all new words with no history yet
+            return np.ones(len(attempts))
+        wrong, correct = self._wrong[positions], self._correct[positions]
+        base = (wrong + np.clip(max_wrong - correct, 0, None)) / denominator + seed
+        return base ** spread_power
+
+    def _tree(self, layer) -> tuple:
+        if layer not in self._trees:
+            if len(self._trees) >= 8:
+                self._trees.pop(next(iter(self._trees)))
+            weights = self._weights(layer)
+            self._trees[layer] = (FenwickTree(weights), weights)
+        return self._trees[layer]
+
+    def _filter_ranges(self, date_filter, categories, rarities) -> list:
+        ranges = []
+        for (category, rarity), (start, end) in self._ranges.items():
+            if categories is not None and category not in categories:
+                continue
+            if rarities is not None and rarity not in rarities:
+                continue
+            if date_filter is not None:
+                start = bisect.bisect_left(self._dates, str(date_filter), start, end)
+            if end > start:
+                ranges.append((start, end))
+        return ranges
+
+    def sample(
+            self,
+            k: int,
+            date_filter: str = None,
+            categories: list = None,
+            rarities: list = None,
+            new_words_only: bool = False,
+            adaptive: bool = True,
+            seed: float = 0.01,
+            spread_power: float = 1.0,
+    ) -> np.ndarray:
+        """
+        Draw up to k distinct rows, without replacement and in proportion to their weights, among
+        rows with date >= date_filter, category in categories and rarity in rarities (None = any).
+        New words only are drawn uniformly, as are all rows when adaptive is False.
+
+        Returns:
+            Positions of the drawn rows in self.df, in df order.
+        """
+        layer = 'new' if new_words_only else (seed, float(spread_power)) if adaptive else 'uniform'
+        ranges = self._filter_ranges(date_filter, categories, rarities)
+        picked = []
+        with self._lock:
+            tree, weights = self._tree(layer)
+            totals = np.array([tree.prefix(end) - tree.prefix(start) for start, end in ranges])
+            removed = []
+            try:
+                while len(picked) < k and len(totals):
+                    total = totals.sum()
+                    if total <= 1e-12:
+                        break
+                    cumulative = np.cumsum(totals)
+                    b = min(int(np.searchsorted(cumulative, np.random.random() * total, side='right')), len(ranges) - 1)
+                    start, end = ranges[b]
+                    pos = tree.find(tree.prefix(start) + np.random.random() * totals[b])
+                    pos = min(max(pos, start), end - 1)
+                    weight = weights[pos]
+                    if weight <= 0:
+                        # Rounding put the draw on an exhausted row; recompute this range's total
+                        residual = tree.prefix(end) - tree.prefix(start)
+                        totals[b] = residual if residual > 1e-9 * total else 0.0
+                        continue
+                    # Take the row out until the draw is done
+                    tree.add(pos, -weight)
+                    weights[pos] = 0.0
+                    removed.append((pos, weight))
+                    totals[b] -= weight
+                    picked.append(pos)
+            finally:
+                for pos, weight in removed:
+                    tree.add(pos, weight)
+                    weights[pos] = weight
+        return np.sort(self._rows[picked]) if picked else np.array([], dtype=np.intp)
+
+    def record_results(self, quiz_result: pd.DataFrame) -> None:
+        """
+        Apply saved quiz results (QuizGenerator.quiz_result: Word Id, Pinyin Correct, Meaning Correct)
+        to the counts, updating the built trees in place.  Adaptive trees are dropped and rebuilt on
+        next use if the dictionary-wide maxima changed, since those scale every weight.
+        """
+        with self._lock:
+            max_before = (self._wrong.max(initial=0), self._correct.max(initial=0))
+            touched = []
+            for rec in quiz_result.to_dict('records'):
+                pos = self._pos_by_id.get(str(rec.get('Word Id')))
+                if pos is None:
+                    continue
+                self._attempts[pos] += 1
+                for col in ('Pinyin Correct', 'Meaning Correct'):
+                    answer = str(rec.get(col) or '').lower()
+                    if answer == 'yes':
+                        self._correct[pos] += 1
+                    elif answer == 'no':
+                        self._wrong[pos] += 1
+                touched.append(pos)
+            if not touched:
+                return
+
+            if (self._wrong.max(initial=0), self._correct.max(initial=0)) != max_before:
+                self._trees = {layer: tree for layer, tree in self._trees.items() if layer in ('uniform', 'new')}
+            positions = np.unique(touched)
+            for layer, (tree, weights) in self._trees.items():
+                for pos, new_weight in zip(positions, self._weights(layer, positions)):
+                    if new_weight != weights[pos]:
+                        tree.add(int(pos), new_weight - weights[pos])
+                        weights[pos] = new_weight
+
+
+_sampler = None
+_sampler_versions = None
+_sampler_lock = threading.Lock()
+
+
+def get_quiz_sampler() -> QuizSampler:
+    """
+    Sampler over the cached dictionary (main.data_cache).  Rebuilt when WordDict changes, or when
+    QuizAgg changes by anything other than a quiz passed to record_quiz_results.
+    """
+    from main.data_cache import data_cache
+
+    global _sampler, _sampler_versions
+    with _sampler_lock:
+        versions = (get_data_version('WordDict'), get_data_version('QuizAgg'))
+        if _sampler is None or _sampler_versions != versions:
+            _sampler = QuizSampler(data_cache.get('dict', copy=False))
+            _sampler_versions = versions
+        return _sampler
+
+
+def record_quiz_results(quiz_result: pd.DataFrame) -> None:
+    """
+    Apply a quiz that was just saved with sql_update_quizlog to the shared sampler, so it stays
+    current without a rebuild.  Call it once per saved quiz, after the save.
+    """
+    global _sampler_versions
+    with _sampler_lock:
+        if _sampler is None:
+            return
+        versions = (get_data_version('WordDict'), get_data_version('QuizAgg'))
+        # Only the save changed QuizAgg since the sampler was built; anything else (another writer)
+        # leaves it for a rebuild
+        saved = last_quiz_save_versions()
+        if saved is None or versions != (_sampler_versions[0], saved[1]) or _sampler_versions[1] != saved[0]:
+            return
+        _sampler.record_results(quiz_result)
+        _sampler_versions = versions
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+
+# SM-2 spaced repetition (the algorithm behind Anki's scheduler), one review per QuizLog row.
+# A word's state is its WordSchedule row: repetitions (successful reviews in a row), ease (how fast
+# the interval grows, SM-2's E-Factor), stability (the current interval in days) and due date.
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+# Intervals in days after the first and second successful review in a row; later ones are stability * ease
+FIRST_INTERVALS = (1.0, 6.0)
+
+
+def review_grade(pinyin_correct, meaning_correct) -> int:
+    """
+    SM-2 grade (0-5) of one quiz answer: 5 when pinyin and meaning are both right, 3 (a pass, but
+    hard) when one of them is, 1 (a lapse) when neither is.
+    """
+    num_correct = sum(str(answer or '').lower() == 'yes' for answer in (pinyin_correct, meaning_correct))
+    return {2: 5, 1: 3}.get(num_correct, 1)
+
+
+def next_review(state: dict, grade: int, reviewed_at: datetime) -> dict:
+    """
+    Schedule after a review with grade at reviewed_at.  state is the word's current schedule (None for
+    a word never reviewed).  Returns the new schedule as WordSchedule columns (without word_id).
+    """
+    repetitions = state['repetitions'] if state else 0
+    ease = state['ease'] if state else INITIAL_EASE
+    stability = state['stability'] if state else 0.0
+
+    if grade < 3:
+        # Lapse: start over from the first interval
+        repetitions = 0
+        stability = FIRST_INTERVALS[0]
+    else:
+        repetitions += 1
+        stability = FIRST_INTERVALS[repetitions - 1] if repetitions <= len(FIRST_INTERVALS) else stability * ease
+    ease = max(MIN_EASE, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+
+    return {
+        'repetitions': repetitions,
+        'ease': ease,
+        'stability': stability,
+        'due': reviewed_at + timedelta(days=stability),
+        'last_review': reviewed_at,
+    }
+
+
+def apply_reviews(reviews, states: dict = None) -> dict:
+    """
+    Replay reviews, an iterable of (word_id, pinyin_correct, meaning_correct, reviewed_at) in the order
+    they happened, on top of states (word_id -> schedule, e.g. the current WordSchedule rows).
+
+    Returns:
+        word_id -> new schedule, for the words reviewed only.
+    """
+    states = dict(states or {})
+    updated = {}
+    for word_id, pinyin_correct, meaning_correct, reviewed_at in reviews:
+        state = next_review(states.get(word_id), review_grade(pinyin_correct, meaning_correct), reviewed_at)
+        states[word_id] = updated[word_id] = state
+    return updated
@@ -0,0 +1,149 @@
+import os
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# Structured-output mode: pipelines pass one of the schemas below to get_completion(schema=...) and the
+# model returns {"rows": [...]} JSON instead of a markdown table.  Off by default; set
+# LLM_STRUCTURED_OUTPUT=1 in .env, or pass structured=True to a pipeline.
+STRUCTURED_OUTPUT_ENABLED = os.getenv('LLM_STRUCTURED_OUTPUT', '0').strip('"') == '1'
+
+STRUCTURED_OUTPUT_INSTRUCTION = (
+    "Return the rows as JSON matching the provided response schema instead of a markdown table. "
+    "Use exactly the column names above as the keys of each row."
+)
+
+
+def use_structured_output(structured: bool = None) -> bool:
+    """An explicit structured argument wins; otherwise fall back to LLM_STRUCTURED_OUTPUT."""
+    return STRUCTURED_OUTPUT_ENABLED if structured is None else bool(structured)
+
+
+def table_schema(name: str, columns: dict) -> dict:
+    """
+    Build a Responses API json_schema text format for a table: an object with a "rows" array whose
+    items have one required property per column.  columns maps column name to either a JSON type
+    ('string', 'integer', ...) or a full JSON schema dict (e.g. an enum).
+    """
+    properties = {
+        col: ({"type": spec} if isinstance(spec, str) else spec)
+        for col, spec in columns.items()
+    }
+    return {
+        "type": "json_schema",
+        "name": name,
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "rows": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": properties,
+                        "required": list(properties),
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["rows"],
+            "additionalProperties": False,
+        },
+    }
+
+
+def _enum(*values) -> dict:
+    return {"type": "string", "enum": list(values)}
+
+
+TRANSLATION_SCHEMA = table_schema('translation', {
+    'Word': 'string',
+    'Pinyin': 'string',
+    'Pinyin Simplified': 'string',
+    'Type': 'string',
+    'Word Category': 'string',
+    'Meaning': 'string',
+    'Sentence': 'string',
+    'Sentence Pinyin': 'string',
+    'Sentence Meaning': 'string',
+})
+
+RARITY_SCHEMA = table_schema('rarity_classification', {
+    'Word': 'string',
+    'Word Rarity': _enum('Common', 'Uncommon', 'Rare'),
+    'Rarity Score': 'integer',
+})
+
+QUIZ_MEANING_SCHEMA = table_schema('quiz_meaning_eval', {
+    'Word List': 'string',
+    'Meaning': 'string',
+    'Meaning Correct': _enum('yes', 'no'),
+    'Meaning Correction': 'string',
+})
+
+PHRASE_SCHEMA = table_schema('phrase', {
+    'Line': 'string',
+    'Pinyin': 'string',
+    'Meaning': 'string',
+    'Response': 'string',
+    'Response Pinyin': 'string',
+    'Response Meaning': 'string',
+    'Complexity': _enum('Low', 'Medium', 'High'),
+    'Category': 'string',
+    'Tone': _enum('Polite', 'Casual'),
+})
+
+CHAT_QUIZ_SCHEMA = table_schema('chat_quiz', {
+    'Prompt': 'string',
+    'Prompt Pinyin': 'string',
+    'Response': 'string',
+    'Complexity': _enum('Low', 'Medium', 'High'),
+    'Tone': _enum('Polite', 'Casual'),
+})
+
+CONVO_EVAL_SCHEMA = table_schema('conversation_eval', {
+    'Prompt': 'string',
+    'Prompt Pinyin': 'string',
+    'Prompt Meaning': 'string',
+    'Response': 'string',
+    'Response Pinyin': 'string',
+    'Response Meaning': 'string',
+    'Correctness': 'integer',
+    'Naturalness': 'integer',
+    'Contextual Appropriateness': 'integer',
+    'Comment': 'string',
+    'Complexity': 'string',
+    'Tone': 'string',
+})
+
+TRANSLATION_EVAL_SCHEMA = table_schema('translation_eval', {
+    'Prompt': 'string',
+    'Prompt Pinyin': 'string',
+    'User Translation': 'string',
+    'Correct Translation': 'string',
+    'Correctness': 'integer',
+    'Tone Correctness': 'integer',
+    'Comment': 'string',
+    'Complexity': 'string',
+    'Tone': 'string',
+})
+
+WORD_COMPARISON_SCHEMA = table_schema('word_comparison', {
+    'Word1': 'string',
+    'Word1 Pinyin': 'string',
+    'Word2': 'string',
+    'Word2 Pinyin': 'string',
+    'Meaning': 'string',
+    'Part of Speech 1': 'string',
+    'Part of Speech 2': 'string',
+    'Word 1 Nuance': 'string',
+    'Word 2 Nuance': 'string',
+    'Word 1 Tone': 'string',
+    'Word 2 Tone': 'string',
+    'Word 1 Example': 'string',
+    'Word 1 Example Pinyin': 'string',
+    'Word 1 Example Meaning': 'string',
+    'Word 2 Example': 'string',
+    'Word 2 Example Pinyin': 'string',
+    'Word 2 Example Meaning': 'string',
+})
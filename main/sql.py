@@ -1,22 +1,136 @@
 import hashlib
+import os
+import sqlite3
+import threading
 
 from sqlalchemy.orm import Session
-from sqlalchemy import select, text
+from sqlalchemy import select, text, bindparam, DateTime
 from sqlalchemy.exc import SQLAlchemyError
-from database import engine
-from models import WordDict, QuizAgg, PhraseDict, QuizLog, ResponseLog, TranslationLog, WordComparison
+from database import (engine, seed_id_sequences, fts_match_query, has_index, begin_immediate, fts_rowids, refresh_fts,
+                      word_pinyin_normalized)
+from main.scheduler import apply_reviews
+from main.pinyin import pinyin_search_key
+from models import WordDict, QuizAgg, WordSchedule, PhraseDict, QuizLog, ResponseLog, TranslationLog, WordComparison
 import pandas as pd
 from typing import List
 
 
+# Per-table write counters, kept in DataVersion by triggers (database.ensure_data_versions), so a write
+# by any connection or process counts.  Caches (main/data_cache.py, the translation prompt's category
+# examples) stamp what they hold with these and reload once a table they were built from has changed.
+# They are read on a connection of their own, and only re-read when its PRAGMA data_version reports a
+# commit by another connection.
+_DATA_VERSIONS_SQL = "SELECT table_name, version FROM DataVersion"
+_data_versions = {}
+_data_versions_conn = None
+_data_versions_pid = None
+_data_versions_seen = None
+_data_versions_lock = threading.Lock()
+
+
+def get_data_version(table: str) -> int:
+    """
+    Return the write counter of table (see database.DATA_VERSION_TABLES).  Without the DataVersion
+    table (init_db not run) the value returned equals nothing, so every cache reloads.
+    """
+    global _data_versions, _data_versions_conn, _data_versions_pid, _data_versions_seen
+    with _data_versions_lock:
+        try:
+            if _data_versions_pid != os.getpid():
+                # sqlite3 connections must not cross a fork (Dash background callbacks run in worker processes)
+                _data_versions_conn = sqlite3.connect(engine.url.database, check_same_thread=False)
+                _data_versions_pid, _data_versions_seen = os.getpid(), None
+            seen = _data_versions_conn.execute("PRAGMA data_version").fetchone()[0]
+            if seen != _data_versions_seen:
+                _data_versions = dict(_data_versions_conn.execute(_DATA_VERSIONS_SQL).fetchall())
+                _data_versions_seen = seen
+        except sqlite3.Error:
+            # DataVersion not created yet (init_db not run): nothing can be told apart, so always reload
+            _data_versions_seen = None
+            return object()
+        return _data_versions.get(table, 0)
+
+
+# sql_update_quizlog records the QuizAgg versions before and after its writes (taken under the write
+# lock, so nothing else lands in between) for main.sampling.record_quiz_results, on the saving thread.
+_quiz_save_versions = threading.local()
+
+
+def last_quiz_save_versions():
+    """(QuizAgg version before, after) the last sql_update_quizlog on this thread, or None."""
+    return getattr(_quiz_save_versions, 'versions', None)
+
+
+_ALLOCATE_IDS_SQL = text("UPDATE IdSequence SET last_value = last_value + :count WHERE prefix = :prefix RETURNING last_value")
+
+
+def allocate_ids(session, prefix: str, count: int) -> List[str]:
+    """
+    Reserve count consecutive IDs for prefix (e.g. 'QW' -> ['QW000101', 'QW000102', ...]).
+
+    Advances the IdSequence counter with a single UPDATE in the caller's transaction, so the block
+    is only consumed if that transaction commits, and concurrent writers (which serialize on
+    SQLite's write lock) never receive overlapping blocks.  Call it before any read in the
+    transaction, so the transaction starts as a writer.
+    """
+    if count <= 0:
+        return []
+    row = session.execute(_ALLOCATE_IDS_SQL, {"count": count, "prefix": prefix}).fetchone()
+    if row is None:
+        # Sequence not seeded yet (init_db not run on this database): start after the table's max ID
+        seed_id_sequences(session.connection(), prefixes=[prefix])
+        row = session.execute(_ALLOCATE_IDS_SQL, {"count": count, "prefix": prefix}).fetchone()
+    last = row[0]
+    return [f"{prefix}{str(num).zfill(6)}" for num in range(last - count + 1, last + 1)]
+
+
 def _compute_pair_id(word1: str, word2: str) -> str:
     """Return a stable 14-char identifier for a (word1, word2) pair."""
     raw = f"{(word1 or '').strip()}|{(word2 or '').strip()}"
     return "WP" + hashlib.sha256(raw.encode()).hexdigest()[:12]
 
+
+# Module-level so diagnostics/query_plan_report.py can EXPLAIN the exact statements the app runs.
+LOAD_DICT_SQL = """
+    SELECT 
+        WordDict.*, 
+        IIF(num_quiz_attempt IS NULL, 0, num_quiz_attempt) AS num_quiz_attempt,
+        IIF(pinyin_correct_cnt IS NULL, 0, pinyin_correct_cnt) AS pinyin_correct_cnt,
+        IIF(pinyin_wrong_cnt IS NULL, 0, pinyin_wrong_cnt) AS pinyin_wrong_cnt,
+        IIF(meaning_correct_cnt IS NULL, 0, meaning_correct_cnt) AS meaning_correct_cnt,
+        IIF(meaning_wrong_cnt IS NULL, 0, meaning_wrong_cnt) AS meaning_wrong_cnt,
+        QuizAgg.last_quiz
+    FROM WordDict
+    LEFT JOIN QuizAgg ON (WordDict.word_id = QuizAgg.word_id)
+"""
+
+LOAD_QUIZ_LOG_SQL = "SELECT quiz_id, last_quiz, pinyin_correct, meaning_correct FROM QuizLog"
+
+LOAD_PHRASE_DICT_SQL = "SELECT * FROM PhraseDict"
+
+LOAD_WORD_COMPARISONS_SQL = "SELECT * FROM WordComparison ORDER BY id DESC"
+
+CATEGORY_EXAMPLES_SQL = """
+    SELECT word_category, word
+    FROM (
+        SELECT word_category, word,
+               ROW_NUMBER() OVER (PARTITION BY word_category ORDER BY first_rowid) AS rn,
+               MIN(first_rowid) OVER (PARTITION BY word_category) AS category_rowid
+        FROM (
+            SELECT word_category, word, MIN(rowid) AS first_rowid
+            FROM WordDict
+            WHERE word_category IS NOT NULL AND word_category != ''
+            GROUP BY word_category, word
+        )
+    )
+    WHERE rn <= :top_n
+    ORDER BY category_rowid, rn
+"""
+
+
 def load_dict():
     """
-    Load the dictionary data from the database, joining with quiz statistics.
+    Load the dictionary data from the database, joining with the per-word quiz statistics in QuizAgg.
     """
     rename_dict = {'word_id': 'Word Id',
     'word': 'Word',
@@ -38,36 +152,249 @@ def load_dict():
     'last_quiz': 'Last Quiz'}
 
     cols = ['Word Id', 'Word', 'Pinyin', 'Pinyin Simplified', 'Meaning', 'Added Date', 'Word Category', 'Word Rarity', 'Type', 'Sentence', 'Sentence Pinyin', 'Sentence Meaning', 'Quiz Attempts', 'Num Pinyin Correct', 'Num Pinyin Wrong', 'Num Meaning Correct', 'Num Meaning Wrong', 'Last Quiz']
-    orig_df = pd.read_sql("""
-                    SELECT 
-                        WordDict.*, 
-                        IIF(num_quiz_attempt IS NULL, 0, num_quiz_attempt) AS num_quiz_attempt,
-                        IIF(pinyin_correct_cnt IS NULL, 0, pinyin_correct_cnt) AS pinyin_correct_cnt,
-                        IIF(pinyin_wrong_cnt IS NULL, 0, pinyin_wrong_cnt) AS pinyin_wrong_cnt,
-                        IIF(meaning_correct_cnt IS NULL, 0, meaning_correct_cnt) AS meaning_correct_cnt,
-                        IIF(meaning_wrong_cnt IS NULL, 0, meaning_wrong_cnt) AS meaning_wrong_cnt,
-                        last_quiz
-                    FROM WordDict
-                    LEFT JOIN QuizScore ON (WordDict.word_id = QuizScore.word_id) AND (WordDict.word = QuizScore.word)
-                    """, engine)
+    orig_df = pd.read_sql(LOAD_DICT_SQL, engine)
 
     orig_df = orig_df.rename(columns=rename_dict)
     orig_df = orig_df[cols]
     return orig_df
 
 
+# Dictionary page columns (display name -> SQL expression over WordDict LEFT JOIN QuizAgg), in display order.
+# load_dict_page filters and sorts on these, so only names listed here ever reach the SQL text.
+DICT_PAGE_COLUMNS = {
+    'Word Id': 'WordDict.word_id',
+    'Word': 'WordDict.word',
+    'Pinyin': 'WordDict.pinyin',
+    'Meaning': 'WordDict.meaning',
+    'Added Date': 'WordDict.added_date',
+    'Word Category': 'WordDict.word_category',
+    'Word Rarity': 'WordDict.word_rarity',
+    'Type': 'WordDict.type',
+    'Sentence': 'WordDict.sentence',
+    'Sentence Pinyin': 'WordDict.sentence_pinyin',
+    'Sentence Meaning': 'WordDict.sentence_meaning',
+    'Quiz Attempts': 'IFNULL(QuizAgg.num_quiz_attempt, 0)',
+    'Num Pinyin Correct': 'IFNULL(QuizAgg.pinyin_correct_cnt, 0)',
+    'Num Pinyin Wrong': 'IFNULL(QuizAgg.pinyin_wrong_cnt, 0)',
+    'Num Meaning Correct': 'IFNULL(QuizAgg.meaning_correct_cnt, 0)',
+    'Num Meaning Wrong': 'IFNULL(QuizAgg.meaning_wrong_cnt, 0)',
+    'Pinyin Errors': 'IFNULL(QuizAgg.num_quiz_attempt, 0) - IFNULL(QuizAgg.pinyin_correct_cnt, 0)',
+    'Meaning Errors': 'IFNULL(QuizAgg.num_quiz_attempt, 0) - IFNULL(QuizAgg.meaning_correct_cnt, 0)',
+    'Last Quiz': 'QuizAgg.last_quiz',
+}
+
+DICT_PAGE_NUMERIC_COLUMNS = {'Quiz Attempts', 'Num Pinyin Correct', 'Num Pinyin Wrong', 'Num Meaning Correct',
+                             'Num Meaning Wrong', 'Pinyin Errors', 'Meaning Errors'}
+
+_DICT_PAGE_FROM = "FROM WordDict LEFT JOIN QuizAgg ON (WordDict.word_id = QuizAgg.word_id)"
+
+# load_dict_filter_options, formatted with each dropdown's DICT_PAGE_COLUMNS expression
+_FILTER_OPTIONS_SQL = "SELECT DISTINCT {expr} FROM WordDict WHERE {expr} IS NOT NULL ORDER BY {expr}"
+
+
+def _like_escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _dict_page_queries(filters: list = None, sort_by: list = None, search: str = None) -> tuple:
+    """
+    SQL of load_dict_page: (count SQL, page SQL with :limit and :offset, params).
+    """
+    where, params = [], {}
+    for i, (column, op, value) in enumerate(filters or []):
+        if column not in DICT_PAGE_COLUMNS or value is None or value == '':
+            continue
+        expr = DICT_PAGE_COLUMNS[column]
+        key = f"f{i}"
+        if op == 'contains':
+            where.append(f"{expr} LIKE :{key} ESCAPE '\\'")
+            params[key] = f"%{_like_escape(str(value))}%"
+        elif op == 'datestartswith':
+            where.append(f"{expr} LIKE :{key} ESCAPE '\\'")
+            params[key] = f"{_like_escape(str(value))}%"
+        elif op in ('=', '!=', '<', '<=', '>', '>='):
+            if column in DICT_PAGE_NUMERIC_COLUMNS:
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    continue
+            where.append(f"{expr} {op} :{key}")
+            params[key] = value
+    pinyin_key = pinyin_search_key(search)
+    match = fts_match_query(search)
+    if pinyin_key:
+        # Pinyin with tones (hǎo, ni3 hao): tone-exact prefix match on the indexed normalized pinyin
+        where.append("WordDict.pinyin_normalized >= :pinyin AND WordDict.pinyin_normalized < :pinyin_end")
+        params["pinyin"], params["pinyin_end"] = pinyin_key, pinyin_key + "~"
+    elif match:
+        where.append("WordDict.rowid IN (SELECT rowid FROM WordDictFts WHERE WordDictFts MATCH :search)")
+        params["search"] = match
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+    order = [f"{DICT_PAGE_COLUMNS[column]} {'DESC' if direction == 'desc' else 'ASC'}"
+             for column, direction in (sort_by or []) if column in DICT_PAGE_COLUMNS]
+    order.append("WordDict.rowid DESC")
+
+    select_sql = ", ".join(f'{expr} AS "{name}"' for name, expr in DICT_PAGE_COLUMNS.items())
+    count_sql = f"SELECT COUNT(*) {_DICT_PAGE_FROM} {where_sql}"
+    page_sql = (f"SELECT {select_sql} {_DICT_PAGE_FROM} {where_sql} "
+                f"ORDER BY {', '.join(order)} LIMIT :limit OFFSET :offset")
+    return count_sql, page_sql, params
+
+
+def load_dict_page(page: int = 0, page_size: int = 15, filters: list = None,
+                   sort_by: list = None, search: str = None) -> tuple[pd.DataFrame, int]:
+    """
+    Load one page of the dictionary (DICT_PAGE_COLUMNS), filtering, sorting and paging in SQL so the
+    result is page_size rows however large WordDict grows.
+
+    Args:
+        page: Zero-based page number.
+        page_size: Rows per page.
+        filters: List of (column, operator, value), all of which must match.  Operators: '=', '!=',
+            '<', '<=', '>', '>=', 'contains', 'datestartswith'.
+        sort_by: List of (column, 'asc' | 'desc').  Ties (and the default order) are newest first.
+        search: Free text matched against word, pinyin (any tone), meaning and sentence through the
+            WordDictFts full-text index.  Pinyin typed with tones (hǎo, ni3 hao) instead matches the
+            start of each word's pinyin, tones included, through WordDict.pinyin_normalized.
+
+    Returns:
+        (page DataFrame, total number of matching rows)
+    """
+    count_sql, page_sql, params = _dict_page_queries(filters, sort_by, search)
+    with engine.connect() as conn:
+        total = conn.execute(text(count_sql), params).scalar()
+        page_df = pd.read_sql(
+            text(page_sql), conn, params={**params, "limit": page_size, "offset": page * page_size},
+        )
+    return page_df, total
+
+
+def load_dict_filter_options() -> dict:
+    """Distinct Added Date, Word Category and Word Rarity values (sorted) for the dictionary page dropdowns."""
+    options = {}
+    with engine.connect() as conn:
+        for name in ('Added Date', 'Word Category', 'Word Rarity'):
+            expr = DICT_PAGE_COLUMNS[name]
+            rows = conn.execute(text(_FILTER_OPTIONS_SQL.format(expr=expr)))
+            options[name] = [row[0] for row in rows]
+    return options
+
+
+_SEARCH_PHRASE_SQL = text(
+    "SELECT phrase_id FROM PhraseDict WHERE rowid IN "
+    "(SELECT rowid FROM PhraseDictFts WHERE PhraseDictFts MATCH :search)"
+)
+
+
+def search_phrase_ids(search: str) -> List[str]:
+    """phrase_id of every PhraseDict row whose line, response, pinyin or meanings match search (full-text)."""
+    match = fts_match_query(search)
+    if not match:
+        return []
+    with engine.connect() as conn:
+        rows = conn.execute(_SEARCH_PHRASE_SQL, {"search": match})
+        return [row[0] for row in rows]
+
+
+def load_due_word_ids(limit: int, date_filter: str = None, categories: List[str] = None,
+                      rarities: List[str] = None, new_words_only: bool = False, now=None) -> List[str]:
+    """
+    word_id of up to limit words to quiz next by spaced repetition (WordSchedule), among words added
+    on or after date_filter whose category and rarity are in categories and rarities (None = any).
+
+    Reviews that are due (due <= now) come first, most overdue first, then words never quizzed (oldest
+    added first), then the reviews due soonest after now.  With new_words_only, only never-quizzed words.
+    Each part is an indexed LIMIT query (ix_WordSchedule_due, WordDict rowid order).
+    """
+    if limit is None or limit <= 0:
+        return []
+    word_ids = []
+    with engine.connect() as conn:
+        for stmt, params in _due_word_queries(date_filter, categories, rarities, new_words_only, now):
+            rows = conn.execute(stmt, {**params, "limit": limit - len(word_ids)})
+            word_ids.extend(row[0] for row in rows)
+            if len(word_ids) >= limit:
+                break
+    return word_ids
+
+
+def _due_word_queries(date_filter: str = None, categories: List[str] = None, rarities: List[str] = None,
+                      new_words_only: bool = False, now=None) -> list:
+    """
+    Statements of load_due_word_ids, in the order they are run: (statement with :limit, params).
+    """
+    now = now or pd.Timestamp.now()
+    where, params = [], {"now": now}
+    if date_filter is not None:
+        where.append("WordDict.added_date >= :date_filter")
+        params["date_filter"] = str(date_filter)
+    if categories is not None:
+        where.append("WordDict.word_category IN :categories")
+        params["categories"] = list(categories)
+    if rarities is not None:
+        where.append("WordDict.word_rarity IN :rarities")
+        params["rarities"] = list(rarities)
+    filter_sql = "".join(f" AND {clause}" for clause in where)
+
+    def scheduled(condition):
+        return (f"SELECT WordSchedule.word_id FROM WordSchedule JOIN WordDict USING (word_id) "
+                f"WHERE {condition}{filter_sql} ORDER BY WordSchedule.due LIMIT :limit")
+
+    queries = [
+        "SELECT WordDict.word_id FROM WordDict LEFT JOIN WordSchedule USING (word_id) "
+        f"WHERE WordSchedule.word_id IS NULL{filter_sql} ORDER BY WordDict.rowid LIMIT :limit"
+    ]
+    if not new_words_only:
+        queries = [scheduled("WordSchedule.due <= :now")] + queries + [scheduled("WordSchedule.due > :now")]
+
+    statements = []
+    for sql in queries:
+        stmt = text(sql)
+        if ":now" in sql:
+            stmt = stmt.bindparams(bindparam("now", type_=DateTime(timezone=True)))
+        for name in ("categories", "rarities"):
+            if name in params:
+                stmt = stmt.bindparams(bindparam(name, expanding=True))
+        statements.append((stmt, {name: value for name, value in params.items() if f":{name}" in sql}))
+    return statements
+
+
+def load_quiz_log() -> pd.DataFrame:
+    """
+    Load the QuizLog columns used by the statistics page.
+    """
+    return pd.read_sql(LOAD_QUIZ_LOG_SQL, engine)
+
+
+def load_category_examples(top_n: int = 3) -> dict:
+    """
+    Map each WordDict category to its first top_n distinct words (in insertion order).
+    Same result as get_categories_with_examples(load_dict()) without loading the full dictionary.
+    """
+    rows = pd.read_sql(text(CATEGORY_EXAMPLES_SQL), engine, params={"top_n": top_n})
+
+    categories_dict = {}
+    for category, word in rows.itertuples(index=False):
+        categories_dict.setdefault(category, []).append(word)
+    return categories_dict
+
+
 def load_phrase_dict():
     """
     Load the phrase dictionary data from the database.
     """
     rename_dict = {col:col.replace('_', ' ').title() for col in PhraseDict.__table__.columns.keys()}
-    phrase_df = pd.read_sql("""
-                    SELECT *
-                    FROM PhraseDict
-                    """, engine)
+    phrase_df = pd.read_sql(LOAD_PHRASE_DICT_SQL, engine)
     phrase_df = phrase_df.rename(columns=rename_dict)
     return phrase_df
 
+
+_COUNT_OVERLAP_SQL = text(
+    "SELECT COUNT(DISTINCT word) FROM WordDict WHERE word IN :words"
+).bindparams(bindparam("words", expanding=True))
+
+
 def count_overlap_word(new_word_list: List) -> tuple[int,int]:
     """
     Count the number of overlapping words between the new words and the existing words in the database.
@@ -79,26 +406,71 @@ def count_overlap_word(new_word_list: List) -> tuple[int,int]:
     with engine.begin() as conn:
         for i in range(0, len(new_word_list), chunk_size):
             chunk = new_word_list[i:i+chunk_size]
-            placeholders = ",".join([f":w{j}" for j in range(len(chunk))])
-            params = {f"w{j}": v for j, v in enumerate(chunk)}
-            sql = text(f"""
-                SELECT COUNT(DISTINCT word)
-                FROM WordDict
-                WHERE word IN ({placeholders})
-            """)
-            overlap_word += conn.execute(sql, params).scalar() or 0
+            overlap_word += conn.execute(_COUNT_OVERLAP_SQL, {"words": chunk}).scalar() or 0
 
     dedup = len(new_word_list)
     add_word = dedup - overlap_word
     return overlap_word, add_word
 
 
-def sql_update_worddict(df: pd.DataFrame):
+# load_known_words: WordDict column -> the translation pipeline's display name
+_KNOWN_WORD_COLUMNS = {
+    'word': 'Word',
+    'pinyin': 'Pinyin',
+    'pinyin_simplified': 'Pinyin Simplified',
+    'type': 'Type',
+    'word_category': 'Word Category',
+    'meaning': 'Meaning',
+    'sentence': 'Sentence',
+    'sentence_pinyin': 'Sentence Pinyin',
+    'sentence_meaning': 'Sentence Meaning',
+    'added_date': 'Added Date',
+    'word_rarity': 'Word Rarity',
+    'rarity_score': 'Rarity Score',
+}
+
+_KNOWN_WORDS_SQL = text(
+    f"SELECT {', '.join(_KNOWN_WORD_COLUMNS)} FROM WordDict WHERE word IN :words ORDER BY word_id"
+).bindparams(bindparam("words", expanding=True))
+
+
+def load_known_words(word_list: List) -> pd.DataFrame:
+    """
+    Return the existing WordDict rows for any of the given words, with the same display column
+    names the translation pipeline produces, so already-known words can skip the LLM.
+    A word only counts as known when every one of its rows has pinyin, meaning, category and rarity.
+    """
+    rename_dict = _KNOWN_WORD_COLUMNS
+    chunk_size = 500
+    word_list = list(set(word_list))
+    frames = []
+    with engine.begin() as conn:
+        for i in range(0, len(word_list), chunk_size):
+            chunk = word_list[i:i+chunk_size]
+            frames.append(pd.read_sql(_KNOWN_WORDS_SQL, conn, params={"words": chunk}))
+
+    known_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=list(rename_dict))
+    known_df = known_df.rename(columns=rename_dict)
+
+    required = ['Pinyin', 'Meaning', 'Word Category', 'Word Rarity']
+    incomplete = known_df[required].isna().any(axis=1) | (known_df[required].astype(str).apply(lambda col: col.str.strip()) == '').any(axis=1)
+    known_df = known_df.loc[~known_df['Word'].isin(known_df.loc[incomplete, 'Word'])]
+    known_df['Added Date'] = known_df['Added Date'].astype(str).str[:10]
+    return known_df.reset_index(drop=True)
+
+
+def sql_update_worddict(df: pd.DataFrame, upsert: bool = False, prune: bool = False):
     """
     For every distinct `word` in df:
       - delete all existing WordDict rows with that word
       - insert the provided rows for that word
     All in one transaction (atomic).
+
+    With upsert=True, rows are instead matched on (word, meaning): matching rows are updated in
+    place (keeping their word_id, added_date and quiz history), other rows are inserted, and rows
+    for the same word with a different meaning are left alone, or deleted with prune=True (the
+    result then matches the replace path).  See _upsert_worddict.  Without the
+    ux_WordDict_word_meaning index (duplicate rows in WordDict) the replace path is used instead.
     """
     # Defensive copy & normalize
     df = df.copy()
@@ -115,12 +487,9 @@ def sql_update_worddict(df: pd.DataFrame):
         if col not in df.columns:
             df[col] = None
 
-    # Generate word_id
-    df_id = pd.read_sql("SELECT MAX(word_id) FROM WordDict", engine)
-    max_word_id = pd.to_numeric(df_id.values[0][0].replace("D", ""))
-    new_word_ids = ['D'+str(num + max_word_id).zfill(6) for num in range(1, len(df) + 1)]
-    df["word_id"] = new_word_ids
-    
+    # word_id is allocated inside the write transaction below
+    df["word_id"] = None
+
     # SQLite wants None, not NaN
     df = df.where(pd.notnull(df), None)
 
@@ -128,21 +497,35 @@ def sql_update_worddict(df: pd.DataFrame):
     if not words_to_replace:
         return  # nothing to do
 
+    # Tone-exact search key (database.word_pinyin_normalized)
+    df["pinyin_normalized"] = [word_pinyin_normalized(pinyin, pinyin_simplified)
+                               for pinyin, pinyin_simplified in zip(df["pinyin"], df["pinyin_simplified"])]
+
     records = df[[
         "word_id","word","pinyin","pinyin_simplified","type","word_category",
         "word_rarity","meaning","sentence","sentence_pinyin","sentence_meaning",
-        "added_date"
+        "added_date","pinyin_normalized"
     ]].to_dict(orient="records")
 
+    note = ""
+    if upsert:
+        if has_index('ux_WordDict_word_meaning'):
+            return _upsert_worddict(records, prune=prune)
+        note = "Upsert unavailable (WordDict has duplicate word/meaning rows).  "
+
     try:
         overlap_count, add_count = count_overlap_word(df['word'].tolist())
         with Session(engine) as session:
             # 1) Delete existing rows for these words
+            begin_immediate(session)
+            fts_affected = fts_rowids(session, 'WordDict', 'word', words_to_replace)
             session.query(WordDict)\
                    .filter(WordDict.word.in_(words_to_replace))\
                    .delete(synchronize_session=False)
 
-            # 2) Insert the new rows
+            # 2) Insert the new rows under freshly allocated word_ids
+            for rec, word_id in zip(records, allocate_ids(session, 'D', len(records))):
+                rec["word_id"] = word_id
             session.bulk_insert_mappings(WordDict, records)
 
             # 3) Initialize QuizAgg rows for any new word_ids
@@ -154,10 +537,12 @@ def sql_update_worddict(df: pd.DataFrame):
                     for r in records
                 ]
                 session.bulk_insert_mappings(QuizAgg, quizagg_init)
-            
+
+            # 4) Full-text index of the deleted and inserted rows
+            refresh_fts(session, 'WordDict', fts_affected + fts_rowids(session, 'WordDict', 'word', words_to_replace))
             session.commit()
 
-        message = f"Overwrite mode enabled.  Replacing {overlap_count} words and {add_count} new words added."
+        message = f"{note}Overwrite mode enabled.  Replacing {overlap_count} words and {add_count} new words added."
         return message
     
     except SQLAlchemyError as e:
@@ -165,16 +550,138 @@ def sql_update_worddict(df: pd.DataFrame):
         return message 
 
 
-def sql_patch_worddict_rows(records: list) -> str:
+# Columns an upsert may change on an existing (word, meaning) row; word_id and added_date are kept.
+_WORDDICT_UPSERT_COLUMNS = [
+    "pinyin", "pinyin_simplified", "type", "word_category", "word_rarity",
+    "sentence", "sentence_pinyin", "sentence_meaning", "pinyin_normalized",
+]
+
+_WORDDICT_UPSERT_SQL = text(f"""
+    INSERT INTO WordDict (word_id, word, meaning, added_date, {", ".join(_WORDDICT_UPSERT_COLUMNS)})
+    VALUES (:word_id, :word, :meaning, :added_date, {", ".join(":" + col for col in _WORDDICT_UPSERT_COLUMNS)})
+    ON CONFLICT (word, meaning) DO UPDATE SET
+        {", ".join(f"{col} = excluded.{col}" for col in _WORDDICT_UPSERT_COLUMNS)}
+    WHERE {" OR ".join(f"{col} IS NOT excluded.{col}" for col in _WORDDICT_UPSERT_COLUMNS)}
+""").bindparams(bindparam('added_date', type_=DateTime(timezone=True)))
+
+
+# NULL meanings never conflict on (word, meaning), so changed rows without a meaning are updated by id
+_WORDDICT_UPDATE_BY_ID_SQL = text(f"""
+    UPDATE WordDict SET {", ".join(f"{col} = :{col}" for col in _WORDDICT_UPSERT_COLUMNS)}
+    WHERE word_id = :word_id
+""")
+
+
+def _upsert_worddict(records: list, prune: bool = False, chunk_size: int = 500) -> str:
+    """
+    Upsert records keyed on (word, meaning) in one transaction: INSERT ... ON CONFLICT DO UPDATE,
+    executed once per chunk for the rows that are new or changed.  Rows are classified against
+    WordDict after taking the write lock (BEGIN IMMEDIATE), so the counts reported are the ones
+    committed; a new meaning of a word already in WordDict is counted apart from new words.
+    With prune, the other rows of the batch's words (meanings no longer in the batch) are deleted
+    in the same transaction.
+    Needs the ux_WordDict_word_meaning unique index (database.ensure_indexes).
+    """
+    # Last row wins when the batch repeats a (word, meaning) pair
+    records = list({(rec["word"], rec["meaning"]): rec for rec in records}.values())
+    words = sorted({rec["word"] for rec in records})
+    key_cols = [WordDict.word, WordDict.meaning]
+    value_cols = [WordDict.__table__.c[col] for col in _WORDDICT_UPSERT_COLUMNS]
+
+    try:
+        with Session(engine) as session:
+            # Take the write lock first, so the lookup below stays valid until commit
+            begin_immediate(session)
+            fts_affected = fts_rowids(session, 'WordDict', 'word', words)
+
+            existing, existing_ids = {}, []
+            for i in range(0, len(words), chunk_size):
+                rows = session.execute(
+                    select(*key_cols, WordDict.word_id, *value_cols)
+                    .where(WordDict.word.in_(words[i:i + chunk_size]))
+                )
+                for row in rows:
+                    # setdefault: the unique index still allows several (word, NULL) rows
+                    existing.setdefault(tuple(row[:2]), (row[2], tuple(row[3:])))
+                    existing_ids.append(row[2])
+
+            new_records, changed_records, kept_ids = [], [], set()
+            for rec in records:
+                current = existing.get((rec["word"], rec["meaning"]))
+                if current is None:
+                    new_records.append(rec)
+                    continue
+                kept_ids.add(current[0])
+                if current[1] != tuple(rec[col] for col in _WORDDICT_UPSERT_COLUMNS):
+                    # Bound for the NOT NULL check only; the conflicting row keeps its word_id
+                    rec["word_id"] = current[0]
+                    changed_records.append(rec)
+
+            stale_ids = [word_id for word_id in existing_ids if word_id not in kept_ids] if prune else []
+            for i in range(0, len(stale_ids), chunk_size):
+                session.query(WordDict)\
+                       .filter(WordDict.word_id.in_(stale_ids[i:i + chunk_size]))\
+                       .delete(synchronize_session=False)
+
+            for rec, word_id in zip(new_records, allocate_ids(session, 'D', len(new_records))):
+                rec["word_id"] = word_id
+            to_write = new_records + [rec for rec in changed_records if rec["meaning"] is not None]
+            for i in range(0, len(to_write), chunk_size):
+                session.execute(_WORDDICT_UPSERT_SQL, to_write[i:i + chunk_size])
+            to_update = [rec for rec in changed_records if rec["meaning"] is None]
+            if to_update:
+                session.execute(_WORDDICT_UPDATE_BY_ID_SQL, to_update)
+
+            if new_records:
+                session.bulk_insert_mappings(QuizAgg, [
+                    {"word_id": rec["word_id"], "num_quiz_attempt": 0, "num_correct": 0, "num_wrong": 0,
+                     "last_quiz": None}
+                    for rec in new_records
+                ])
+            refresh_fts(session, 'WordDict', fts_affected + fts_rowids(session, 'WordDict', 'word', words))
+            session.commit()
+
+        unchanged = len(records) - len(new_records) - len(changed_records)
+        known_words = {word for word, _ in existing}
+        new_words = len({rec["word"] for rec in new_records} - known_words)
+        new_meanings = sum(rec["word"] in known_words for rec in new_records)
+        message = (f"Upsert complete.  {new_words} new words added, {new_meanings} new meanings of existing "
+                   f"words added, {len(changed_records)} updated, {unchanged} unchanged.")
+        if stale_ids:
+            message += f"  {len(stale_ids)} meanings no longer in the translation removed."
+        return message
+
+    except SQLAlchemyError as e:
+        return f"Upsert transaction failed: {e}"
+
+
+def _same_value(a, b) -> bool:
+    """Equality for table cells, treating None/NaN/'' alike (the DataTable round-trips nulls loosely)."""
+    a = None if a is None or (isinstance(a, float) and pd.isna(a)) or a == '' else a
+    b = None if b is None or (isinstance(b, float) and pd.isna(b)) or b == '' else b
+    return a == b
+
+
+_WORDDICT_PINYIN_NORMALIZED_SQL = text("UPDATE WordDict SET pinyin_normalized = :pinyin_normalized WHERE word_id = :word_id")
+
+
+def sql_patch_worddict_rows(records: list, baseline: pd.DataFrame = None) -> str:
     """
     Update editable fields on existing WordDict rows in-place, identified by word_id.
 
     Only the following columns are updated (others like word_id, added_date are ignored):
         word_category, word_rarity, type, meaning,
         pinyin, sentence, sentence_pinyin, sentence_meaning
+    pinyin_normalized is recomputed for rows whose pinyin changes.
+
+    When baseline (the dictionary as last loaded, display-name columns, e.g. from the data cache)
+    is given, only the cells that differ from it are written.  Rows are grouped by the set of
+    columns they change, and each group is written with one executemany UPDATE, all in one
+    transaction.
 
     Args:
         records: List of dicts from the DataTable (display-name keys, e.g. 'Word Category').
+        baseline: Optional DataFrame to diff records against.
 
     Returns:
         A status message string.
@@ -196,21 +703,64 @@ def sql_patch_worddict_rows(records: list) -> str:
     if not records:
         return "No records to update."
 
+    current, base_pos = {}, {}
+    if baseline is not None:
+        base_names = {col_map.get(name, name): name for name in baseline.columns}
+        base_cols = [col for col in EDITABLE if col in base_names]
+        base_pos = {col: i for i, col in enumerate(base_cols)}
+        current = dict(zip(
+            baseline[base_names['word_id']].tolist(),
+            zip(*(baseline[base_names[col]].tolist() for col in base_cols)),
+        ))
+
+    # Display or column name -> editable column
+    editable_key = {k: v for k, v in col_map.items() if v in EDITABLE}
+    editable_key.update({col: col for col in EDITABLE})
+
+    # Group the patches by the columns they set: one UPDATE statement per group
+    groups = {}
+    for rec in records:
+        word_id = rec.get('Word Id', rec.get('word_id'))
+        if not word_id:
+            continue
+        before = current.get(word_id)
+        patch = {}
+        for k, v in rec.items():
+            col = editable_key.get(k)
+            if col is None:
+                continue
+            if before is not None and col in base_pos:
+                old = before[base_pos[col]]
+                if v == old or _same_value(v, old):
+                    continue
+            patch[col] = v
+        if not patch:
+            continue
+        groups.setdefault(tuple(sorted(patch)), []).append({**patch, 'word_id': word_id})
+
+    if not groups:
+        return "No changes to save."
+
     try:
         with Session(engine) as session:
             updated = 0
-            for rec in records:
-                normalised = {col_map.get(k, k): v for k, v in rec.items()}
-                word_id = normalised.get('word_id')
-                if not word_id:
-                    continue
-                patch = {k: v for k, v in normalised.items() if k in EDITABLE}
-                if not patch:
-                    continue
-                session.query(WordDict)\
-                       .filter(WordDict.word_id == word_id)\
-                       .update(patch, synchronize_session=False)
-                updated += 1
+            for cols, params in groups.items():
+                stmt = text(f"UPDATE WordDict SET {', '.join(f'{col} = :{col}' for col in cols)} WHERE word_id = :word_id")
+                updated += session.execute(stmt, params).rowcount
+            # pinyin_normalized follows pinyin when the row has no pinyin_simplified
+            repinyin = [param['word_id'] for cols, params in groups.items() if 'pinyin' in cols for param in params]
+            for i in range(0, len(repinyin), 500):
+                rows = session.execute(
+                    select(WordDict.word_id, WordDict.pinyin, WordDict.pinyin_simplified)
+                    .where(WordDict.word_id.in_(repinyin[i:i + 500]))
+                ).fetchall()
+                if rows:
+                    session.execute(_WORDDICT_PINYIN_NORMALIZED_SQL, [
+                        {'word_id': word_id, 'pinyin_normalized': word_pinyin_normalized(pinyin, pinyin_simplified)}
+                        for word_id, pinyin, pinyin_simplified in rows
+                    ])
+            word_ids = {param['word_id'] for params in groups.values() for param in params}
+            refresh_fts(session, 'WordDict', fts_rowids(session, 'WordDict', 'word_id', word_ids))
             session.commit()
         return f"Updated {updated} row(s) successfully."
     except SQLAlchemyError as e:
@@ -236,12 +786,6 @@ def sql_update_phrasedict(df: pd.DataFrame):
         if col not in df.columns:
             df[col] = None
 
-    # Generate word_id
-    df_id = pd.read_sql("SELECT MAX(phrase_id) FROM PhraseDict", engine)
-    max_phrase_id = pd.to_numeric(df_id.values[0][0].replace("P", ""))
-    new_phrase_ids = ['P'+str(num + max_phrase_id).zfill(6) for num in range(1, df.shape[0] + 1)]
-    df['phrase_id'] = new_phrase_ids
-
     # SQLite wants None, not NaN
     df = df.where(pd.notnull(df), None)
 
@@ -249,7 +793,11 @@ def sql_update_phrasedict(df: pd.DataFrame):
 
     try:
         with Session(engine) as session:
+            for rec, phrase_id in zip(records, allocate_ids(session, 'P', len(records))):
+                rec['phrase_id'] = phrase_id
             session.bulk_insert_mappings(PhraseDict, records)
+            refresh_fts(session, 'PhraseDict',
+                        fts_rowids(session, 'PhraseDict', 'phrase_id', [rec['phrase_id'] for rec in records]))
             session.commit()
         
         message = "Saved new phrases to the dictionary."
@@ -261,12 +809,91 @@ def sql_update_phrasedict(df: pd.DataFrame):
  
 
 
+# Add one batch of quiz results to QuizAgg.  The SELECT only yields a row while the word still exists
+# in WordDict under the same word, matching the join the full rebuild (database.rebuild_quiz_agg) uses.
+_QUIZ_AGG_UPSERT_SQL = text("""
+    INSERT INTO QuizAgg (word_id, num_quiz_attempt, num_correct, num_wrong, last_quiz,
+                         pinyin_correct_cnt, pinyin_wrong_cnt, meaning_correct_cnt, meaning_wrong_cnt)
+    SELECT word_id, :attempts, 0, 0, :last_quiz, :pinyin_correct, :pinyin_wrong, :meaning_correct, :meaning_wrong
+    FROM WordDict
+    WHERE word_id = :word_id AND word = :word
+    ON CONFLICT (word_id) DO UPDATE SET
+        num_quiz_attempt    = COALESCE(num_quiz_attempt, 0)    + excluded.num_quiz_attempt,
+        pinyin_correct_cnt  = COALESCE(pinyin_correct_cnt, 0)  + excluded.pinyin_correct_cnt,
+        pinyin_wrong_cnt    = COALESCE(pinyin_wrong_cnt, 0)    + excluded.pinyin_wrong_cnt,
+        meaning_correct_cnt = COALESCE(meaning_correct_cnt, 0) + excluded.meaning_correct_cnt,
+        meaning_wrong_cnt   = COALESCE(meaning_wrong_cnt, 0)   + excluded.meaning_wrong_cnt,
+        last_quiz           = MAX(COALESCE(last_quiz, excluded.last_quiz), excluded.last_quiz)
+""").bindparams(bindparam('last_quiz', type_=DateTime(timezone=True)))
+
+
+def _quiz_agg_increments(records: list) -> list:
+    """Collapse QuizLog records into one QuizAgg increment per (word_id, word)."""
+    increments = {}
+    for rec in records:
+        key = (rec['word_id'], rec['word'])
+        inc = increments.setdefault(key, {
+            'word_id': rec['word_id'], 'word': rec['word'], 'attempts': 0, 'last_quiz': rec['last_quiz'],
+            'pinyin_correct': 0, 'pinyin_wrong': 0, 'meaning_correct': 0, 'meaning_wrong': 0,
+        })
+        inc['attempts'] += 1
+        for col in ('pinyin', 'meaning'):
+            answer = str(rec[f'{col}_correct'] or '').lower()
+            if answer == 'yes':
+                inc[f'{col}_correct'] += 1
+            elif answer == 'no':
+                inc[f'{col}_wrong'] += 1
+        if rec['last_quiz'] is not None and (inc['last_quiz'] is None or rec['last_quiz'] > inc['last_quiz']):
+            inc['last_quiz'] = rec['last_quiz']
+    return list(increments.values())
+
+
+_WORD_SCHEDULE_COLUMNS = ['repetitions', 'ease', 'stability', 'due', 'last_review']
+
+_WORD_SCHEDULE_UPSERT_SQL = text(f"""
+    INSERT INTO WordSchedule (word_id, {", ".join(_WORD_SCHEDULE_COLUMNS)})
+    VALUES (:word_id, {", ".join(":" + col for col in _WORD_SCHEDULE_COLUMNS)})
+    ON CONFLICT (word_id) DO UPDATE SET
+        {", ".join(f"{col} = excluded.{col}" for col in _WORD_SCHEDULE_COLUMNS)}
+""").bindparams(bindparam('due', type_=DateTime(timezone=True)),
+                bindparam('last_review', type_=DateTime(timezone=True)))
+
+
+def _update_word_schedules(session, records: list) -> None:
+    """
+    Apply QuizLog records, in order, to the WordSchedule rows of their words (main.scheduler).
+    Like QuizAgg, only records whose (word_id, word) is still in WordDict count.
+    """
+    word_ids = sorted({rec['word_id'] for rec in records})
+    known, states = set(), {}
+    rows = session.execute(
+        select(WordDict.word_id, WordDict.word, *[WordSchedule.__table__.c[col] for col in _WORD_SCHEDULE_COLUMNS])
+        .outerjoin(WordSchedule, WordSchedule.word_id == WordDict.word_id)
+        .where(WordDict.word_id.in_(word_ids))
+    )
+    for row in rows:
+        known.add((row[0], row[1]))
+        if row[2] is not None:
+            states[row[0]] = dict(zip(_WORD_SCHEDULE_COLUMNS, row[2:]))
+
+    schedules = apply_reviews(
+        ((rec['word_id'], rec['pinyin_correct'], rec['meaning_correct'], rec['last_quiz'])
+         for rec in records if (rec['word_id'], rec['word']) in known),
+        states,
+    )
+    if schedules:
+        session.execute(_WORD_SCHEDULE_UPSERT_SQL,
+                        [{'word_id': word_id, **state} for word_id, state in schedules.items()])
+
+
+_QUIZ_AGG_VERSION_SQL = text("SELECT version FROM DataVersion WHERE table_name = 'QuizAgg'")
+
+
 def sql_update_quizlog(df: pd.DataFrame):
     """
-    For every distinct `word` in df:
-      - delete all existing WordDict rows with that word
-      - insert the provided rows for that word
-    All in one transaction (atomic).
+    Append quiz results to QuizLog, add them to the per-word counters in QuizAgg and reschedule the
+    words in WordSchedule, in one transaction (atomic).  The QuizAgg versions around the writes are
+    kept for last_quiz_save_versions.
     """
     df = df.copy()
     df.columns = [col.lower().replace(' ', '_') for col in df.columns]
@@ -274,19 +901,9 @@ def sql_update_quizlog(df: pd.DataFrame):
 
     # Ensure required columns exist
 
-    # Generate word_id
-    df_id = pd.read_sql("SELECT MAX(quiz_id) FROM QuizLog", engine)
-    max_quiz_id_val = df_id.values[0][0]
-    if max_quiz_id_val is None:
-        max_phrase_id = 0
-    else:
-        max_phrase_id = pd.to_numeric(max_quiz_id_val.replace("QW", ""))
-    new_phrase_ids = ['QW'+str(num + max_phrase_id).zfill(6) for num in range(1, df.shape[0] + 1)]
-    df['quiz_id'] = new_phrase_ids
-    
     required = ['quiz_id', 'word_id', 'word', 'sentence', 'sentence_pinyin',
-       'pinyin_answer', 'pinyin_correct', 'pinyin_correction', 'meaning',
-       'meaning_correct', 'meaning_correction', 'last_quiz', 'adaptive_sample_scale',
+       'pinyin_answer', 'pinyin_correct', 'pinyin_correction', 'pinyin_error_type', 'meaning',
+       'meaning_correct', 'meaning_correction', 'meaning_grading_source', 'last_quiz', 'adaptive_sample_scale',
        'is_top_pinyin_error', 'is_top_meaning_error']
         
     for col in required:
@@ -305,8 +922,17 @@ def sql_update_quizlog(df: pd.DataFrame):
 
     try:
         with Session(engine) as session:
+            for rec, quiz_id in zip(records, allocate_ids(session, 'QW', len(records))):
+                rec['quiz_id'] = quiz_id
+            quiz_agg_before = session.execute(_QUIZ_AGG_VERSION_SQL).scalar()
             session.bulk_insert_mappings(QuizLog, records)
+            # Keep the per-word aggregate in step with the log in the same transaction
+            if records:
+                session.execute(_QUIZ_AGG_UPSERT_SQL, _quiz_agg_increments(records))
+                _update_word_schedules(session, records)
+            quiz_agg_after = session.execute(_QUIZ_AGG_VERSION_SQL).scalar()
             session.commit()
+        _quiz_save_versions.versions = (quiz_agg_before, quiz_agg_after)
         
         message = "Saved quiz result."
         return message
@@ -329,24 +955,11 @@ def sql_update_responselog(df: pd.DataFrame, mode="conversation"):
 
     # Ensure required columns exist
 
-    # Generate word_id
     if mode == "conversation":
-        df_id = pd.read_sql("SELECT MAX(quiz_id) FROM ResponseLog", engine).fillna(0)
-        max_phrase_id = pd.to_numeric(df_id.values[0][0].replace("QR", ""))
-        new_phrase_ids = ['QR'+str(num + max_phrase_id).zfill(6) for num in range(1, df.shape[0] + 1)]
-        df['quiz_id'] = new_phrase_ids
-        
         required = ['quiz_id', 'prompt', 'prompt_pinyin', 'prompt_meaning', 'response',
         'response_pinyin', 'response_meaning', 'correctness', 'naturalness',
         'contextual_appropriateness', 'comment', 'complexity', 'tone']
     elif mode == "translation":
-        df_id = pd.read_sql("SELECT MAX(quiz_id) FROM TranslationLog", engine)
-        if df_id.values[0][0] is None:
-            df_id.values[0][0] = "QT000000"
-        max_phrase_id = pd.to_numeric(df_id.values[0][0].replace("QT", ""))
-        new_phrase_ids = ['QT'+str(num + max_phrase_id).zfill(6) for num in range(1, df.shape[0] + 1)]
-        df['quiz_id'] = new_phrase_ids
-        
         required = ['quiz_id', 'prompt', 'prompt_pinyin', 'user_translation', 'correct_translation', 'correctness',
         'tone_correctness', 'comment', 'complexity', 'tone']
     else:
@@ -362,6 +975,9 @@ def sql_update_responselog(df: pd.DataFrame, mode="conversation"):
 
     try:
         with Session(engine) as session:
+            prefix = 'QR' if mode == "conversation" else 'QT'
+            for rec, quiz_id in zip(records, allocate_ids(session, prefix, len(records))):
+                rec['quiz_id'] = quiz_id
             if mode == "conversation":
                 session.bulk_insert_mappings(ResponseLog, records)
             elif mode == "translation":
@@ -404,11 +1020,27 @@ def load_word_comparisons() -> pd.DataFrame:
         'word2_example_meaning': 'Word 2 Example Meaning',
         'added_date': 'Added Date',
     }
-    df = pd.read_sql("SELECT * FROM WordComparison ORDER BY id DESC", engine)
+    df = pd.read_sql(LOAD_WORD_COMPARISONS_SQL, engine)
     df = df.rename(columns=rename_dict)
     return df
 
 
+_SEARCH_WORD_COMPARISON_SQL = text(
+    "SELECT pair_id FROM WordComparison WHERE id IN "
+    "(SELECT rowid FROM WordComparisonFts WHERE WordComparisonFts MATCH :search)"
+)
+
+
+def search_word_comparison_ids(search: str) -> List[str]:
+    """pair_id of every WordComparison whose words, pinyin or meaning match search (full-text)."""
+    match = fts_match_query(search)
+    if not match:
+        return []
+    with engine.connect() as conn:
+        rows = conn.execute(_SEARCH_WORD_COMPARISON_SQL, {"search": match})
+        return [row[0] for row in rows]
+
+
 def sql_insert_word_comparison(df: pd.DataFrame) -> str:
     """
     Insert one or more word comparison rows into the WordComparison table.
@@ -472,11 +1104,14 @@ def sql_insert_word_comparison(df: pd.DataFrame) -> str:
     try:
         with Session(engine) as session:
             # Remove any existing rows for these word pairs before inserting
+            begin_immediate(session)
+            fts_affected = fts_rowids(session, 'WordComparison', 'pair_id', pair_ids)
             if pair_ids:
                 session.query(WordComparison)\
                        .filter(WordComparison.pair_id.in_(pair_ids))\
                        .delete(synchronize_session=False)
             session.bulk_insert_mappings(WordComparison, records)
+            refresh_fts(session, 'WordComparison', fts_affected + fts_rowids(session, 'WordComparison', 'pair_id', pair_ids))
             session.commit()
         return "Word comparison saved successfully."
     except SQLAlchemyError as e:
@@ -497,9 +1132,12 @@ def sql_delete_word_comparisons(pair_ids: List[str]) -> str:
         return "No rows selected for deletion."
     try:
         with Session(engine) as session:
+            begin_immediate(session)
+            fts_affected = fts_rowids(session, 'WordComparison', 'pair_id', pair_ids)
             deleted = session.query(WordComparison)\
                              .filter(WordComparison.pair_id.in_(pair_ids))\
                              .delete(synchronize_session=False)
+            refresh_fts(session, 'WordComparison', fts_affected)
             session.commit()
         return f"Deleted {deleted} comparison(s) successfully."
     except SQLAlchemyError as e:
@@ -520,9 +1158,12 @@ def sql_delete_word_dict(word_ids: List[str]) -> str:
         return "No rows selected for deletion."
     try:
         with Session(engine) as session:
+            begin_immediate(session)
+            fts_affected = fts_rowids(session, 'WordDict', 'word_id', word_ids)
             deleted = session.query(WordDict)\
                              .filter(WordDict.word_id.in_(word_ids))\
                              .delete(synchronize_session=False)
+            refresh_fts(session, 'WordDict', fts_affected)
             session.commit()
         return f"Deleted {deleted} word(s) successfully."
     except SQLAlchemyError as e:
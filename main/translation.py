@@ -7,18 +7,18 @@ import pandas as pd
 import time
 
 import os
+import threading
 from io import StringIO
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from main.gsheets import load_gsheet_dict, save_df_to_gsheet, format_gsheet
-from main.sql import load_dict
-from main.utils import get_completion, parse_response_table
-from main.sql import sql_update_worddict
+from main.sql import load_dict, load_category_examples, get_data_version
+from main.utils import get_completion, parse_table_output, log_api_event
+from main.schemas import TRANSLATION_SCHEMA, RARITY_SCHEMA, WORD_COMPARISON_SCHEMA, use_structured_output
+from main.sql import sql_update_worddict, load_known_words
 from main.sql import sql_insert_word_comparison
 
-# Incorporate data
-df = load_dict()
-
 # cat = df['Word Category'].drop_duplicates().values 
 #cat = ['General', 'Grammar', 'Direction', 'Opinion', 'Time',
 #       'Description', 'Organization', 'Travel', 'Social', 'Technology',
@@ -95,7 +95,33 @@ def get_categories_with_examples(data_dict: pd.DataFrame, top_n: int = 3) -> dic
     return categories_dict
 
 
-def get_prompt_for_chinese_translation(chinese_words, category_examples=get_categories_with_examples(df)):
+# Category examples for the translation prompt, reloaded only after WordDict has been written to
+_category_examples_cache = {}
+_category_examples_lock = threading.Lock()
+
+
+def get_category_examples(top_n: int = 3) -> dict:
+    """
+    Return {category: example words} for the translation prompt.  Computed on first use with a
+    light query instead of at import, and recomputed once main.sql reports a new WordDict version.
+    """
+    version = get_data_version('WordDict')
+    cached = _category_examples_cache.get(top_n)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _category_examples_lock:
+        cached = _category_examples_cache.get(top_n)
+        if cached is None or cached[0] != version:
+            cached = (version, load_category_examples(top_n))
+            _category_examples_cache[top_n] = cached
+    return cached[1]
+
+
+def get_prompt_for_chinese_translation(chinese_words, category_examples=None):
+    # Default to the current dictionary categories (cached until the next WordDict write)
+    if category_examples is None:
+        category_examples = get_category_examples()
+
     # Build category description with examples
     categories_description = ""
     if category_examples and isinstance(category_examples, dict):
@@ -337,6 +363,17 @@ def save_new_words_to_dict(
     return message
 
 
+def _split_word_list(word_list) -> List[str]:
+    '''
+    Normalise a word list given either as a list/tuple or a comma-separated string.
+    '''
+    if isinstance(word_list, (list, tuple)):
+        words = [str(w).strip() for w in word_list]
+    else:
+        words = [w.strip() for w in word_list.split(',')]
+    return [w for w in words if w]
+
+
 class TranslationPipeline:
     '''
     Translation pipeline to generate translations for Chinese words and update the dictionary with the new words.
@@ -345,62 +382,58 @@ class TranslationPipeline:
         self, 
         gsheet_mode=False,
         gsheet_name=None, 
-        worksheet_name=None
+        worksheet_name=None,
+        structured=None
         ):
         self.gsheet_mode = gsheet_mode
         self.gsheet_name = gsheet_name
         self.worksheet_name = worksheet_name
+        # Request JSON rows (main.schemas) instead of markdown tables; None follows LLM_STRUCTURED_OUTPUT
+        self.structured = use_structured_output(structured)
         self.new_words_df = pd.DataFrame()
+        self.progress = {'completed': 0, 'total': 0, 'done': True}
+        self.known_words = set()
     
-    def translation_module(
-        self, 
-        word_list, 
-        translation_model="gpt-5-mini", 
-        rarity_model="gpt-5-mini", 
-        temp=1, 
-        replace_new_words=True
-        ):
-        
-        print(translation_model, rarity_model)
-        print(word_list)
-        print(len(word_list))
-        ## Determine word count regardless of whether word_list is a list or a comma-separated string
-        if isinstance(word_list, (list, tuple)):
-            _num_items = len(word_list)
-        else:
-            _num_items = len([w.strip() for w in word_list.split(',') if w.strip()])
-
-        ## Generate words translation
+    def _run_translation(self, word_list, translation_model, temp, num_items):
+        schema = TRANSLATION_SCHEMA if self.structured else None
         translation_response = (
             get_completion(
                 prompt=get_prompt_for_chinese_translation(word_list), 
                 model=translation_model , 
                 temperature=temp,
                 category='translation',
-                num_items=_num_items,
+                num_items=num_items,
+                schema=schema,
                 ))
 
         newwords_df = (
-            parse_response_table(
+            parse_table_output(
                 translation_response.output_text,
+                schema=schema,
                 ffill_cols = ['Word', 'Pinyin', 'Pinyin Simplified', 'Type'],
                 date_col = ['Added Date']
                 )
             )
-        
-        ## Generate words rarity classification
+        return newwords_df
+
+    def _run_rarity_classification(self, word_list, rarity_model, temp, num_items, max_retries=3):
+        '''
+        Classify word rarity, re-issuing only the rarity call when the Word Rarity column comes back empty.
+        In structured mode Word Rarity is a required enum, so the retry normally never triggers.
+        '''
+        schema = RARITY_SCHEMA if self.structured else None
         rarity_response = (
             get_completion(
                 prompt=get_prompt_for_multiclass_rarity_classification(word_list), 
                 model=rarity_model, 
                 temperature=temp,
                 category='rarity_classification',
-                num_items=_num_items,
+                num_items=num_items,
+                schema=schema,
                 )
             )
-        word_rarity_df = parse_response_table(rarity_response.output_text)
+        word_rarity_df = parse_table_output(rarity_response.output_text, schema=schema)
 
-        max_retries = 3
         for retry in range(max_retries):
             print(f"Checking rarity classification for {word_list}. Attempt {retry + 1}/{max_retries}")
             if 'Word Rarity' in word_rarity_df:
@@ -412,11 +445,65 @@ class TranslationPipeline:
                     rarity_response = (
                         get_completion(
                             prompt=get_prompt_for_multiclass_rarity_classification(word_list), model=rarity_model, temperature=temp,
-                            category='rarity_classification', num_items=_num_items))
-                    word_rarity_df = parse_response_table(rarity_response.output_text)
-
-        newwords_df = pd.merge(newwords_df, word_rarity_df, on='Word', how='left')
+                            category='rarity_classification', num_items=num_items, schema=schema))
+                    word_rarity_df = parse_table_output(rarity_response.output_text, schema=schema)
+        return word_rarity_df
+
+    def _translate_words(self, word_list, translation_model, rarity_model, temp):
+        '''
+        Translate and rarity-classify one batch of words, returning the merged table.
+        '''
+        _num_items = len(_split_word_list(word_list))
+
+        ## Translation and rarity classification are independent prompts, so run them concurrently
+        ## and join both results before merging on Word
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            translation_future = executor.submit(
+                self._run_translation, word_list, translation_model, temp, _num_items)
+            rarity_future = executor.submit(
+                self._run_rarity_classification, word_list, rarity_model, temp, _num_items)
+            newwords_df = translation_future.result()
+            word_rarity_df = rarity_future.result()
+
+        return pd.merge(newwords_df, word_rarity_df, on='Word', how='left')
+
+    def _translate_chunk(self, words, translation_model, rarity_model, temp, max_retries=2):
+        '''
+        Translate one chunk of a bulk import, re-requesting only the words missing from the Word column.
+        '''
+        chunk_df = self._translate_words(', '.join(words), translation_model, rarity_model, temp)
+        missing = [w for w in words if w not in set(chunk_df.get('Word', []))]
 
+        for retry in range(max_retries):
+            if not missing:
+                break
+            print(f"Re-requesting {len(missing)} missing word(s) {missing}. Attempt {retry + 1}/{max_retries}")
+            retry_df = self._translate_words(', '.join(missing), translation_model, rarity_model, temp)
+            chunk_df = pd.concat([chunk_df, retry_df], ignore_index=True)
+            missing = [w for w in missing if w not in set(chunk_df.get('Word', []))]
+
+        if missing:
+            print(f"Words still missing after {max_retries} retries: {missing}")
+        return chunk_df
+
+    def _split_known_words(self, words, overwrite_mode):
+        '''
+        Split words into rows already complete in WordDict and the words that still need the LLM.
+        Known words are remembered in self.known_words so update_module does not rewrite them.
+        With overwrite_mode (or in gsheet mode) every word is sent for translation.
+        '''
+        if overwrite_mode or self.gsheet_mode:
+            self.known_words -= set(words)
+            return pd.DataFrame(), words
+
+        known_df = load_known_words(words)
+        known = set(known_df['Word'])
+        self.known_words |= known
+        if known:
+            print(f"Serving {len(known)} known word(s) from the dictionary, translating {len(words) - len(known)}")
+        return known_df, [w for w in words if w not in known]
+
+    def _store_new_words(self, newwords_df, replace_new_words):
         if not (replace_new_words) and len(self.new_words_df) > 0:
             orig_new_words_df = self.new_words_df.copy()
 
@@ -426,17 +513,110 @@ class TranslationPipeline:
 
         else:
             self.new_words_df = newwords_df
+
+    def translation_module(
+        self, 
+        word_list, 
+        translation_model="gpt-5-mini", 
+        rarity_model="gpt-5-mini", 
+        temp=1, 
+        replace_new_words=True,
+        overwrite_mode=False
+        ):
+        '''
+        Translate word_list and stage the result on self.new_words_df.  Words that already have
+        complete rows in WordDict are served from the database and only the unknown words are sent
+        to the LLM, unless overwrite_mode is enabled.
+        '''
+        print(translation_model, rarity_model)
+        print(word_list)
+        print(len(word_list))
+
+        if replace_new_words:
+            self.known_words = set()
+        words = _split_word_list(word_list)
+        known_df, unknown_words = self._split_known_words(words, overwrite_mode)
+
+        if len(unknown_words) == len(words):
+            newwords_df = self._translate_words(word_list, translation_model, rarity_model, temp)
+        elif unknown_words:
+            newwords_df = self._translate_words(', '.join(unknown_words), translation_model, rarity_model, temp)
+        else:
+            newwords_df = pd.DataFrame()
+        if len(known_df) > 0:
+            newwords_df = pd.concat([known_df, newwords_df], ignore_index=True)
+        self._store_new_words(newwords_df, replace_new_words)
+
+    def bulk_translation_module(
+        self,
+        word_list,
+        translation_model="gpt-5-mini",
+        rarity_model="gpt-5-mini",
+        temp=1,
+        replace_new_words=True,
+        chunk_size=25,
+        max_workers=4,
+        max_retries=2,
+        overwrite_mode=False
+        ):
+        '''
+        Translate a large word list by splitting it into chunks of chunk_size words and running
+        up to max_workers chunks concurrently.  Words missing from a chunk's output are re-requested
+        up to max_retries times.  Progress is published on self.progress as chunks complete ('done' once
+        the run has ended) and the
+        overall throughput is recorded in APILatencyLog under the 'translation_bulk' category.
+        As in translation_module, words already complete in WordDict skip the LLM unless overwrite_mode is set.
+        '''
+        if replace_new_words:
+            self.known_words = set()
+        words = list(dict.fromkeys(_split_word_list(word_list)))
+        known_df, words = self._split_known_words(words, overwrite_mode)
+        num_known = known_df['Word'].nunique() if len(known_df) > 0 else 0
+        chunks = [words[i:i + chunk_size] for i in range(0, len(words), chunk_size)]
+        self.progress = {'completed': num_known, 'total': len(words) + num_known, 'done': False}
+        print(f"Bulk translation of {len(words)} words in {len(chunks)} chunk(s) of up to {chunk_size}")
+
+        start = time.time()
+        chunk_dfs = []
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self._translate_chunk, chunk, translation_model, rarity_model, temp, max_retries): chunk
+                    for chunk in chunks
+                }
+                for future in as_completed(futures):
+                    chunk_dfs.append(future.result())
+                    self.progress['completed'] += len(futures[future])
+        finally:
+            self.progress['done'] = True
+
+        latency_ms = int((time.time() - start) * 1000)
+        print(f"Bulk translation finished in {latency_ms / 1000:.1f}s "
+              f"({len(words) / max(latency_ms / 1000, 1e-3):.2f} words/s)")
+        log_api_event(category='translation_bulk', model=translation_model, latency_ms=latency_ms, num_items=len(words))
+
+        frames = ([known_df] if len(known_df) > 0 else []) + chunk_dfs
+        newwords_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        self._store_new_words(newwords_df, replace_new_words)
             
     def clear_new_words(self):
         self.new_words_df = pd.DataFrame()
+        self.known_words = set()
 
-    def update_module(self, df=None, overwrite_mode=False):
+    def update_module(self, df=None, overwrite_mode=False, upsert=False):
         if (df is None):
             upload_df = self.new_words_df
         elif (df is not None):
             upload_df = df
         else:
             raise Exception("Run the translation module first or provide external dataset before running the update module.")
+
+        # Words served from WordDict are already stored as-is; rewriting them would only
+        # reassign their word ids, so leave them out of the upload.
+        if self.known_words and 'Word' in upload_df:
+            upload_df = upload_df.loc[~upload_df['Word'].isin(self.known_words)]
+            if len(upload_df) == 0:
+                return "All words already exist in the dictionary.  Nothing to update."
         
         if self.gsheet_mode:
             message = save_new_words_to_dict(
@@ -447,7 +627,7 @@ class TranslationPipeline:
                 worksheet_name = self.worksheet_name
             )
         else:
-            message = sql_update_worddict(upload_df)
+            message = sql_update_worddict(upload_df, upsert=upsert, prune=overwrite_mode)
         
         return message
     
@@ -463,8 +643,9 @@ class WordComparisonPipeline:
     WordComparison table.
     """
 
-    def __init__(self):
+    def __init__(self, structured=None):
         self.result_df = pd.DataFrame()
+        self.structured = use_structured_output(structured)
 
     def run(self, word1: str, word2: str, model: str = "gpt-5-mini", temperature: float = 1) -> pd.DataFrame:
         """
@@ -482,8 +663,9 @@ class WordComparisonPipeline:
             Single-row DataFrame with the comparison result.
         """
         prompt = get_prompt_for_word_comparison(word1, word2)
-        response = get_completion(prompt, model=model, temperature=temperature, category='word_comparison', num_items=1)
-        result_df = parse_response_table(response.output_text)
+        schema = WORD_COMPARISON_SCHEMA if self.structured else None
+        response = get_completion(prompt, model=model, temperature=temperature, category='word_comparison', num_items=1, schema=schema)
+        result_df = parse_table_output(response.output_text, schema=schema)
         self.result_df = result_df
         return result_df
 
@@ -9,9 +9,14 @@ import pandas as pd
 import time
 
 import os
-from io import StringIO
+import re
+import json
 from datetime import datetime
 
+from main.llm_cache import should_cache, make_cache_key, get_cached_response, store_response
+from main.api_logger import api_log_writer
+from main.schemas import STRUCTURED_OUTPUT_INSTRUCTION
+
 client = OpenAI(
     api_key = os.getenv('API_KEY_OPENAI'),
 )
@@ -25,12 +30,11 @@ _MODEL_PRICING = {
 }
 
 
-def _log_api_call(category, model, latency_ms, response, error_message, num_items):
-    """Write one row to APILatencyLog. Never raises — failures are caught by the caller."""
-    from database import engine
-    from models import APILatencyLog
-    from sqlalchemy.orm import Session
-
+def _log_api_call(category, model, latency_ms, response, error_message, num_items, cache_hit=None):
+    """
+    Queue one APILatencyLog row on the background writer (see main.api_logger); the insert happens
+    off the request path in a batch.  Never raises — failures are caught by the caller.
+    """
     usage = getattr(response, 'usage', None) if response is not None else None
     input_tokens     = getattr(usage, 'input_tokens', None)
     output_tokens    = getattr(usage, 'output_tokens', None)
@@ -42,10 +46,14 @@ def _log_api_call(category, model, latency_ms, response, error_message, num_item
 
     in_price, out_price = _MODEL_PRICING.get(model, (0.0, 0.0))
     estimated_cost = None
-    if input_tokens is not None and output_tokens is not None:
+    if cache_hit:
+        # Served from LLMResponseCache: no tokens were billed for this call
+        input_tokens = output_tokens = reasoning_tokens = None
+        estimated_cost = 0.0
+    elif input_tokens is not None and output_tokens is not None:
         estimated_cost = round((input_tokens * in_price) + (output_tokens * out_price), 8)
 
-    record = APILatencyLog(
+    record = dict(
         category=category,
         model=model,
         latency_ms=latency_ms,
@@ -57,13 +65,43 @@ def _log_api_call(category, model, latency_ms, response, error_message, num_item
         status=status,
         error_message=error_message,
         estimated_cost_usd=estimated_cost,
+        cache_hit=None if cache_hit is None else int(cache_hit),
     )
-    with Session(engine) as session:
-        session.add(record)
-        session.commit()
+    api_log_writer.enqueue(record)
+
 
+def log_api_event(category, model, latency_ms, num_items=None, error_message=None):
+    """
+    Record an APILatencyLog row for work that spans several completions (e.g. a chunked bulk
+    translation), so its end-to-end latency and throughput can be tracked alongside single calls.
+    """
+    try:
+        _log_api_call(
+            category=category,
+            model=model,
+            latency_ms=latency_ms,
+            response=None,
+            error_message=error_message,
+            num_items=num_items,
+        )
+    except Exception as log_exc:
+        print(f"[latency logging failed] {log_exc}")
+
+
+def get_completion(prompt, model="gpt-5-mini", temperature=1, category='unknown', num_items=None, use_cache=None, schema=None):
+    """
+    Call the Responses API, logging latency/usage to APILatencyLog.
+
+    When the response cache is enabled for this category (see main.llm_cache.CACHE_POLICY) or
+    use_cache=True is passed, an identical earlier request is served from LLMResponseCache instead.
+    Passing a schema from main.schemas requests structured JSON output; decode it with
+    parse_table_output / parse_structured_table.
+    """
+    text_format = None
+    if schema is not None:
+        prompt = f"{prompt}\n\n{STRUCTURED_OUTPUT_INSTRUCTION}"
+        text_format = {"format": schema}
 
-def get_completion(prompt, model="gpt-5-mini", temperature=1, category='unknown', num_items=None):
     if "gpt-5" in model:
         reasoning={"effort": "medium"}
         temperature = None
@@ -74,21 +112,116 @@ def get_completion(prompt, model="gpt-5-mini", temperature=1, category='unknown'
     start_ms = time.time()
     response = None
     error_msg = None
+    cache_key = None
+    cache_hit = None
+
+    if should_cache(category, use_cache):
+        cache_key = make_cache_key(model, prompt, reasoning, temperature, schema=schema)
+        cache_hit = False
+        try:
+            response = get_cached_response(cache_key)
+        except Exception as cache_exc:
+            print(f"[response cache lookup failed] {cache_exc}")
+        if response is not None:
+            cache_hit = True
+            print(f"Response cache hit for category '{category}'")
+            try:
+                _log_api_call(
+                    category=category,
+                    model=model,
+                    latency_ms=int((time.time() - start_ms) * 1000),
+                    response=response,
+                    error_message=None,
+                    num_items=num_items,
+                    cache_hit=True,
+                )
+            except Exception as log_exc:
+                print(f"[latency logging failed] {log_exc}")
+            return response
+
     try:
-        response = client.responses.create(
+        request = dict(
             model=model,
             input=prompt,
             temperature=temperature,
             reasoning=reasoning
         )
+        if text_format is not None:
+            request['text'] = text_format
+        response = client.responses.create(**request)
         usage = response.usage
         cached = getattr(getattr(usage, 'input_tokens_details', None), 'cached_tokens', 0) or 0
         print(f"Tokens — input: {usage.input_tokens}, output: {usage.output_tokens}, cached: {cached}")
         print(f"Usage details: {usage}")
+        if cache_key is not None:
+            try:
+                store_response(cache_key, category, model, response)
+            except Exception as cache_exc:
+                print(f"[response cache store failed] {cache_exc}")
         return response
     except Exception as e:
         error_msg = str(e)
         raise
+    finally:
+        latency_ms = int((time.time() - start_ms) * 1000)
+        try:
+            _log_api_call(
+                category=category,
+                model=model,
+                latency_ms=latency_ms,
+                response=response,
+                error_message=error_msg,
+                num_items=num_items,
+                cache_hit=cache_hit,
+            )
+        except Exception as log_exc:
+            print(f"[latency logging failed] {log_exc}")
+
+
+def stream_completion(prompt, model="gpt-5-mini", temperature=1, category='unknown', num_items=None):
+    """
+    Streaming variant of get_completion: yields the output text deltas as the Responses API emits
+    them.  Latency/usage is logged to APILatencyLog once the stream completes (or fails), with the
+    time to first token printed for comparison against the full generation time.
+    Streamed calls bypass the response cache.
+    """
+    if "gpt-5" in model:
+        reasoning={"effort": "medium"}
+        temperature = None
+    else:
+        reasoning=None
+
+    print(f"Model: {model}, Temperature: {temperature}, Reasoning: {reasoning} (streaming)")
+    start_ms = time.time()
+    first_token_ms = None
+    response = None
+    error_msg = None
+
+    try:
+        stream = client.responses.create(
+            model=model,
+            input=prompt,
+            temperature=temperature,
+            reasoning=reasoning,
+            stream=True
+        )
+        for event in stream:
+            if event.type == 'response.output_text.delta':
+                if first_token_ms is None:
+                    first_token_ms = int((time.time() - start_ms) * 1000)
+                    print(f"First token after {first_token_ms} ms")
+                yield event.delta
+            elif event.type in ('response.completed', 'response.incomplete'):
+                response = event.response
+            elif event.type in ('response.failed', 'error'):
+                response = getattr(event, 'response', None)
+                raise RuntimeError(getattr(event, 'message', None) or f"Streaming response failed: {event.type}")
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            print(f"Tokens — input: {usage.input_tokens}, output: {usage.output_tokens}")
+    except Exception as e:
+        error_msg = str(e)
+        raise
     finally:
         latency_ms = int((time.time() - start_ms) * 1000)
         try:
@@ -104,6 +237,147 @@ def get_completion(prompt, model="gpt-5-mini", temperature=1, category='unknown'
             print(f"[latency logging failed] {log_exc}")
 
 
+# A cell made only of dashes with optional alignment colons, e.g. ---, :--, :-:
+_SEPARATOR_CELL = re.compile(r'^:?-+:?$')
+_UNESCAPED_PIPE = re.compile(r'(?<!\\)\|')
+
+
+def _split_table_line(line: str) -> List[str]:
+    """
+    Split one markdown table line into stripped cell values, dropping the outer pipes.
+    Escaped pipes (\\|) are kept inside the cell as a literal |.
+    """
+    line = line.strip()
+    escaped = '\\|' in line
+    cells = _UNESCAPED_PIPE.split(line) if escaped else line.split('|')
+    if line.startswith('|'):
+        cells = cells[1:]
+    if line.endswith('|') and not line.endswith('\\|'):
+        cells = cells[:-1]
+    if escaped:
+        return [cell.strip().replace('\\|', '|') for cell in cells]
+    return list(map(str.strip, cells))
+
+
+def _is_separator_row(cells: List[str]) -> bool:
+    # Data rows almost never start with '-' or ':', so reject them on the first cell
+    if cells and cells[0] and cells[0][0] not in '-:':
+        return False
+    return any(cells) and all(cell == '' or _SEPARATOR_CELL.match(cell) for cell in cells)
+
+
+def _fit_row(cells: List[str], num_cols: int) -> List:
+    """
+    Make a ragged row match the header: overflow cells (an unescaped pipe inside the last cell)
+    are joined back into the last column and short rows are padded with None.
+    """
+    if len(cells) > num_cols:
+        return cells[:num_cols - 1] + [' | '.join(cells[num_cols - 1:])]
+    return cells + [None] * (num_cols - len(cells))
+
+
+def stream_response_table(
+        prompt,
+        model="gpt-5-mini",
+        temperature=1,
+        category='unknown',
+        num_items=None,
+        ffill_cols: List[str] = None,
+        date_col: List[str] = None
+        ):
+    """
+    Stream a completion whose output is a markdown table and yield each data row as a one-row
+    DataFrame as soon as its line is complete.  The header line sets the columns; separator
+    lines and any text outside the table are skipped.  ffill_cols and date_col behave as in
+    parse_response_table, with forward fill carried across rows.
+    """
+    header = None
+    last_values = {}
+    buffer = ''
+
+    def to_row(line):
+        nonlocal header
+        if '|' not in line:
+            return None
+        cells = _split_table_line(line)
+        if header is None:
+            header = cells
+            return None
+        if _is_separator_row(cells):
+            return None
+        row = pd.DataFrame([_fit_row(cells, len(header))], columns=header)
+        if ffill_cols:
+            for col in ffill_cols:
+                if col in row:
+                    if row.at[0, col] == '':
+                        row.at[0, col] = last_values.get(col, pd.NA)
+                    else:
+                        last_values[col] = row.at[0, col]
+        if date_col:
+            for col in date_col:
+                row[col] = datetime.now().strftime("%Y-%m-%d")
+        return row
+
+    for delta in stream_completion(prompt, model=model, temperature=temperature, category=category, num_items=num_items):
+        buffer += delta
+        while '\n' in buffer:
+            line, buffer = buffer.split('\n', 1)
+            row = to_row(line)
+            if row is not None:
+                yield row
+
+    row = to_row(buffer)
+    if row is not None:
+        yield row
+
+
+def parse_markdown_table(content: str, convert_numeric: bool = True) -> pd.DataFrame:
+    '''
+    Parse a markdown pipe table from an LLM response into a DataFrame in a single pass.
+
+    Text outside the table, the separator line and columns with an empty header are skipped.
+    Cells are stripped, escaped pipes are unescaped and ragged rows are fitted to the header
+    (see _fit_row).  With convert_numeric, columns whose non-empty values are all numbers are
+    converted to int/float, with empty cells becoming NaN.
+    '''
+    header = None
+    rows = []
+    for line in content.splitlines():
+        if '|' not in line:
+            continue
+        cells = _split_table_line(line)
+        if header is None:
+            header = cells
+        elif not _is_separator_row(cells):
+            rows.append(_fit_row(cells, len(header)))
+
+    if header is None:
+        return pd.DataFrame()
+
+    keep = [i for i, col in enumerate(header) if col != '']
+    if len(keep) < len(header):
+        header = [header[i] for i in keep]
+        rows = [[row[i] for i in keep] for row in rows]
+    df = pd.DataFrame(rows, columns=header)
+
+    if convert_numeric:
+        for i, col in enumerate(df.columns):
+            # Cheap rejection on the first non-empty cell before converting the whole column
+            first = next((row[i] for row in rows if row[i]), None)
+            try:
+                float(first)
+            except (TypeError, ValueError):
+                continue
+            values = df[col]
+            present = values.notna() & (values != '')
+            if not present.any():
+                continue
+            numbers = pd.to_numeric(values.where(present), errors='coerce')
+            if numbers[present].notna().all():
+                df[col] = numbers
+    return df
+
+
 def parse_response_table(
         content: str, 
         ffill_cols: List[str] = None,
@@ -112,24 +386,29 @@ def parse_response_table(
     '''
     Parse the table response from OpenAI into a pandas DataFrame
     '''
-    # Using StringIO to treat the text as a file-like object for pandas
-    data = StringIO(content)
+    df = parse_markdown_table(content)
 
-    # Read the table into a pandas DataFrame
-    df = pd.read_csv(data, delimiter='|',  engine='python')
+    if ffill_cols:
+        for col in ffill_cols:
+            df[col] = df[col].replace('', pd.NA).ffill()
 
-    # Cleaning the DataFrame by stripping leading/trailing whitespaces from column names and data
-    df.columns = df.columns.str.strip()
-    df = df.map(lambda x: x.strip() if isinstance(x, str) else x)
+    if date_col:
+        for col in date_col:
+            df[col] = datetime.now().strftime("%Y-%m-%d")
 
-    df = df[[col for col in df if 'Unnamed' not in col]]
+    return df
 
-    # Remove rows with dashes
-    col_name = df.select_dtypes(include=['object']).columns[0]
-    df = df.loc[~df[col_name].fillna('').str.contains('--')]
 
-    col_to_keep = [col for col in df if 'Unnamed' not in col]
-    df = df[col_to_keep]
+def parse_structured_table(
+        content: str,
+        ffill_cols: List[str] = None,
+        date_col: List[str] = None
+        ) -> pd.DataFrame:
+    '''
+    Decode a structured-output response ({"rows": [...]}, see main.schemas.table_schema) into a
+    DataFrame, applying ffill_cols and date_col as parse_response_table does.
+    '''
+    df = pd.DataFrame(json.loads(content)['rows'])
 
     if ffill_cols:
         for col in ffill_cols:
@@ -139,4 +418,19 @@ def parse_response_table(
         for col in date_col:
             df[col] = datetime.now().strftime("%Y-%m-%d")
 
-    return df
\ No newline at end of file
+    return df
+
+
+def parse_table_output(
+        content: str,
+        schema: dict = None,
+        ffill_cols: List[str] = None,
+        date_col: List[str] = None
+        ) -> pd.DataFrame:
+    '''
+    Parse a completion requested with get_completion(schema=schema): JSON rows when a schema was
+    used, otherwise the markdown table.
+    '''
+    if schema is not None:
+        return parse_structured_table(content, ffill_cols=ffill_cols, date_col=date_col)
+    return parse_response_table(content, ffill_cols=ffill_cols, date_col=date_col)
@@ -2,6 +2,8 @@ import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from main.ranking import rank_error_words
+
 # Common layout settings for all charts
 CHART_TEMPLATE = "plotly_white"
 CHART_FONT = dict(family="Arial, sans-serif", size=12)
@@ -135,31 +137,13 @@ def create_category_performance_chart(df: pd.DataFrame) -> go.Figure:
 
 def create_top_errors_chart(df: pd.DataFrame) -> go.Figure:
     """Top 10 words with pinyin/meaning errors."""
-    # Top 10 Pinyin Wrong
-    top_pinyin = df.groupby('Word').agg({
-        'Num Pinyin Wrong': 'sum',
-        'Quiz Attempts': 'sum',
-        'Pinyin': 'first'
-    }).reset_index()
-    top_pinyin = top_pinyin[top_pinyin['Quiz Attempts'] > 1]
-    top_pinyin['Pinyin Wrong %'] = (top_pinyin['Num Pinyin Wrong'] / top_pinyin['Quiz Attempts'] * 100).round(1)
-    top_pinyin = top_pinyin[top_pinyin['Num Pinyin Wrong'] >= 1].sort_values(
-        by=['Pinyin Wrong %', 'Num Pinyin Wrong'], ascending=[False, False]
-    ).head(20)
+    # Top 20 Pinyin Wrong
+    top_pinyin = rank_error_words(df, 'pinyin', 20, extra_cols=('Pinyin',))
     top_pinyin['Label'] = '(' + top_pinyin['Pinyin Wrong %'].astype(str) + '%, ' + top_pinyin['Quiz Attempts'].astype(str) + ')'
     top_pinyin['Word Display'] = top_pinyin['Word'] + ' (' + top_pinyin['Pinyin'] + ')'
 
-    # Top 10 Meaning Wrong
-    top_meaning = df.groupby('Word').agg({
-        'Num Meaning Wrong': 'sum',
-        'Quiz Attempts': 'sum',
-        'Pinyin': 'first'
-    }).reset_index()
-    top_meaning = top_meaning[top_meaning['Quiz Attempts'] > 1]
-    top_meaning['Meaning Wrong %'] = (top_meaning['Num Meaning Wrong'] / top_meaning['Quiz Attempts'] * 100).round(1)
-    top_meaning = top_meaning[top_meaning['Num Meaning Wrong'] >= 1].sort_values(
-        by=['Meaning Wrong %', 'Num Meaning Wrong'], ascending=[False, False]
-    ).head(20)
+    # Top 20 Meaning Wrong
+    top_meaning = rank_error_words(df, 'meaning', 20, extra_cols=('Pinyin',))
     top_meaning['Label'] = '(' + top_meaning['Meaning Wrong %'].astype(str) + '%, ' + top_meaning['Quiz Attempts'].astype(str) + ')'
     top_meaning['Word Display'] = top_meaning['Word'] + ' (' + top_meaning['Pinyin'] + ')'
 
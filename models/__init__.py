@@ -1,11 +1,15 @@
 from .base import Base
 from .word_dict import WordDict
 from .quiz_agg import QuizAgg
+from .word_schedule import WordSchedule
 from .quiz_log import QuizLog
 from .phrase_dict import PhraseDict
 from .response_log import ResponseLog
 from .translation_log import TranslationLog
 from .word_comparison import WordComparison
 from .api_latency_log import APILatencyLog
+from .llm_response_cache import LLMResponseCache
+from .id_sequence import IdSequence
+from .data_version import DataVersion
 
-__all__ = ["Base", "WordDict", "QuizAgg", "PhraseDict", "QuizLog", "ResponseLog", "TranslationLog", "WordComparison", "APILatencyLog"]
+__all__ = ["Base", "WordDict", "QuizAgg", "WordSchedule", "PhraseDict", "QuizLog", "ResponseLog", "TranslationLog", "WordComparison", "APILatencyLog", "LLMResponseCache", "IdSequence", "DataVersion"]
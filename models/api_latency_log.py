@@ -18,3 +18,4 @@ class APILatencyLog(Base):
     status = Column(String, nullable=False)             # 'success' or 'error'
     error_message = Column(String, nullable=True)
     estimated_cost_usd = Column(Float, nullable=True)
+    cache_hit = Column(Integer, nullable=True)          # 1 = served from LLMResponseCache, 0 = cache miss, NULL = cache not used
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String
+from .base import Base
+
+
+class DataVersion(Base):
+    __tablename__ = "DataVersion"
+
+    # One row per table in database.DATA_VERSION_TABLES; version counts the rows written to it.  Kept by
+    # triggers (database.ensure_data_versions), so writes from any connection or process count.
+    # Caches (main/data_cache.py) compare it to decide whether to reload.
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
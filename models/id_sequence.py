@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String
+from .base import Base
+
+
+class IdSequence(Base):
+    __tablename__ = "IdSequence"
+
+    # One row per ID prefix ('D', 'P', 'QW', 'QR', 'QT'); last_value is the numeric part of the
+    # last ID handed out.  Advanced by main.sql.allocate_ids inside the inserting transaction.
+    prefix = Column(String, primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime, func
+from .base import Base
+
+
+class LLMResponseCache(Base):
+    __tablename__ = "LLMResponseCache"
+
+    cache_key = Column(String, primary_key=True)           # sha256 of (model, prompt, reasoning, temperature)
+    category = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    response_json = Column(String, nullable=False)         # Response.model_dump_json()
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_accessed = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    hit_count = Column(Integer, nullable=False, default=0)
@@ -5,8 +5,14 @@ from .base import Base
 
 class QuizAgg(Base):
     __tablename__ = "QuizAgg" 
+    # Per-word quiz statistics (what the QuizScore view computes), kept in step with QuizLog by
+    # sql_update_quizlog in the same transaction.  Rebuild with `python database.py rebuild-quiz-agg`.
     word_id = Column(String, ForeignKey("WordDict.word_id", ondelete="CASCADE"), primary_key=True)
     num_quiz_attempt = Column(Integer, default=0)
     num_correct = Column(Integer, default=0)
     num_wrong = Column(Integer, default=0)
     last_quiz = Column(DateTime(timezone=True), nullable=True)
+    pinyin_correct_cnt = Column(Integer, default=0)
+    pinyin_wrong_cnt = Column(Integer, default=0)
+    meaning_correct_cnt = Column(Integer, default=0)
+    meaning_wrong_cnt = Column(Integer, default=0)
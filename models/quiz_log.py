@@ -20,3 +20,5 @@ class QuizLog(Base):
     adaptive_sample_scale = Column(Float, nullable=True, default=1.0)
     is_top_pinyin_error = Column(Integer, nullable=True)
     is_top_meaning_error = Column(Integer, nullable=True)
+    pinyin_error_type = Column(String, nullable=True)   # main.pinyin.pinyin_error_type, e.g. 'tone'
+    meaning_grading_source = Column(String, nullable=True)  # 'llm' or the local rule (main.meaning_grader)
@@ -24,6 +24,8 @@ class WordDict(Base):
     sentence_pinyin = Column(String, nullable=False)
     sentence_meaning = Column(String, nullable=False)
     added_date = Column(DateTime(timezone=True), server_default=func.now())
+    # normalize_pinyin(pinyin_simplified), e.g. 'ni3 hao3'; set by the writes in main/sql.py (database.word_pinyin_normalized)
+    pinyin_normalized = Column(String, nullable=True)
     #It's better to track quiz stats in a separate table to allow for multiple quiz attempts over time
     #We can display quiz stats in the app by querying the quiz attempts table and doing groupby 
     #num_quiz_attempt = Column(Integer, default=0)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, Float, String, DateTime
+from sqlalchemy import ForeignKey
+from .base import Base
+
+
+class WordSchedule(Base):
+    __tablename__ = "WordSchedule"
+    # Spaced-repetition state per quizzed word (main/scheduler.py), updated from each saved quiz by
+    # sql_update_quizlog in the same transaction.  Words with no row have never been quizzed.
+    # Rebuild from QuizLog with `python database.py rebuild-word-schedule`.
+    word_id = Column(String, ForeignKey("WordDict.word_id", ondelete="CASCADE"), primary_key=True)
+    repetitions = Column(Integer, nullable=False, default=0)   # successful reviews in a row
+    ease = Column(Float, nullable=False)                       # SM-2 E-Factor; lower = harder word
+    stability = Column(Float, nullable=False)                  # current interval in days
+    due = Column(DateTime(timezone=True), nullable=False, index=True)
+    last_review = Column(DateTime(timezone=True), nullable=False)
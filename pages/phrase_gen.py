@@ -7,12 +7,13 @@ import dash_bootstrap_components as dbc
 from dotenv import load_dotenv
 import os
 import sys
+import threading
 load_dotenv()
 
 from main.gsheets import load_gsheet_dict
 from main.phrase_generator import PhraseGenerationPipeline
 from main.dash_utils import create_tabs
-from main.sql import load_phrase_dict
+from main.data_cache import get_phrase_dict_df
 
 
 # Incorporate data
@@ -31,9 +32,6 @@ phrase_generator = PhraseGenerationPipeline(
 )
 
 
-phrase_dict = load_phrase_dict()
-existing_phrases = phrase_dict['Line'].drop_duplicates().values.tolist()
-
 # App layout
 layout = dbc.Container([
     dbc.Row([
@@ -161,6 +159,9 @@ layout = dbc.Container([
                 style={"font-size": "1.25rem", "color": "#6c757d"}),  # Adjust font size and color
         className="d-flex justify-content-center"
     )),
+    # Polls the streaming generation so rows appear as they are produced
+    dcc.Interval(id='phrase-stream-interval', interval=500, n_intervals=0, disabled=True),
+    html.Div(id='phrase-stream-status', style={'color': '#6c757d', 'marginBottom': '10px'}),
     dbc.Row(
         dbc.Col(
             dash_table.DataTable(
@@ -203,12 +204,17 @@ layout = dbc.Container([
 
 
 # Callback to update output text on button click
+# Generation streams in a background thread; the interval then refreshes the table with the rows
+# received so far and switches itself off once the stream has finished.
 @callback(
     [Output(component_id='phrase-datatable', component_property='data'),
-    Output(component_id='phrase-datatable', component_property='columns')],
+    Output(component_id='phrase-datatable', component_property='columns'),
+    Output('phrase-stream-interval', 'disabled'),
+    Output('phrase-stream-status', 'children')],
     Input('gen-phrase-button', 'n_clicks'),  
     Input('gen-response-button', 'n_clicks'),  
     Input('gen-translation-button', 'n_clicks'),  
+    Input('phrase-stream-interval', 'n_intervals'),
     State('phrase-input-situation', 'value'),            
     State('phrase-num', 'value'),            
     State('phrase-complexity', 'value'),   
@@ -216,21 +222,43 @@ layout = dbc.Container([
     State('phrase-input', 'value'),
     State('translation-input', 'value'),
 )
-def run_phrase_gen(n_clicks_gen, n_clicks_response, n_clicks_translation, situation, num_phrases, complexity, tone, input_phrases, input_translation):
+def run_phrase_gen(n_clicks_gen, n_clicks_response, n_clicks_translation, n_intervals, situation, num_phrases, complexity, tone, input_phrases, input_translation):
     ctx = callback_context  # Get the context of which button was clicked
 
     button_id = ctx.triggered[0]["prop_id"].split(".")[0]  # Get the ID of the clicked button
 
+    stream_target = None
     if button_id == "gen-phrase-button":
-        phrase_generator.phrase_generation_module(situation, num_phrases, complexity, tone, existing_phrases=existing_phrases, translation_model = 'gpt-4o', temp=0.7)
+        existing_phrases = get_phrase_dict_df()['Line'].drop_duplicates().values.tolist()
+        stream_target = lambda: phrase_generator.phrase_generation_module(
+            situation, num_phrases, complexity, tone, existing_phrases=existing_phrases,
+            translation_model = 'gpt-4o', temp=0.7, stream=True)
 
     if button_id == "gen-response-button":
-        phrase_generator.phrase_response_module(input_phrases, complexity, tone, translation_model = 'gpt-4o', temp=0.7)
+        stream_target = lambda: phrase_generator.phrase_response_module(
+            input_phrases, complexity, tone, translation_model = 'gpt-4o', temp=0.7, stream=True)
 
     if button_id == "gen-translation-button":
-        phrase_generator.phrase_translate_module(input_translation, complexity, tone, translation_model = 'gpt-4o', temp=0.7)
+        stream_target = lambda: phrase_generator.phrase_translate_module(
+            input_translation, complexity, tone, translation_model = 'gpt-4o', temp=0.7, stream=True)
+
+    if stream_target is not None and not phrase_generator.streaming:
+        phrase_generator.streaming = True
+        phrase_generator.new_phrase_df = pd.DataFrame()
+        threading.Thread(target=stream_target, daemon=True).start()
+
+    streaming = phrase_generator.streaming
+    if streaming:
+        status = f"Generating... {len(phrase_generator.new_phrase_df)} row(s) received"
+    elif phrase_generator.stream_error:
+        status = f"Generation failed: {phrase_generator.stream_error}"
+    else:
+        status = ""
 
-    return phrase_generator.new_phrase_df.to_dict('records'), [{"name": i, "id": i} for i in phrase_generator.new_phrase_df.columns]
+    return (phrase_generator.new_phrase_df.to_dict('records'),
+            [{"name": i, "id": i} for i in phrase_generator.new_phrase_df.columns],
+            not streaming,
+            status)
 
 
 @callback(
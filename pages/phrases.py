@@ -8,7 +8,7 @@ import dash_bootstrap_components as dbc
 from dotenv import load_dotenv
 import os
 load_dotenv()
-from main.sql import load_dict, load_phrase_dict
+from main.sql import load_dict, load_phrase_dict, search_phrase_ids
 
 # Incorporate data
 dict_sheet_name = os.getenv('PHRASE_SHEET_NAME')
@@ -70,6 +70,19 @@ layout = dbc.Container([
         dbc.Col([dbc.Button('Reload Table', id='reload-button', n_clicks=0, color='primary')]),
     ], className="mb-5"),  # Space between filters and table
 
+    # Full-text search over lines, responses, pinyin and meanings (PhraseDictFts)
+    dbc.Row([
+        dbc.Col([
+            dbc.Input(
+                id='phrase-search-input',
+                type='text',
+                placeholder='Search phrases, pinyin or meaning…',
+                debounce=False,
+                style={'maxWidth': '320px', 'marginBottom': '12px'},
+            )
+        ], width=12)
+    ]),
+
     html.Hr(),
     # Data table with additional margin and styling
     dcc.Store(id="phrase-table-data-store"),
@@ -124,13 +137,15 @@ def reload_table(n_clicks):
     [Input(component_id='phrase-table-data-store', component_property='data'),
      Input(component_id='phrase-date-dropdown', component_property='value'),
      Input(component_id='phrase-category-dropdown', component_property='value'),
-     Input(component_id='phrase-complexity-dropdown', component_property='value')]
+     Input(component_id='phrase-complexity-dropdown', component_property='value'),
+     Input(component_id='phrase-search-input', component_property='value')]
 )
 def slice_table(
     table_data: pd.DataFrame,
     date_filter: str = None,
     category_filter: str = None, 
-    complexity_filter: str = None
+    complexity_filter: str = None,
+    search_text: str = None
     ) -> pd.Series:
     out_table = pd.DataFrame(table_data)
     if date_filter!= 'All':
@@ -146,5 +161,8 @@ def slice_table(
             complexity_filter = [complexity_filter]
             out_table = out_table[out_table['Complexity'].isin(complexity_filter)]
 
+    if search_text and search_text.strip():
+        out_table = out_table[out_table['Phrase Id'].isin(search_phrase_ids(search_text))]
+
     return out_table.to_dict('records')
 
@@ -27,6 +27,10 @@ translator_pipe = TranslationPipeline()
 #df = load_dict(gsheet_mode=True, gsheet_name=gsheet_name, worksheet_name=dict_sheet_name)
 df = pd.DataFrame()
 
+# Word lists longer than this are translated in concurrent chunks via bulk_translation_module
+BULK_CHUNK_SIZE = 25
+BULK_MAX_WORKERS = 4
+
 # Generate styles for the app
 dash.register_page(__name__, path='/translation', name='Translation')
 
@@ -52,7 +56,17 @@ layout = dbc.Container(
                     dbc.ButtonGroup([
                         dbc.Button('+ Add Row', id='add-row-button', n_clicks=0, color='light', size='sm', style={'marginTop': '8px'}),
                         dbc.Button('Submit', id='submit-button', n_clicks=0, size='sm', style={'marginTop': '8px'}),
-                    ])
+                    ]),
+                    dbc.Checklist(
+                        id='retranslate-checkbox',
+                        options=[{'label': 'Re-translate words already in the dictionary', 'value': 'overwrite'}],
+                        value=[],
+                        switch=True,
+                        style={'marginTop': '8px', 'fontSize': '0.9rem'},
+                    ),
+                    html.Div(id='translation-progress', style={'marginTop': '8px', 'color': '#6c757d'}),
+                    # Polls bulk translation progress; switched on per bulk run and off once it is done
+                    dcc.Interval(id='translation-progress-interval', interval=1000, n_intervals=0, disabled=True),
                 ], style={'display': 'flex', 'flexDirection': 'column', 'alignItems': 'flex-start', 'marginBottom': '20px'}),
                 className="d-flex justify-content-center"
             )),
@@ -126,17 +140,54 @@ def add_row(n_clicks, current_data):
     [Output(component_id='vocab-datatable', component_property='data'),
     Output(component_id='vocab-datatable', component_property='columns')],
     Input('submit-button', 'n_clicks'),
-    State('word-input-table', 'data')
+    State('word-input-table', 'data'),
+    State('retranslate-checkbox', 'value')
 )
-def run_translation(n_clicks, word_table_data):
+def run_translation(n_clicks, word_table_data, retranslate):
     if n_clicks > 0 and word_table_data:
         words = [row['word'] for row in word_table_data if row.get('word', '').strip()]
-        if words:
+        overwrite_mode = 'overwrite' in (retranslate or [])
+        if len(words) > BULK_CHUNK_SIZE:
+            translator_pipe.bulk_translation_module(
+                words, translation_model="gpt-5-mini", rarity_model="gpt-5-mini", temp=1, replace_new_words=False,
+                chunk_size=BULK_CHUNK_SIZE, max_workers=BULK_MAX_WORKERS, overwrite_mode=overwrite_mode)
+        elif words:
             word_list = ', '.join(words)
-            translator_pipe.translation_module(word_list, translation_model="gpt-5-mini", rarity_model="gpt-5-mini", temp=1, replace_new_words=False)
+            translator_pipe.translation_module(
+                word_list, translation_model="gpt-5-mini", rarity_model="gpt-5-mini", temp=1, replace_new_words=False,
+                overwrite_mode=overwrite_mode)
     return translator_pipe.new_words_df.to_dict('records'), [{"name": i, "id": i} for i in translator_pipe.new_words_df.columns]
 
 
+@callback(
+    Output('translation-progress-interval', 'disabled'),
+    Input('submit-button', 'n_clicks'),
+    State('word-input-table', 'data'),
+    prevent_initial_call=True
+)
+def start_translation_progress(n_clicks, word_table_data):
+    # Fired by the same click as run_translation; only bulk runs report progress
+    words = [row['word'] for row in word_table_data or [] if row.get('word', '').strip()]
+    if len(words) <= BULK_CHUNK_SIZE:
+        return True
+    # Clear a finished run's flag so the first poll does not switch the interval off again
+    translator_pipe.progress['done'] = False
+    return False
+
+
+@callback(
+    Output('translation-progress', 'children'),
+    Output('translation-progress-interval', 'disabled', allow_duplicate=True),
+    Input('translation-progress-interval', 'n_intervals'),
+    prevent_initial_call=True
+)
+def show_translation_progress(n_intervals):
+    progress = translator_pipe.progress
+    if progress['total'] == 0:
+        return "", progress['done']
+    return f"Translated {progress['completed']} / {progress['total']} words", progress['done']
+
+
 @callback(
     Output('update-status', 'children'),
     Input('update-button', 'n_clicks'),
@@ -146,7 +197,9 @@ def update_output(n_clicks, data_to_update):
     if n_clicks > 0 and hasattr(translator_pipe, 'new_words_df'):
         updated_table_df = pd.DataFrame(data_to_update)
         if len(updated_table_df)> 0:
-            message = translator_pipe.update_module(df=updated_table_df, overwrite_mode=True)
+            # Upsert on (word, meaning) so re-imported words keep their word_id and quiz history;
+            # overwrite_mode removes the meanings a re-translated word no longer has
+            message = translator_pipe.update_module(df=updated_table_df, overwrite_mode=True, upsert=True)
             translator_pipe.clear_new_words()
             return message
         else:
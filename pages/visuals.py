@@ -12,22 +12,12 @@ from main.visualizations import (
     create_vocabulary_growth_chart,
     create_quiz_coverage_chart
 )
-from main.sql import load_dict
-from database import engine
+from main.data_cache import data_cache, get_dict_df, get_quiz_log_df
 
 dash.register_page(__name__, path='/stats', name='Quiz Statistics')
 
-# Load and prepare data initially
-orig_df = load_dict()
-orig_df = prepare_df(orig_df)
-orig_quiz_log = pd.read_sql("SELECT quiz_id, last_quiz, pinyin_correct, meaning_correct FROM QuizLog", engine)
-
-# Calculate summary stats
-total_words = len(orig_df)
-words_quizzed = (orig_df['Quiz Attempts'] > 0).sum()
-total_attempts = orig_df['Quiz Attempts'].sum()
-avg_accuracy = ((orig_df['Num Pinyin Correct'].sum() + orig_df['Num Meaning Correct'].sum()) / 
-                (2 * total_attempts) * 100) if total_attempts > 0 else 0
+# Charts and stat cards start empty and are filled by update_charts, which runs when the page
+# is opened, so no data is loaded at import.
 
 
 def create_stat_card(title, value, icon, color):
@@ -72,16 +62,16 @@ layout = dbc.Container([
     # Summary Stat Cards
     dbc.Row([
         dbc.Col([
-            html.Div(id='stat-total-words', children=create_stat_card("Total Words", f"{total_words:,}", "fa-book", "primary"))
+            html.Div(id='stat-total-words', children=create_stat_card("Total Words", "-", "fa-book", "primary"))
         ], width=3),
         dbc.Col([
-            html.Div(id='stat-words-quizzed', children=create_stat_card("Words Quizzed", f"{words_quizzed:,}", "fa-check-circle", "success"))
+            html.Div(id='stat-words-quizzed', children=create_stat_card("Words Quizzed", "-", "fa-check-circle", "success"))
         ], width=3),
         dbc.Col([
-            html.Div(id='stat-total-attempts', children=create_stat_card("Total Attempts", f"{total_attempts:,}", "fa-clipboard-list", "info"))
+            html.Div(id='stat-total-attempts', children=create_stat_card("Total Attempts", "-", "fa-clipboard-list", "info"))
         ], width=3),
         dbc.Col([
-            html.Div(id='stat-avg-accuracy', children=create_stat_card("Avg Accuracy", f"{avg_accuracy:.1f}%", "fa-bullseye", "warning"))
+            html.Div(id='stat-avg-accuracy', children=create_stat_card("Avg Accuracy", "-", "fa-bullseye", "warning"))
         ], width=3),
     ], className='mb-4'),
     
@@ -105,7 +95,7 @@ layout = dbc.Container([
                 dbc.CardBody([
                     dcc.Graph(
                         id='vocabulary-growth', 
-                        figure=create_vocabulary_growth_chart(orig_df),
+                        figure=go.Figure(),
                         config={'displayModeBar': False}
                     )
                 ])
@@ -118,7 +108,7 @@ layout = dbc.Container([
                 dbc.CardBody([
                     dcc.Graph(
                         id='quiz-by-date', 
-                        figure=create_quiz_by_date_chart(orig_quiz_log),
+                        figure=go.Figure(),
                         config={'displayModeBar': False}
                     )
                 ])
@@ -134,7 +124,7 @@ layout = dbc.Container([
                 dbc.CardBody([
                     dcc.Graph(
                         id='words-by-category', 
-                        figure=create_words_by_category_chart(orig_df),
+                        figure=go.Figure(),
                         config={'displayModeBar': False}
                     )
                 ])
@@ -161,7 +151,7 @@ layout = dbc.Container([
                 dbc.CardBody([
                     dcc.Graph(
                         id='category-performance', 
-                        figure=create_category_performance_chart(orig_df),
+                        figure=go.Figure(),
                         config={'displayModeBar': False}
                     )
                 ])
@@ -188,7 +178,7 @@ layout = dbc.Container([
                 dbc.CardBody([
                     dcc.Graph(
                         id='top-errors', 
-                        figure=create_top_errors_chart(orig_df),
+                        figure=go.Figure(),
                         config={'displayModeBar': False}
                     )
                 ])
@@ -203,7 +193,7 @@ layout = dbc.Container([
                 dbc.CardBody([
                     dcc.Graph(
                         id='quiz-coverage', 
-                        figure=create_quiz_coverage_chart(orig_df),
+                        figure=go.Figure(),
                         config={'displayModeBar': False}
                     )
                 ])
@@ -230,9 +220,12 @@ layout = dbc.Container([
 )
 def update_charts(n_clicks, _pathname):
     """Update all charts on page load or when reload button is clicked."""
-    df = load_dict()
+    if ctx.triggered_id == 'stats-reload-button':
+        # Explicit reload also picks up changes made outside this process
+        data_cache.invalidate('dict', 'quiz_log')
+    df = get_dict_df()
     df = prepare_df(df)
-    quiz_log = pd.read_sql("SELECT quiz_id, last_quiz, pinyin_correct, meaning_correct FROM QuizLog", engine)
+    quiz_log = get_quiz_log_df()
     
     # Calculate updated summary stats
     total_words = len(df)
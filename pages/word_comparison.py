@@ -5,7 +5,8 @@ import pandas as pd
 import dash_bootstrap_components as dbc
 
 from main.translation import WordComparisonPipeline
-from main.sql import load_word_comparisons, sql_insert_word_comparison, sql_delete_word_comparisons
+from main.sql import (load_word_comparisons, sql_insert_word_comparison, sql_delete_word_comparisons,
+                      search_word_comparison_ids)
 from database import init_db
 
 # Ensure the WordComparison table exists
@@ -186,7 +187,7 @@ layout = dbc.Container([
             dbc.Input(
                 id='wc-filter-input',
                 type='text',
-                placeholder='Filter by Word 1 or Word 2…',
+                placeholder='Search words, pinyin or meaning…',
                 debounce=False,
                 style={'maxWidth': '320px', 'marginBottom': '12px'},
             )
@@ -343,12 +344,7 @@ def filter_saved_table(store_data, filter_text):
 
     df = pd.DataFrame(store_data)
     if filter_text and filter_text.strip():
-        term = filter_text.strip()
-        mask = (
-            df['Word 1'].astype(str).str.contains(term, case=False, na=False) |
-            df['Word 2'].astype(str).str.contains(term, case=False, na=False)
-        )
-        df = df[mask]
+        df = df[df['Pair ID'].isin(search_word_comparison_ids(filter_text))]
 
     cols_present = [c for c in SAVED_DISPLAY_COLS if c in df.columns]
     return df[cols_present].to_dict('records'), _blank_cols(cols_present)
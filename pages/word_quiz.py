@@ -2,223 +2,244 @@
 import dash
 from dash import Dash, html, dash_table, dcc, callback, Output, Input, State, callback_context
 from main.translation import *
-from main.quiz import QuizGenerator, get_top_error_word_ids
+from main.quiz import (QuizGenerator, get_top_error_word_ids, grade_meanings_with_llm, apply_llm_meaning_grades,
+                       save_quiz_result)
+from main.api_logger import api_log_writer
+import threading
+import uuid
 import pandas as pd
 import dash_bootstrap_components as dbc
 
 from dotenv import load_dotenv
 import os
 load_dotenv()
-from main.sql import load_dict
+from main.data_cache import get_dict_df
 # Incorporate data
 dict_sheet_name = os.getenv('DICT_SHEET_NAME')
 gsheet_name = os.getenv('SHEET_NAME')
 
 #orig_df = load_dict(gsheet_mode=True, gsheet_name=gsheet_name, worksheet_name=dict_sheet_name)
-orig_df = load_dict()
 id_col = 'Word Id'
-word_date = orig_df['Added Date'].drop_duplicates().sort_values().to_list()
-word_cat = orig_df['Word Category'].drop_duplicates().sort_values().to_list()
-word_rarity = orig_df['Word Rarity'].drop_duplicates().sort_values().to_list()
 
-quiz_generator = QuizGenerator(df=orig_df)
+# Reads the shared data cache (and its sampling index) when a quiz is generated
+quiz_generator = QuizGenerator()
 
 dash.register_page(__name__, path='/wordquiz', name='Word Quiz')
 
-# App layout
-layout = dbc.Container([
-    dbc.Row([
-        dbc.Col([
-            # Input box for number
-            dbc.Card([
-                dbc.CardBody([
-                    html.B("Number of Words in Quiz"), 
-                    dcc.Input(
-                        id='quiz-word-num',
-                        type='number',
-                        value=20,
-                        min=0,
-                        placeholder=None,
-                        style={'width': '100%', 'marginBottom': '10px'}  # Full width with margin below
-                    ),
-                    html.Div(id='number-output', style={'marginTop': '5px', 'color': 'gray'})  # To display input feedback
-                ])
-            ], className="mb-4 shadow-sm"),
-        ], width=3),
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.B("Top Error Quiz Type"),
-                    html.Div(
-                        dbc.RadioItems(
-                            id='top-error-type-radio',
-                            options=[
-                                {'label': 'Pinyin Errors', 'value': 'pinyin'},
-                                {'label': 'Meaning Errors', 'value': 'meaning'},
-                            ],
-                            value='pinyin',
-                            inline=False,
-                            style={'marginTop': '6px'},
-                        )
-                    ),
-                    html.Div(
-                        'Used by "Quiz Top Errors" button',
-                        style={'color': 'gray', 'fontSize': '11px', 'marginTop': '6px'}
-                    ),
-                ])
-            ], className="mb-4 shadow-sm"),
-        ], width=3),
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    dbc.Row([
-                        dbc.Col([
-                            html.B("Adaptive Sampling"),
-                            dbc.Switch(
-                                id='adaptive-sampling-toggle',
-                                value=True,
-                                label='Focus on weak words',
-                                style={'marginTop': '5px'}
-                            ),
-                        ], width=4),
-                        dbc.Col([
-                            html.B("Focus Strength"),
-                            html.Div(
-                                '1.0x (baseline)',
-                                id='spread-power-display',
-                                style={'color': 'gray', 'fontSize': '12px'}
-                            ),
-                            dcc.Slider(
-                                id='spread-power-slider',
-                                min=0.25,
-                                max=5.0,
-                                step=0.25,
-                                value=1.0,
-                                marks={
-                                    0.25: {'label': '0.25x', 'style': {'fontSize': '11px'}},
-                                    1.0:  {'label': '1x (default)', 'style': {'fontSize': '11px'}},
-                                    2.0:  {'label': '2x', 'style': {'fontSize': '11px'}},
-                                    3.0:  {'label': '3x', 'style': {'fontSize': '11px'}},
-                                    5.0:  {'label': '5x', 'style': {'fontSize': '11px'}},
-                                },
-                            ),
-                            html.Div(
-                                '← More uniform    |    More focused on weak words →',
-                                style={'color': 'gray', 'fontSize': '11px', 'textAlign': 'center', 'marginTop': '4px'}
-                            ),
-                        ], width=8),
+
+# App layout, built on navigation so the dictionary is only loaded once the page is visited
+def layout(**kwargs):
+    orig_df = get_dict_df()
+    word_date = orig_df['Added Date'].drop_duplicates().sort_values().to_list()
+    word_cat = orig_df['Word Category'].drop_duplicates().sort_values().to_list()
+    word_rarity = orig_df['Word Rarity'].drop_duplicates().sort_values().to_list()
+
+    return dbc.Container([
+        dbc.Row([
+            dbc.Col([
+                # Input box for number
+                dbc.Card([
+                    dbc.CardBody([
+                        html.B("Number of Words in Quiz"), 
+                        dcc.Input(
+                            id='quiz-word-num',
+                            type='number',
+                            value=20,
+                            min=0,
+                            placeholder=None,
+                            style={'width': '100%', 'marginBottom': '10px'}  # Full width with margin below
+                        ),
+                        html.Div(id='number-output', style={'marginTop': '5px', 'color': 'gray'})  # To display input feedback
                     ])
-                ])
-            ], className="mb-4 shadow-sm")
-        ], width=6),
-    ]),
-    # Filter dropdowns with space in between
-    dbc.Row([
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.B("Date Filter"),
-                    dcc.Dropdown(
-                        options=[{'label': option, 'value': option} for option in ['All'] + word_date],
-                        value='All',
-                        id='date-dropdown',
-                    )
-                ])
-            ], className="mb-4 shadow-sm")
-        ], width=4),
-
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.B("Category Filter"),
-                    dcc.Dropdown(
-                        options=[{'label': option, 'value': option} for option in ['All'] + word_cat],
-                        value='All',
-                        id='category-dropdown',
-                    )
-                ])
-            ], className="mb-4 shadow-sm")
-        ], width=4),
-
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.B("Rarity Filter"),
-                    dbc.Checklist(
-                        options=[{'label': option, 'value': option} for option in word_rarity],
-                        value=word_rarity,
-                        id='rarity-dropdown',
-                        inline=True,
-                    )
-                ])
-            ], className="mb-4 shadow-sm")
-        ], width=4),
-        dbc.Col([
-            dbc.Checklist(
-                options=[{'label': ' New Words Only', 'value': True}],
-                value=[],
-                id='new-words-only-checkbox',
-                inline=True,
-                style={'marginBottom': '10px'}
-            ),
-            dbc.Button('Generate Quiz', id='gen-quiz-button', n_clicks=0, color='primary'),
-            dbc.Button(
-                'Quiz Top Errors',
-                id='top-errors-quiz-button',
-                n_clicks=0,
-                color='danger',
-                className='ms-2',
-                title='Generate a quiz from the top 20 pinyin and meaning error words'
-            ),
+                ], className="mb-4 shadow-sm"),
+            ], width=3),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.B("Top Error Quiz Type"),
+                        html.Div(
+                            dbc.RadioItems(
+                                id='top-error-type-radio',
+                                options=[
+                                    {'label': 'Pinyin Errors', 'value': 'pinyin'},
+                                    {'label': 'Meaning Errors', 'value': 'meaning'},
+                                ],
+                                value='pinyin',
+                                inline=False,
+                                style={'marginTop': '6px'},
+                            )
+                        ),
+                        html.Div(
+                            'Used by "Quiz Top Errors" button',
+                            style={'color': 'gray', 'fontSize': '11px', 'marginTop': '6px'}
+                        ),
+                    ])
+                ], className="mb-4 shadow-sm"),
+            ], width=3),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        dbc.Row([
+                            dbc.Col([
+                                html.B("Adaptive Sampling"),
+                                dbc.Switch(
+                                    id='adaptive-sampling-toggle',
+                                    value=True,
+                                    label='Focus on weak words',
+                                    style={'marginTop': '5px'}
+                                ),
+                                html.B("Spaced Repetition"),
+                                dbc.Switch(
+                                    id='spaced-repetition-toggle',
+                                    value=False,
+                                    label='Due for review first',
+                                    style={'marginTop': '5px'}
+                                ),
+                            ], width=4),
+                            dbc.Col([
+                                html.B("Focus Strength"),
+                                html.Div(
+                                    '1.0x (baseline)',
+                                    id='spread-power-display',
+                                    style={'color': 'gray', 'fontSize': '12px'}
+                                ),
+                                dcc.Slider(
+                                    id='spread-power-slider',
+                                    min=0.25,
+                                    max=5.0,
+                                    step=0.25,
+                                    value=1.0,
+                                    marks={
+                                        0.25: {'label': '0.25x', 'style': {'fontSize': '11px'}},
+                                        1.0:  {'label': '1x (default)', 'style': {'fontSize': '11px'}},
+                                        2.0:  {'label': '2x', 'style': {'fontSize': '11px'}},
+                                        3.0:  {'label': '3x', 'style': {'fontSize': '11px'}},
+                                        5.0:  {'label': '5x', 'style': {'fontSize': '11px'}},
+                                    },
+                                ),
+                                html.Div(
+                                    '← More uniform    |    More focused on weak words →',
+                                    style={'color': 'gray', 'fontSize': '11px', 'textAlign': 'center', 'marginTop': '4px'}
+                                ),
+                            ], width=8),
+                        ])
+                    ])
+                ], className="mb-4 shadow-sm")
+            ], width=6),
         ]),
-    ], className="mb-3"),
-
-
-
-    html.Hr(),  # Space between filters and table
-
-    # Data table with additional margin and styling
-    dbc.Row(dbc.Col(
-        dcc.Loading(
-            type='default',
-            children=[
-                dash_table.DataTable(
-                        #data=orig_df.to_dict('records'),
-                        #sort_action="native",  # Enable sorting
-                        #filter_action="native",  # Enable filtering
-                        editable=True,  # Enable cell editing
-                        style_table={'overflowX': 'auto'},  # Responsive styling
-                        style_cell={
-                            "fontSize": "24px", # Set font size
-                            "textAlign": "center",  # Align text to the center
-                            "padding": "10px",      # Add padding to cells
-                            "fontFamily": "Arial",  # Set font
-                        },
-                        style_header={
-                            'backgroundColor': '#f8f9fa',  # Light gray header background
-                            'fontWeight': 'bold'
-                        },
-                        style_data={
-                            'backgroundColor': '#ffffff',  # White background for data
-                            'color': '#212529'  # Dark text color
-                        },
-                        style_data_conditional=[
-                            *[{'if': {'column_id': col}, 'fontSize': '25px'}
-                              for col in ['Word']],
-                            *[{'if': {'column_id': col}, 'fontSize': '22px'}
-                              for col in ['Sentence']],
-                        ],
-                        page_size=50, 
-                        id='quiz-display'
+        # Filter dropdowns with space in between
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.B("Date Filter"),
+                        dcc.Dropdown(
+                            options=[{'label': option, 'value': option} for option in ['All'] + word_date],
+                            value='All',
+                            id='date-dropdown',
+                        )
+                    ])
+                ], className="mb-4 shadow-sm")
+            ], width=4),
+
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.B("Category Filter"),
+                        dcc.Dropdown(
+                            options=[{'label': option, 'value': option} for option in ['All'] + word_cat],
+                            value='All',
+                            id='category-dropdown',
+                        )
+                    ])
+                ], className="mb-4 shadow-sm")
+            ], width=4),
+
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.B("Rarity Filter"),
+                        dbc.Checklist(
+                            options=[{'label': option, 'value': option} for option in word_rarity],
+                            value=word_rarity,
+                            id='rarity-dropdown',
+                            inline=True,
+                        )
+                    ])
+                ], className="mb-4 shadow-sm")
+            ], width=4),
+            dbc.Col([
+                dbc.Checklist(
+                    options=[{'label': ' New Words Only', 'value': True}],
+                    value=[],
+                    id='new-words-only-checkbox',
+                    inline=True,
+                    style={'marginBottom': '10px'}
+                ),
+                dbc.Button('Generate Quiz', id='gen-quiz-button', n_clicks=0, color='primary'),
+                dbc.Button(
+                    'Quiz Top Errors',
+                    id='top-errors-quiz-button',
+                    n_clicks=0,
+                    color='danger',
+                    className='ms-2',
+                    title='Generate a quiz from the top 20 pinyin and meaning error words'
                 ),
-            ]
-        ),
-        width=12,
-        className="shadow-lg p-3 mb-5 bg-white rounded"
-    )),
-    dbc.Col([dbc.Button('Score Quiz', id='score-quiz-button', n_clicks=0, color='primary')]),
-    html.Div(id='score-status', style={'marginTop': '20px', 'fontSize': '20px', 'fontWeight': 'bold'}),
-], fluid=True)
+            ]),
+        ], className="mb-3"),
+
+
+
+        html.Hr(),  # Space between filters and table
+
+        # Data table with additional margin and styling
+        dbc.Row(dbc.Col(
+            dcc.Loading(
+                type='default',
+                children=[
+                    dash_table.DataTable(
+                            #data=orig_df.to_dict('records'),
+                            #sort_action="native",  # Enable sorting
+                            #filter_action="native",  # Enable filtering
+                            editable=True,  # Enable cell editing
+                            style_table={'overflowX': 'auto'},  # Responsive styling
+                            style_cell={
+                                "fontSize": "24px", # Set font size
+                                "textAlign": "center",  # Align text to the center
+                                "padding": "10px",      # Add padding to cells
+                                "fontFamily": "Arial",  # Set font
+                            },
+                            style_header={
+                                'backgroundColor': '#f8f9fa',  # Light gray header background
+                                'fontWeight': 'bold'
+                            },
+                            style_data={
+                                'backgroundColor': '#ffffff',  # White background for data
+                                'color': '#212529'  # Dark text color
+                            },
+                            style_data_conditional=[
+                                *[{'if': {'column_id': col}, 'fontSize': '25px'}
+                                  for col in ['Word']],
+                                *[{'if': {'column_id': col}, 'fontSize': '22px'}
+                                  for col in ['Sentence']],
+                            ],
+                            page_size=50, 
+                            id='quiz-display'
+                    ),
+                ]
+            ),
+            width=12,
+            className="shadow-lg p-3 mb-5 bg-white rounded"
+        )),
+        dbc.Col([dbc.Button('Score Quiz', id='score-quiz-button', n_clicks=0, color='primary')]),
+        html.Div(id='score-status', style={'marginTop': '20px', 'fontSize': '20px', 'fontWeight': 'bold'}),
+        # Scored quiz with the meanings the LLM still has to grade, and the grades once they arrive
+        dcc.Store(id='meaning-grading-job'),
+        dcc.Store(id='meaning-grading-result'),
+        # Id of the quiz save running on a background thread, polled until it reports back
+        dcc.Store(id='quiz-save-job'),
+        dcc.Interval(id='quiz-save-interval', interval=500, n_intervals=0, disabled=True),
+    ], fluid=True)
 
 
 @callback(
@@ -234,6 +255,8 @@ def update_spread_label(value):
         Output(component_id='quiz-display', component_property='data'),
         Output(component_id='quiz-display', component_property='columns'),
         Output('score-status', 'children'),
+        Output('meaning-grading-job', 'data'),
+        Output('quiz-save-job', 'data'),
     ],
     [
         Input('gen-quiz-button', 'n_clicks'),
@@ -248,11 +271,12 @@ def update_spread_label(value):
         State('new-words-only-checkbox', 'value'),
         State('adaptive-sampling-toggle', 'value'),
         State('spread-power-slider', 'value'),
+        State('spaced-repetition-toggle', 'value'),
         State('quiz-display', 'data'),
         State('top-error-type-radio', 'value'),
     ],
 )
-def handle_quiz_buttons(n_quiz_clicks, n_score_clicks, n_top_errors_clicks, num_words, date_filter, category_filter, rarity_filter, new_words_only, adaptive_sampling, spread_power, quiz_table_data, top_error_type):
+def handle_quiz_buttons(n_quiz_clicks, n_score_clicks, n_top_errors_clicks, num_words, date_filter, category_filter, rarity_filter, new_words_only, adaptive_sampling, spread_power, spaced_repetition, quiz_table_data, top_error_type):
     ctx = callback_context  # Determine which input triggered the callback
     
     # Default outputs
@@ -261,7 +285,7 @@ def handle_quiz_buttons(n_quiz_clicks, n_score_clicks, n_top_errors_clicks, num_
     message = ""
     
     if not ctx.triggered:
-        return display_data, display_columns, message
+        return display_data, display_columns, message, dash.no_update, dash.no_update
 
     # Identify the button that triggered the callback
     button_id = ctx.triggered[0]['prop_id'].split('.')[0]
@@ -287,6 +311,7 @@ def handle_quiz_buttons(n_quiz_clicks, n_score_clicks, n_top_errors_clicks, num_
             new_words_only=bool(new_words_only),
             adaptive_sampling=bool(adaptive_sampling),
             spread_power=float(spread_power) if spread_power is not None else 1.0,
+            spaced_repetition=bool(spaced_repetition),
         )
         display_df = quiz_df.drop(columns=['Word Id'])
 
@@ -295,15 +320,14 @@ def handle_quiz_buttons(n_quiz_clicks, n_score_clicks, n_top_errors_clicks, num_
         message = "Quiz Generated!"
 
     elif button_id == 'top-errors-quiz-button' and n_top_errors_clicks > 0:
-        # Reload fresh data so scores reflect latest quiz history
-        fresh_df = load_dict()
-        quiz_generator.dict_df = fresh_df
+        # Cached dictionary is refreshed after every quiz save, so scores reflect latest quiz history
+        fresh_df = get_dict_df()
 
         error_type = top_error_type or 'pinyin'
         top_word_ids = get_top_error_word_ids(fresh_df, n=20, error_type=error_type)
 
         if not top_word_ids:
-            return [], [], "No error words found yet. Complete some quizzes first!"
+            return [], [], "No error words found yet. Complete some quizzes first!", dash.no_update, dash.no_update
 
         quiz_df = quiz_generator.generate_pinyin_and_meaning_quiz(
             id_column=id_col,
@@ -317,28 +341,134 @@ def handle_quiz_buttons(n_quiz_clicks, n_score_clicks, n_top_errors_clicks, num_
         message = f"Top {label} Errors Quiz Generated! ({len(display_df)} words)"
 
     elif button_id == 'score-quiz-button' and n_score_clicks > 0:
-        # Handle Scoring the Quiz
+        # Handle Scoring the Quiz: pinyin and locally graded meanings are shown now, the rest of the
+        # meanings are graded by the LLM in a background callback (grade_pending_meanings)
         if quiz_table_data:  # Ensure there is data to score
             quiz_df = pd.DataFrame(quiz_table_data)  # Convert current table data to DataFrame
 
             quiz_result = quiz_generator.evaluate_pinyin_and_meaning_quiz(
                 pinyin_answer=quiz_df['Pinyin'],
                 meaning_answer=quiz_df['Meaning'],
+                llm_grading=False,
             )
-            #print(quiz_df['Meaning'])
-            #print(quiz_result.head())
-            display_data = quiz_result.to_dict('records')
-            display_columns = [{"name": i, "id": i} for i in quiz_result.columns]
-            message = "Quiz Scored!"
-
-            print("Updating quiz log with results")
-            quiz_generator.output_quiz_log(gsheet_mode=False)
-            print("Quiz log updated")
-            
-            # Reload dataset so "New Words Only" filter reflects updated quiz status
-            updated_df = load_dict()
-            quiz_generator.dict_df = updated_df
-
             quiz_generator.quiz_result = None  # Reset quiz result after scoring
+            display_data, display_columns = _display_result(quiz_result)
 
-    return display_data, display_columns, message
\ No newline at end of file
+            pending = quiz_result.index[quiz_result['Meaning Grading Source'].isna()].tolist()
+            if not pending:
+                return display_data, display_columns, "Quiz Scored! Saving...", dash.no_update, _start_save(quiz_result)
+
+            job = {'result': _to_records(quiz_result), 'rows': pending, 'structured': quiz_generator.structured}
+            message = f"Pinyin Scored! Grading {len(pending)} meaning answer(s)..."
+            return display_data, display_columns, message, job, dash.no_update
+
+    return display_data, display_columns, message, dash.no_update, dash.no_update
+
+
+def _to_records(df: pd.DataFrame) -> list:
+    # NaN is not valid JSON for a dcc.Store
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def _display_result(quiz_result: pd.DataFrame) -> tuple:
+    display_df = quiz_result.copy()
+    pending = display_df['Meaning Grading Source'].isna()
+    display_df.loc[pending, 'Meaning Correct'] = 'grading...'
+    display_df.loc[pending, 'Meaning Correction'] = ''
+    return _to_records(display_df), [{"name": i, "id": i} for i in display_df.columns]
+
+
+# Outcome of each quiz save by save id: None while saving, then '' or the error message.  Entries
+# are removed once report_quiz_save has shown them.
+_save_status = {}
+
+
+def _save_quiz_result(save_id: str, quiz_result: pd.DataFrame) -> None:
+    try:
+        save_quiz_result(quiz_result)
+        # Reload the dictionary statistics now rather than on the next page request
+        get_dict_df()
+        _save_status[save_id] = ''
+    except Exception as e:
+        _save_status[save_id] = str(e) or type(e).__name__
+
+
+def _start_save(quiz_result: pd.DataFrame) -> str:
+    """Save quiz_result on a background thread; returns the save id for the quiz-save-job Store."""
+    save_id = uuid.uuid4().hex
+    _save_status[save_id] = None
+    # The save runs in this process (not the background worker) so the data cache sees the write
+    threading.Thread(target=_save_quiz_result, args=(save_id, quiz_result), name='quiz-save').start()
+    return save_id
+
+
+@callback(
+    Output('meaning-grading-result', 'data'),
+    Input('meaning-grading-job', 'data'),
+    background=True,
+    running=[(Output('score-quiz-button', 'disabled'), True, False)],
+    prevent_initial_call=True,
+)
+def grade_pending_meanings(job):
+    if not job:
+        return dash.no_update
+    pending = [job['result'][row] for row in job['rows']]
+    try:
+        llm_df = grade_meanings_with_llm(
+            [row['Word'] for row in pending],
+            [row['Sentence'] for row in pending],
+            [row['Meaning'] for row in pending],
+            structured=job['structured'],
+        )
+        return {**job, 'grades': _to_records(llm_df)}
+    except Exception as e:
+        return {**job, 'error': str(e)}
+    finally:
+        # The worker process exits without running atexit handlers, so write its API log records now
+        api_log_writer.flush()
+
+
+@callback(
+    Output('quiz-display', 'data', allow_duplicate=True),
+    Output('quiz-display', 'columns', allow_duplicate=True),
+    Output('score-status', 'children', allow_duplicate=True),
+    Output('quiz-save-job', 'data', allow_duplicate=True),
+    Input('meaning-grading-result', 'data'),
+    State('quiz-display', 'data'),
+    prevent_initial_call=True,
+)
+def fill_meaning_grades(grading, quiz_table_data):
+    if not grading:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update
+    if 'error' in grading:
+        return (dash.no_update, dash.no_update, f"Meaning grading failed, quiz not saved: {grading['error']}",
+                dash.no_update)
+
+    quiz_result = pd.DataFrame(grading['result'])
+    apply_llm_meaning_grades(quiz_result, grading['rows'], pd.DataFrame(grading['grades']))
+    save_id = _start_save(quiz_result)
+
+    # Leave the table alone if a new quiz was generated while the meanings were graded
+    if quiz_table_data and [row.get('Word') for row in quiz_table_data] != quiz_result['Word'].tolist():
+        return dash.no_update, dash.no_update, "Quiz Scored! Saving...", save_id
+    display_data, display_columns = _display_result(quiz_result)
+    return display_data, display_columns, "Quiz Scored! Saving...", save_id
+
+
+@callback(
+    Output('score-status', 'children', allow_duplicate=True),
+    Output('quiz-save-interval', 'disabled'),
+    Input('quiz-save-job', 'data'),
+    Input('quiz-save-interval', 'n_intervals'),
+    prevent_initial_call=True,
+)
+def report_quiz_save(save_id, n_intervals):
+    # Polls while the save started by handle_quiz_buttons or fill_meaning_grades is running
+    if save_id not in _save_status:
+        return dash.no_update, True
+    if _save_status[save_id] is None:
+        return dash.no_update, False
+    error = _save_status.pop(save_id)
+    if error:
+        return f"Quiz scored, but saving it failed: {error}", True
+    return "Quiz Scored and saved!", True